@@ -1,14 +1,14 @@
 import numbers
 import numpy as np
-from time import sleep
-import progressbar
 from .mesh import Mesh
-from .wrapper import Uniform
+from .series import (createUniform, VectorizedUniform, getBudgetTolerance,
+                     SeriesTerm)
+from .solution import SeparableField
 from .utils import DEFAULT_SETTINGS
 
 ds = DEFAULT_SETTINGS['boundary']
 
-class Boundary:
+class Boundary(SeriesTerm):
     '''
     '''
     def __init__(self, mesh=Mesh(), bcType=[ds[0], ds[1], ds[2]],
@@ -26,6 +26,7 @@ class Boundary:
         self.a2 = a2
         self.b2 = b2
         self.k2 = k2
+        self.diagnostics = {}
         self.validateBoundary()
 
     def validateBoundary(self):
@@ -91,44 +92,117 @@ class Boundary:
                         raise ValueError('{0} must be positive.'
                                          .format(prop))
 
-    def compute(self, tArray, alpha, tol=1e-20):
+    def compute(self, tArray, alpha, tol=1e-20, engine=None,
+                rtol=None, tables=None, budget=None, separable=False):
         '''The values are computed for x in [0, l]. The origin is moved as
-        x = x+l/2.
+        x = x+l/2. The series are evaluated by the engine "cxx" or "numpy",
+        see heat.series.createUniform. If rtol is given, the number of terms
+        is computed a priori for the relative error rtol at every time
+        instead of stopping on the first term below tol. The engine "gemm"
+        takes its eigenmode tables from tables, see heat.series.ModeTables.
+        If budget is given, it is the absolute accuracy of the term, it is
+        split among the axes and replaces rtol, see computeComponent. If
+        separable is True, the term is returned as a
+        heat.solution.SeparableField of the components.
         '''
         sol = {}
-        bcType = self.bcType
         Coords = self.mesh.getCoords()
-        ls = [self.mesh.geometry.lx, self.mesh.geometry.ly, self.mesh.geometry.lz]
         dim = ['x', 'y', 'z']
+        if separable:
+            axisCoords = self.mesh.getAxisCoords()
+            for d in range(0, self.mesh.geometry.d):
+                sol[dim[d]] = self.computeComponent(d, axisCoords, tArray, alpha,
+                                                    tol, engine, rtol, tables,
+                                                    budget, True)
+            return self.getSeparableSolution(sol)
         sol['x'] = np.zeros((tArray.size, Coords['x'].size))  # row, column
         sol['y'] = np.zeros((tArray.size, Coords['y'].size))  # row, column
         sol['z'] = np.zeros((tArray.size, Coords['z'].size))  # row, column
+        for d in range(0, self.mesh.geometry.d):
+            sol[dim[d]] = self.computeComponent(d, Coords, tArray, alpha, tol,
+                                                engine, rtol, tables, budget)
+        return self.getSolution(sol)
+
+    def computeComponent(self, d, Coords, tArray, alpha, tol=1e-20,
+                         engine=None, rtol=None, tables=None, budget=None,
+                         separable=False):
+        '''Return the contribution of the axis d (0, 1 or 2) to the boundary
+        term, see compute. The components are independent, they can be
+        computed in parallel. The share of the budget of every component is
+        budget/dim, the combination of the components is treated as a sum.
+        If separable is True, Coords are positions on the axes, e.g. the
+        nodes of heat.mesh.Mesh.getAxisCoords or probes, and the values at
+        these positions are returned (Nt x Coords[axis].size).
+        '''
+        bcType = self.bcType
+        ls = [self.mesh.geometry.lx, self.mesh.geometry.ly, self.mesh.geometry.lz]
+        dim = ['x', 'y', 'z']
         term = 'boundary'  # boundary = Boundary term
-        n = 1.0 
+        if (self.g1[d]=='uniform' and self.g2[d]=='uniform'):
+            if bcType[d] == 'dirichlet':
+                bc = 'd'  # d = dirichlet
+            else:
+                print("Boundary term: The '{0}' boundary condition hasn't "\
+                      "been implemented yet.".format(bcType[d]))
+                quit()
+            l = ls[d]
+            xArray = Coords[dim[d]]+l/2.0  # Uniform takes coordinates from 0 to l
+            node = {'dim': self.mesh.geometry.d,
+                    'x': xArray[0], 'y': 0.0, 'z': 0.0,
+                    't': tArray[0],
+                    'l': l,
+                    'alpha': alpha}
+            params = {'a0': 0.0, 'a1': self.a1[d], 'a2': self.a2[d],
+                      'k1': 0.0, 'k2': 0.0}
+            u = createUniform(engine, node, bc, term, params, 'x', 'x',
+                              tables)
+            if budget is not None:
+                rtol = getBudgetTolerance(u, budget/self.mesh.geometry.d)
+            if separable:
+                return self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Boundary', rtol)
+            elif self.mesh.geometry.d==1:
+                return self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Boundary', rtol)
+            elif self.mesh.geometry.d==2:
+                return self.getSolutionComponent2D(u, xArray, tArray, tol, dim[d], 'Boundary', rtol)
+            else:  # dimension == 3
+                return self.getSolutionComponent3D(u, xArray, tArray, tol, dim[d], 'Boundary', rtol)
+        else:
+            print("Boundary term: The combination of options g1='{0}' and g2={1} hasn't"\
+                 " been implemented yet.".format(self.g1[d], self.g2[d]))
+            quit()
+
+    def getSteadyComponent(self, u, xArray):
+        """Return the steady state of the component of the series object u
+        at the positions xArray, see heat.series.SeriesTerm.
+        """
+        return u.getSteadyStateDirichletArray(xArray)
+
+    def computeSteady(self, Coords):
+        '''Return the steady-state boundary term at the nodes with the closed
+        forms of heat.series.VectorizedUniform.getSteadyStateDirichletArray.
+        The components are combined as in compute.
+        '''
+        sol = {}
+        bcType = self.bcType
+        ls = [self.mesh.geometry.lx, self.mesh.geometry.ly, self.mesh.geometry.lz]
+        dim = ['x', 'y', 'z']
         for d in range(0, self.mesh.geometry.d):
             if (self.g1[d]=='uniform' and self.g2[d]=='uniform'):
-                if bcType[d] == 'dirichlet':
-                    bc = 'd'  # d = dirichlet
-                else:
+                if bcType[d] != 'dirichlet':
                     print("Boundary term: The '{0}' boundary condition hasn't "\
                           "been implemented yet.".format(bcType[d]))
                     quit()
                 l = ls[d]
                 xArray = Coords[dim[d]]+l/2.0  # Uniform takes coordinates from 0 to l
                 node = {'dim': self.mesh.geometry.d,
-                        'x': xArray[0], 'y': 0.0, 'z': 0.0,
-                        't': tArray[0],
+                        'x': 0.0, 'y': 0.0, 'z': 0.0,
+                        't': 0.0,
                         'l': l,
-                        'alpha': alpha}
+                        'alpha': 1.0}
                 params = {'a0': 0.0, 'a1': self.a1[d], 'a2': self.a2[d],
                           'k1': 0.0, 'k2': 0.0}
-                u = Uniform(node, bc, term, params, 'x', 'x')
-                if self.mesh.geometry.d==1:
-                    sol[dim[d]] = self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Boundary')
-                elif self.mesh.geometry.d==2:
-                    sol[dim[d]] = self.getSolutionComponent2D(u, xArray, tArray, tol, dim[d], 'Boundary')
-                else:  # dimension == 3
-                    sol[dim[d]] = self.getSolutionComponent3D(u, xArray, tArray, tol, dim[d], 'Boundary')
+                u = VectorizedUniform(node, 'd', 'boundary', params, 'x', 'x')
+                sol[dim[d]] = u.getSteadyStateDirichletArray(xArray)
             else:
                 print("Boundary term: The combination of options g1='{0}' and g2={1} hasn't"\
                      " been implemented yet.".format(self.g1[d], self.g2[d]))
@@ -142,13 +216,7 @@ class Boundary:
         if d==1:
             solution = sol['x']
         elif d==2:
-            # if a vertex sol is the average
             solution = np.power(sol['x']*sol['y'], 1/d)
-            ind = self.mesh.getBoundariesIndex()
-            tArraySize = int(solution.size/self.mesh.getNumNodes())
-            #for i in range(0, tArraySize):
-            #    solution[i][ind]=1/d*(sol['x'][i][ind]+sol['y'][i][ind])
-
         else:
             solution = sol['x']+sol['y']+sol['z']
         return solution
@@ -156,95 +224,12 @@ class Boundary:
     def getSolutionAxis(self, u, axis, tol):
         pass
 
-    def getSolutionComponent3D(self, u, xArray, tArray, tol, component, term):
-        """
-        """
-        sol = np.zeros((tArray.size, xArray.size))
-        N = self.mesh.getCellNumPerDim()
-        Nx = N['Nx']
-        Ny = N['Ny']
-        Nz = N['Nz']
-        if component=='x':
-            #print(xArray)
-            indx = np.arange(0,(Nz+1)*(Ny+1)*(Nx+1),(Nz+1)*(Ny+1))
-            subXArray = np.take(xArray, indx)
-            solx = self.getSolutionComponent(u, subXArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, (Nx+1)):
-                    sol[j][i*(Nz+1)*(Ny+1):(i+1)*(Nz+1)*(Ny+1)] = solx[j][i]
-                j = j + 1
-        elif component=='y':
-            indy = np.arange(0,(Nz+1)*(Ny+1),Nz+1)
-            subYArray = np.take(xArray, indy)
-            soly = self.getSolutionComponent(u, subYArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for k in range(0, Nx+1):
-                    for i in range(0, (Ny+1)):
-                        sol[j][i*(Nz+1)+k*(Ny+1)*(Nz+1):(i+1)*(Nz+1)+k*(Ny+1)*(Nz+1)] = np.ones(Nz+1)*soly[j][i]
-                j = j + 1
-        else:  # z-component
-            indz=np.arange(0,Nz+1)
-            subZArray = np.take(xArray, indz)
-            solz = self.getSolutionComponent(u, subZArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, (Nx+1)*(Ny+1)):
-                    sol[j][i*(Nz+1):(i+1)*(Nz+1)] = solz[j]
-                j = j + 1
-        return sol   
-
-    def getSolutionComponent2D(self, u, xArray, tArray, tol, component, term):
-        """
-        """
-        sol = np.zeros((tArray.size, xArray.size))
-        N = self.mesh.getCellNumPerDim()
-        Nx = N['Nx']
-        Ny = N['Ny']
-        if component=='x':
-            indx=np.arange(0,Nx+1)
-            subXArray = np.take(xArray, indx)
-            solx = self.getSolutionComponent(u, subXArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, Ny+1):
-                    sol[j][i*(Nx+1):(i+1)*(Nx+1)] = solx[j]
-                j = j + 1
-        else:  # y-component
-            indy = np.arange(0,(Nx+1)*(Ny+1),Nx+1)
-            subYArray = np.take(xArray, indy)
-            soly = self.getSolutionComponent(u, subYArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, Ny+1):
-                    sol[j][i*(Nx+1):(i+1)*(Nx+1)] = soly[j][i]
-                j = j + 1
-        return sol   
-
-    def getSolutionComponent(self, u, xArray, tArray, tol, component, term):
-        """
+    def getSeparableSolution(self, sol):
+        """Return the term as a heat.solution.SeparableField of the
+        components on the axes, see getSolution.
         """
-        sol = np.zeros((tArray.size, xArray.size))
-        i = 0
-        pgbar = [progressbar.Bar('=', '{0} term, {1}-contribution: ['.format(term, component),
-                 ']'), ' ', progressbar.Percentage()]
-        bar = progressbar.ProgressBar(maxval=tArray.size, \
-                                      widgets=pgbar)
-        for t in tArray:
-            u.setTime(t)
-            j = 0
-            bar.update(i+1)
-            sleep(0.0001)
-            for x in xArray:
-                u.setXPosition(x)
-                sol[i][j] = u.getSumForward(tol)
-                if sol[i][j]<1e-3:
-                    sol[i][j] = 0.0
-                j = j + 1
-            i = i + 1
-        bar.finish()
-        return sol 
+        rule = 'geometric' if self.mesh.geometry.d==2 else 'sum'
+        return SeparableField(self.mesh, sol, rule)
 
     def getSettings(self):
         '''Return the boundary settings.
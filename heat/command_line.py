@@ -12,6 +12,7 @@ import numpy as np
 from unipath import Path
 from .utils import BASE_DIR, DATA_DIR
 from .model import Model
+from .series import ENGINES
 from .vtktools import VTK
 from . import __version__
 from .gui import MainApplication
@@ -55,17 +56,60 @@ def editConfig(filename):
                    'the solution, geometry and mesh can be visualized by heat '\
                    'but other visualization programs such as Paraview may be prefered. '\
                    'the default file is '+DATA_DIR.child("lastSolution.vtu")+'.')
+@click.option('--steady', is_flag=True,
+              help="Compute only the steady-state solution.")
+@click.option('-w', '--workers', default=1, type=click.IntRange(1),
+              help='Number of processes computing the terms of the solution '\
+                   'in parallel, the default is 1.')
+@click.option('-b', '--budget', default=None, type=float,
+              help='Absolute accuracy of the solution, the number of terms '\
+                   'of the series is computed at every time for this budget.')
+@click.option('-e', '--engine', default=None, type=click.Choice(ENGINES),
+              help='Engine evaluating the series, the default is cxx if the '\
+                   'C++ extension is built and numpy otherwise. The engine '\
+                   'recurrence needs --budget.')
+@click.option('-k', '--chunk', default=None, type=click.IntRange(1),
+              help='Compute the solution by blocks of chunk times and write '\
+                   'one .vtu file per time and their .pvd collection, the '\
+                   'memory is bounded by the size of the blocks.')
+@click.option('-p', '--precision', default=None,
+              type=click.Choice(['float64', 'float32']),
+              help='Precision of the stored solution and of the .vtu file, '\
+                   'the default is the precision of the configuration file. '\
+                   'With float32 the relative error of the values is about '\
+                   '1e-7.')
+@click.option('--store', default=None,
+              help='Write the solution at every time to the memory-mapped '\
+                   '.npy file "store", it can be reopened read-only with '\
+                   'heat.solution.Solution.openStore.')
 @click.option(
     '-v', '--version',
     is_flag=True, help='Show version information and exit.',
     callback=print_version, expose_value=False, is_eager=True,
 )
-def main(gui, config, reset, output_filepath):
+def main(gui, config, reset, output_filepath, workers, steady, budget,
+         engine, chunk, precision, store):
     """
     HEAT: Solve the heat equation with constant coefficients, 
     heat source, and usual boundary conditions using Green's 
     function on a line (1D), a rectangle (2D), or a block (3D).
     """
+    if store is not None and (chunk is not None or steady):
+        raise click.UsageError("--store can't be used with --chunk or "
+                               "--steady, the solution at every time is "
+                               "only kept by the transient computation.")
+    if steady and (chunk is not None or workers > 1 or budget is not None or
+                   engine is not None):
+        raise click.UsageError("--steady can't be used with --chunk, "
+                               "--workers, --budget or --engine, the steady "
+                               "state is given by closed forms at a single "
+                               "time.")
+    if engine == 'recurrence' and budget is None:
+        raise click.UsageError("--engine recurrence needs --budget, the "
+                               "number of terms is computed a priori.")
+    if workers > 1 and chunk is not None:
+        raise click.UsageError("--workers can't be used with --chunk, the "
+                               "blocks are computed by a single process.")
     configFileName = BASE_DIR.child('config.ini')
     defaultResultFileName = DATA_DIR.child("lastSolution.vtu")
     vtk = VTK()
@@ -94,9 +138,21 @@ def main(gui, config, reset, output_filepath):
         #model.writeConfig()
     else:  # compute and save the solution for the specified parameters.
         model = Model(output_filepath)
+        if precision is not None:
+            model.precision = precision
         
         # Compute the solution
-        model.compute()
+        if chunk is not None:
+            # Compute and save the solution block by block
+            vtk.writeTimeSeries(model, model.computeChunks(chunk,
+                                                           engine=engine,
+                                                           budget=budget))
+            return
+        if steady:
+            model.computeSteady()
+        else:
+            model.compute(engine=engine, workers=workers, budget=budget,
+                          store=store)
         
         # save the solution file
         if not os.path.exists(os.path.dirname(model.output)):
@@ -1,14 +1,13 @@
 import numpy as np
-from time import sleep
-import progressbar
 from .mesh import Mesh
-from .wrapper import Uniform
+from .series import createUniform, getBudgetTolerance, SeriesTerm
+from .solution import SeparableField
 from .utils import DEFAULT_SETTINGS
 
 ds = DEFAULT_SETTINGS['initial']
 
 
-class Initial:
+class Initial(SeriesTerm):
     '''
     '''
     def __init__(self, mesh=Mesh(), fct=ds[0], a=ds[1], b=ds[2], c=ds[3]):
@@ -17,48 +16,105 @@ class Initial:
         self.a = a
         self.b = b
         self.c = c
+        self.diagnostics = {}
 
-    def compute(self, bcType, Coords, tArray, alpha, tol=1e-20):
+    def compute(self, bcType, Coords, tArray, alpha, tol=1e-20, engine=None,
+                rtol=None, tables=None, budget=None, separable=False):
         '''The values are computed for x in [0, l]. The origin is moved setting
-        x = x+l/2.
+        x = x+l/2. The series are evaluated by the engine "cxx" or "numpy",
+        see heat.series.createUniform. If rtol is given, the number of terms
+        is computed a priori for the relative error rtol at every time
+        instead of stopping on the first term below tol. The engine "gemm"
+        takes its eigenmode tables from tables, see heat.series.ModeTables.
+        If budget is given, it is the absolute accuracy of the term, it is
+        split among the axes and replaces rtol, see computeComponent. If
+        separable is True, the term is returned as a
+        heat.solution.SeparableField of the components.
         '''
         sol = {}
-        ls = [self.mesh.geometry.lx, self.mesh.geometry.ly, self.mesh.geometry.lz]
         dim = ['x', 'y', 'z']
+        if separable:
+            axisCoords = self.mesh.getAxisCoords()
+            for d in range(0, self.mesh.geometry.d):
+                sol[dim[d]] = self.computeComponent(d, bcType, axisCoords, tArray,
+                                                    alpha, tol, engine,
+                                                    rtol, tables, budget, True)
+            return self.getSeparableSolution(sol)
         sol['x'] = np.zeros((tArray.size, Coords['x'].size))  # row, column
         sol['y'] = np.zeros((tArray.size, Coords['y'].size))  # row, column
         sol['z'] = np.zeros((tArray.size, Coords['z'].size))  # row, column
-        term = 'initial'  # initial = Initial term
-        n = 1.0 
         for d in range(0, self.mesh.geometry.d):
-            if self.fct=='uniform':
-                if bcType[d] == 'dirichlet':
-                    bc = 'd'  # d = dirichlet
-                else:
-                    print("Initial term: The '{0}' boundary condition hasn't "\
-                          "been implemented yet.".format(bcType[d]))
-                    quit()
-                l = ls[d]
-                xArray = Coords[dim[d]]+l/2.0  # Uniform takes coordinates from 0 to l
-                node = {'dim': self.mesh.geometry.d,
-                        'x': xArray[0], 'y': 0.0, 'z': 0.0,
-                        't': tArray[0],
-                        'l': l,
-                        'alpha': alpha}
-                params = {'a0': self.a, 'a1': 0.0, 'a2': 0.0,
-                          'k1': 0.0, 'k2': 0.0}
-                u = Uniform(node, bc, term, params, 'x', 'x')
-                if self.mesh.geometry.d==1:
-                    sol[dim[d]] = self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Initial')
-                elif self.mesh.geometry.d==2:
-                    sol[dim[d]] = self.getSolutionComponent2D(u, xArray, tArray, tol, dim[d], 'Initial')
-                else:  # dimension == 3
-                    sol[dim[d]] = self.getSolutionComponent3D(u, xArray, tArray, tol, dim[d], 'Initial')
+            sol[dim[d]] = self.computeComponent(d, bcType, Coords, tArray,
+                                                alpha, tol, engine, rtol,
+                                                tables, budget)
+        return self.getSolution(sol)
+
+    def computeComponent(self, d, bcType, Coords, tArray, alpha, tol=1e-20,
+                         engine=None, rtol=None, tables=None, budget=None,
+                         separable=False):
+        '''Return the contribution of the axis d (0, 1 or 2) to the initial
+        term, see compute. The components are independent, they can be
+        computed in parallel. The term is the product of the components,
+        the error of a component is then scaled by the other factors of
+        amplitude a**(1/dim). The share of the budget of every component is
+        budget/dim divided by a**((dim-1)/dim).
+        If separable is True, Coords are positions on the axes, e.g. the
+        nodes of heat.mesh.Mesh.getAxisCoords or probes, and the values at
+        these positions are returned (Nt x Coords[axis].size).
+        '''
+        ls = [self.mesh.geometry.lx, self.mesh.geometry.ly, self.mesh.geometry.lz]
+        dim = ['x', 'y', 'z']
+        term = 'initial'  # initial = Initial term
+        if self.fct=='uniform':
+            if bcType[d] == 'dirichlet':
+                bc = 'd'  # d = dirichlet
             else:
+                print("Initial term: The '{0}' boundary condition hasn't "\
+                      "been implemented yet.".format(bcType[d]))
+                quit()
+            l = ls[d]
+            xArray = Coords[dim[d]]+l/2.0  # Uniform takes coordinates from 0 to l
+            node = {'dim': self.mesh.geometry.d,
+                    'x': xArray[0], 'y': 0.0, 'z': 0.0,
+                    't': tArray[0],
+                    'l': l,
+                    'alpha': alpha}
+            params = {'a0': self.a, 'a1': 0.0, 'a2': 0.0,
+                      'k1': 0.0, 'k2': 0.0}
+            u = createUniform(engine, node, bc, term, params, 'x', 'x',
+                              tables)
+            if budget is not None:
+                n = self.mesh.geometry.d
+                scale = abs(self.a)**((n-1.0)/n)
+                atol = budget/n if scale == 0.0 else budget/(n*scale)
+                rtol = getBudgetTolerance(u, atol)
+            if separable:
+                return self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Initial', rtol)
+            elif self.mesh.geometry.d==1:
+                return self.getSolutionComponent(u, xArray, tArray, tol, dim[d], 'Initial', rtol)
+            elif self.mesh.geometry.d==2:
+                return self.getSolutionComponent2D(u, xArray, tArray, tol, dim[d], 'Initial', rtol)
+            else:  # dimension == 3
+                return self.getSolutionComponent3D(u, xArray, tArray, tol, dim[d], 'Initial', rtol)
+        else:
+            print("Initial term: The option '{0}' hasn't been implemented yet."
+                  .format(self.fct))
+            quit()
+
+    def computeSteady(self, bcType, Coords):
+        '''Return the steady-state initial term at the nodes, it is always
+        zero with Dirichlet boundary conditions.
+        '''
+        for d in range(0, self.mesh.geometry.d):
+            if self.fct!='uniform':
                 print("Initial term: The option '{0}' hasn't been implemented yet."
                       .format(self.fct))
                 quit()
-        return self.getSolution(sol)
+            if bcType[d] != 'dirichlet':
+                print("Initial term: The '{0}' boundary condition hasn't "\
+                      "been implemented yet.".format(bcType[d]))
+                quit()
+        return np.zeros(Coords['x'].size)
 
     def getSolution(self, sol):
         """The solution is just G1*G2*G3
@@ -72,95 +128,12 @@ class Initial:
             solution = sol['z']*sol['y']*sol['x']
         return solution
 
-    def getSolutionComponent3D(self, u, xArray, tArray, tol, component, term):
-        """
-        """
-        sol = np.zeros((tArray.size, xArray.size))
-        N = self.mesh.getCellNumPerDim()
-        Nx = N['Nx']
-        Ny = N['Ny']
-        Nz = N['Nz']
-        if component=='x':
-            #print(xArray)
-            indx = np.arange(0,(Nz+1)*(Ny+1)*(Nx+1),(Nz+1)*(Ny+1))
-            subXArray = np.take(xArray, indx)
-            solx = self.getSolutionComponent(u, subXArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, (Nx+1)):
-                    sol[j][i*(Nz+1)*(Ny+1):(i+1)*(Nz+1)*(Ny+1)] = solx[j][i]
-                j = j + 1
-        elif component=='y':
-            indy = np.arange(0,(Nz+1)*(Ny+1),Nz+1)
-            subYArray = np.take(xArray, indy)
-            soly = self.getSolutionComponent(u, subYArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for k in range(0, Nx+1):
-                    for i in range(0, (Ny+1)):
-                        sol[j][i*(Nz+1)+k*(Ny+1)*(Nz+1):(i+1)*(Nz+1)+k*(Ny+1)*(Nz+1)] = np.ones(Nz+1)*soly[j][i]
-                j = j + 1
-        else:  # z-component
-            indz=np.arange(0,Nz+1)
-            subZArray = np.take(xArray, indz)
-            solz = self.getSolutionComponent(u, subZArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, (Nx+1)*(Ny+1)):
-                    sol[j][i*(Nz+1):(i+1)*(Nz+1)] = solz[j]
-                j = j + 1
-        return sol   
-
-    def getSolutionComponent2D(self, u, xArray, tArray, tol, component, term):
-        """
-        """
-        sol = np.zeros((tArray.size, xArray.size))
-        N = self.mesh.getCellNumPerDim()
-        Nx = N['Nx']
-        Ny = N['Ny']
-        if component=='x':
-            indx=np.arange(0,Nx+1)
-            subXArray = np.take(xArray, indx)
-            solx = self.getSolutionComponent(u, subXArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, Ny+1):
-                    sol[j][i*(Nx+1):(i+1)*(Nx+1)] = solx[j]
-                j = j + 1
-        else:  # y-component
-            indy = np.arange(0,(Nx+1)*(Ny+1),Nx+1)
-            subYArray = np.take(xArray, indy)
-            soly = self.getSolutionComponent(u, subYArray, tArray, tol, component, term)
-            j = 0
-            for t in tArray:
-                for i in range(0, Ny+1):
-                    sol[j][i*(Nx+1):(i+1)*(Nx+1)] = soly[j][i]
-                j = j + 1
-        return sol   
-
-    def getSolutionComponent(self, u, xArray, tArray, tol, component, term):
-        """
+    def getSeparableSolution(self, sol):
+        """Return the term as a heat.solution.SeparableField of the
+        components on the axes, see getSolution.
         """
-        sol = np.zeros((tArray.size, xArray.size))
-        i = 0
-        pgbar = [progressbar.Bar('=', '{0} term, {1}-contribution:  ['.format(term, component),
-                 ']'), ' ', progressbar.Percentage()]
-        bar = progressbar.ProgressBar(maxval=tArray.size, \
-                                      widgets=pgbar)
-        for t in tArray:
-            u.setTime(t)
-            j = 0
-            bar.update(i+1)
-            sleep(0.0001)
-            for x in xArray:
-                u.setXPosition(x)
-                sol[i][j] = u.getSumForward(tol)
-                if sol[i][j]<1e-3:
-                    sol[i][j] = 0.0
-                j = j + 1
-            i = i + 1
-        bar.finish()
-        return sol 
+        rule = 'product'
+        return SeparableField(self.mesh, sol, rule)
 
     def getSettings(self):
         '''Return the initial settings.
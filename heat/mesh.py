@@ -1,3 +1,4 @@
+import numbers
 import numpy as np
 from .geometry import Geometry
 from .utils import DEFAULT_SETTINGS
@@ -8,10 +9,53 @@ ds = DEFAULT_SETTINGS['mesh']
 class Mesh:
     """
     """
-    def __init__(self, size=ds, geometry=Geometry()):
+    def __init__(self, size=ds, geometry=Geometry(), cells=None,
+                 grading='uniform', ratio=1.2):
         self.size = size
-        if self.checkSize():
+        self.cells = cells
+        self.grading = grading
+        self.ratio = ratio
+        self.cache = {}
+        self.cacheKey = None
+        if self.checkSize() and self.checkGrading():
             self.geometry = geometry
+            self.checkCells()
+
+    def getCacheKey(self):
+        '''
+        Return the settings the cached values depend on.
+        '''
+        g = self.geometry
+        cells = None if self.cells is None else tuple(self.cells)
+        return (self.size, cells, self.grading, self.ratio,
+                g.d, g.lx, g.ly, g.lz)
+
+    def invalidate(self):
+        '''
+        Clear the cached values, they are computed again when used.
+        '''
+        self.cache = {}
+        self.cacheKey = None
+
+    def getCached(self, name, compute):
+        '''
+        Return the value name computed by compute() once and cached. The
+        cache is cleared when the size or the geometry changed since the
+        value was computed. The arrays are read-only, they are shared by
+        the callers.
+        '''
+        key = self.getCacheKey()
+        if key != self.cacheKey:
+            self.invalidate()
+            self.cacheKey = key
+        if name not in self.cache:
+            value = compute()
+            arrays = value.values() if isinstance(value, dict) else [value]
+            for array in arrays:
+                if isinstance(array, np.ndarray):
+                    array.flags.writeable = False
+            self.cache[name] = value
+        return self.cache[name]
 
     def checkSize(self):
         '''
@@ -24,6 +68,61 @@ class Mesh:
                              .format(self.size))
         return True
 
+    def checkCells(self):
+        '''
+        Check the explicit number of cells per side, a list [Nx, Ny, Nz]
+        with a positive integer for every dimension, or None to use the
+        size presets.
+        '''
+        if self.cells is None:
+            return True
+        d = self.geometry.d
+        try:
+            cells = list(self.cells)
+        except TypeError:
+            cells = []
+        if len(cells) < d or not all(isinstance(N, numbers.Integral) and
+                                     N >= 1 for N in cells[:d]):
+            raise ValueError('cells={0} is not valid, cells must be a list of '
+                             '{1} positive integers [Nx, Ny, Nz].'
+                             .format(self.cells, d))
+        return True
+
+    def checkGrading(self):
+        '''
+        Check if the node distribution is one of the three available options
+        and the growth ratio of the geometric distribution.
+        '''
+        if self.grading not in ['uniform', 'geometric', 'chebyshev']:
+            raise ValueError('The mesh grading should be one of the three '
+                             'following options: "uniform", "geometric", or '
+                             '"chebyshev". The option grading = "{0}" is not '
+                             'valid.'.format(self.grading))
+        if not (isinstance(self.ratio, numbers.Real) and self.ratio > 0.0):
+            raise ValueError('ratio={0} is not valid, ratio must be positive.'
+                             .format(self.ratio))
+        return True
+
+    def getNodes(self, l, N):
+        '''
+        Return the N+1 coordinates of the nodes of a side of length l, from
+        -l/2 to l/2. The nodes are uniform, clustered toward the walls with
+        cell sizes growing by ratio from the walls to the center (geometric)
+        or at the Chebyshev-Gauss-Lobatto points (chebyshev).
+        '''
+        if self.grading == 'uniform' or N == 1:
+            return np.linspace(-l/2, l/2, N+1)
+        elif self.grading == 'chebyshev':
+            nodes = -l/2*np.cos(np.pi*np.arange(0, N+1)/N)
+        else:  # geometric
+            half = self.ratio**np.arange(0, N//2)
+            middle = [self.ratio**(N//2)] if N % 2 else []
+            sizes = np.concatenate((half, middle, half[::-1]))
+            nodes = -l/2 + l*np.concatenate(([0.0], np.cumsum(sizes)))/np.sum(sizes)
+        nodes[0] = -l/2
+        nodes[-1] = l/2
+        return nodes
+
     def getNmax(self):
         '''
         Return the number of cell for the maximum side length of the geometry.
@@ -64,8 +163,19 @@ class Mesh:
 
     def getCellNumPerDim(self):
         '''
-        Return the number of cell per side.
+        Return the number of cell per side. The value is cached, see
+        computeCellNumPerDim.
+        '''
+        return dict(self.getCached('cellNumPerDim', self.computeCellNumPerDim))
+
+    def computeCellNumPerDim(self):
+        '''
+        Return the number of cell per side, the explicit cells if given.
         '''
+        if self.cells is not None:
+            d = self.geometry.d
+            N = [int(self.cells[i]) if i < d else None for i in range(0, 3)]
+            return {'Nx': N[0], 'Ny': N[1], 'Nz': N[2]}
         Nmax = self.getNmax()
         d = self.geometry.d
         lx = self.geometry.lx
@@ -135,9 +245,86 @@ class Mesh:
         else:  # d == 3
             return (Nx+1)*(Ny+1)*(Nz+1)  # Check it is an integer
 
+    def getGridShape(self):
+        '''
+        Return the shape of the nodes array and the axis of every dimension,
+        the nodes are ordered as in getCoords: (Ny+1, Nx+1) in 2D and
+        (Nx+1, Ny+1, Nz+1) in 3D.
+        '''
+        d = self.geometry.d
+        dic = self.getCellNumPerDim()
+        Nx = dic['Nx']
+        Ny = dic['Ny']
+        Nz = dic['Nz']
+        if d == 1:
+            return (Nx+1,), ('x',)
+        elif d == 2:
+            return (Ny+1, Nx+1), ('y', 'x')
+        else:  # d == 3
+            return (Nx+1, Ny+1, Nz+1), ('x', 'y', 'z')
+
+    def getAxisIndex(self, d):
+        '''
+        Return the indices of the nodes on the line along the axis d (0, 1
+        or 2) through the first node.
+        '''
+        dic = self.getCellNumPerDim()
+        Nx = dic['Nx']
+        Ny = dic['Ny']
+        Nz = dic['Nz']
+        if self.geometry.d == 1 or (self.geometry.d == 2 and d == 0):
+            return np.arange(0, Nx+1)
+        elif self.geometry.d == 2:
+            return np.arange(0, (Nx+1)*(Ny+1), Nx+1)
+        elif d == 0:
+            return np.arange(0, (Nz+1)*(Ny+1)*(Nx+1), (Nz+1)*(Ny+1))
+        elif d == 1:
+            return np.arange(0, (Nz+1)*(Ny+1), Nz+1)
+        else:  # d == 2
+            return np.arange(0, Nz+1)
+
+    def getAxisCoords(self):
+        '''
+        Return the coordinates of the nodes on the lines along the axes
+        through the first node, see getAxisIndex.
+        '''
+        Coords = self.getCoords()
+        axisCoords = {}
+        for d, axis in enumerate(['x', 'y', 'z']):
+            if d < self.geometry.d:
+                axisCoords[axis] = Coords[axis][self.getAxisIndex(d)]
+            else:
+                axisCoords[axis] = np.zeros(1)
+        return axisCoords
+
+    def expandAxis(self, d, values, out=None):
+        '''
+        Return the values (Nt x (N_d+1)) given on the axis d (0, 1 or 2) at
+        every node (Nt x Nnodes), in out if given. The rows are broadcast on
+        the nodes array of getGridShape, without copy of the values before
+        the assignment.
+        '''
+        shape, axes = self.getGridShape()
+        values = np.atleast_2d(values)
+        p = axes.index(['x', 'y', 'z'][d])
+        view = [values.shape[0]] + [1]*len(shape)
+        view[p+1] = shape[p]
+        if out is None:
+            out = np.empty((values.shape[0], self.getNumNodes()))
+        out.reshape([values.shape[0]] + list(shape))[...] = values.reshape(view)
+        return out
+
     def getCoords(self):
         '''
-        Return the spatial coordinates.
+        Return the spatial coordinates. The value is cached, see
+        computeCoords.
+        '''
+        return dict(self.getCached('coords', self.computeCoords))
+
+    def computeCoords(self):
+        '''
+        Return the spatial coordinates, the nodes of every side are given
+        by getNodes.
         '''
         d = self.geometry.d
         dic = self.getCellNumPerDim()
@@ -148,79 +335,138 @@ class Mesh:
         ly = self.geometry.ly
         lz = self.geometry.lz
         if d == 1:
-            x = np.linspace(-lx/2, lx/2, Nx+1)
+            x = self.getNodes(lx, Nx)
             y = np.zeros(Nx+1)
             z = np.zeros(Nx+1)
         elif d == 2:
             n = (Nx+1)*(Ny+1)
-            xlist = np.linspace(-lx/2, lx/2, Nx+1)
-            ylist = np.linspace(-ly/2, ly/2, Ny+1)
+            xlist = self.getNodes(lx, Nx)
+            ylist = self.getNodes(ly, Ny)
             xg, yg = np.meshgrid(xlist, ylist)
             x = np.reshape(xg, n)
             y = np.reshape(yg, n)
             z = np.zeros(n)
         else:  # d == 3
             n = (Nx+1)*(Ny+1)*(Nz+1)
-            xlist = np.linspace(-lx/2, lx/2, Nx+1)
-            ylist = np.linspace(-ly/2, ly/2, Ny+1)
-            zlist = np.linspace(-lz/2, lz/2, Nz+1)
+            xlist = self.getNodes(lx, Nx)
+            ylist = self.getNodes(ly, Ny)
+            zlist = self.getNodes(lz, Nz)
             xg, yg, zg = np.meshgrid(xlist, ylist, zlist, indexing='ij')
             x = np.reshape(xg, n)
             y = np.reshape(yg, n)
             z = np.reshape(zg, n)
         return {'x': x, 'y': y, 'z': z}
 
+    def getNodeIndex(self, select={}):
+        '''
+        Return the indices of the nodes selected on every axis by select,
+        e.g. {'x': 0, 'y': slice(1, 4)}, the axes which are not in select
+        are taken entirely. The indices are computed from the grid shape, in
+        increasing order.
+        '''
+        shape, axes = self.getGridShape()
+        index = np.zeros((), dtype=np.int64)
+        stride = 1
+        strides = []
+        for n in reversed(shape):
+            strides.insert(0, stride)
+            stride = stride*n
+        for p, axis in enumerate(axes):
+            i = np.arange(shape[p], dtype=np.int64)[select.get(axis, slice(None))]
+            index = np.add.outer(index, np.atleast_1d(i)*strides[p])
+        return index.ravel()
+
+    def getEndNodesIndex(self, k, shape=None):
+        '''
+        Return the indices of the nodes with at least k coordinates at an
+        end of their side, i.e. the boundary (k=1), the edges (k=2 in 3D) or
+        the vertices (k=d). The indices are built recursively on the
+        dimensions of the grid shape, in increasing order, without sorting.
+        '''
+        if shape is None:
+            shape = self.getGridShape()[0]
+        size = int(np.prod(shape))
+        if k <= 0:
+            return np.arange(size, dtype=np.int64)
+        if len(shape) == 1:
+            if k > 1:
+                return np.zeros(0, dtype=np.int64)
+            return np.array([0, shape[0]-1], dtype=np.int64)
+        n = shape[0]
+        inner = size//n
+        ends = self.getEndNodesIndex(k-1, shape[1:])
+        middle = self.getEndNodesIndex(k, shape[1:])
+        rows = np.arange(1, n-1, dtype=np.int64)
+        return np.concatenate((ends, np.add.outer(rows*inner, middle).ravel(),
+                               (n-1)*inner + ends))
+
+    def getFaceIndex(self, axis, side):
+        '''
+        Return the indices of the nodes on the face normal to the axis ('x',
+        'y' or 'z') at -l/2 (side=0) or at l/2 (side=1).
+        '''
+        shape, axes = self.getGridShape()
+        if axis not in axes or side not in [0, 1]:
+            raise ValueError('The face should be an axis among {0} and a side '
+                             '0 or 1.'.format(', '.join(sorted(axes))))
+        return self.getNodeIndex({axis: -side})
+
+    def getFacesIndex(self):
+        '''
+        Return the indices of the nodes of every face in a dictionary with
+        the keys (axis, side), see getFaceIndex.
+        '''
+        faces = {}
+        for axis in sorted(self.getGridShape()[1]):
+            for side in [0, 1]:
+                faces[(axis, side)] = self.getFaceIndex(axis, side)
+        return faces
+
+    def getEdgesIndex(self):
+        '''
+        Return the indices of the nodes on the edges, i.e. the boundary in
+        2D and the vertices in 1D.
+        '''
+        return self.getEndNodesIndex(max(self.geometry.d-1, 1))
+
     def getVerticesIndex(self):
         """
+        Return the indices of the vertices.
         """
-        d = self.geometry.d
-        dic = self.getCellNumPerDim()
-        Nx = dic['Nx']
-        Ny = dic['Ny']
-        Nz = dic['Nz']
-        if d==1:
-            indices = [0, Nx]
-        elif d==2:
-            indices = [0, Nx,
-                      (Nx+1)*(Ny+1)-(Nx+1), (Nx+1)*(Ny+1)-1]
-        else:  #  d==3
-            indices = [0, Nz,
-                      (Nz+1)*(Ny+1)-(Nz+1), (Nz+1)*(Ny+1)-1,
-                      (Nz+1)*(Ny+1), (Nz+1)*(Ny+1)+Nz,
-                      (Nx+1)*(Ny+1)*(Nz+1)-(Nz+1), (Nx+1)*(Ny+1)*(Nz+1)-1]
-        return indices
+        return self.getEndNodesIndex(self.geometry.d)
 
     def getBoundariesIndex(self):
         """
+        Return the indices of the nodes on the boundary. The value is
+        cached.
         """
-        d = self.geometry.d
-        Coords = self.getCoords()
-        x = Coords['x']
-        y = Coords['y']
-        z = Coords['z']
-        a = np.where(np.isclose(x,-self.geometry.lx/2))[0]
-        b = np.where(np.isclose(x,self.geometry.lx/2))[0]
-        indices_x = np.sort(np.concatenate((a,b),0))
-        if d==1:
-            indices = indices_x
-        elif d==2:
-            a = np.where(np.isclose(y,-self.geometry.ly/2))[0]
-            b = np.where(np.isclose(y,self.geometry.ly/2))[0]
-            indices_y = np.sort(np.concatenate((a,b),0))
-            indices = np.unique(np.concatenate((indices_x,indices_y),0))
-        else:  # d==3
-            a = np.where(np.isclose(y,-self.geometry.ly/2))[0]
-            b = np.where(np.isclose(y,self.geometry.ly/2))[0]
-            indices_y = np.sort(np.concatenate((a,b),0))
-            a = np.where(np.isclose(z,-self.geometry.lz/2))[0]
-            b = np.where(np.isclose(z,self.geometry.lz/2))[0]
-            indices_z = np.sort(np.concatenate((a,b),0))
-            indices = np.unique(np.concatenate((indices_x,indices_y,indices_z),0))
-        return indices
+        return self.getCached('boundariesIndex',
+                              lambda: self.getEndNodesIndex(1))
+
+    def getBoundaryMask(self):
+        """
+        Return a boolean array which is True at the nodes on the boundary,
+        mask.reshape(getGridShape()[0]) is its view on the grid. The value
+        is cached.
+        """
+        def computeMask():
+            mask = np.zeros(self.getNumNodes(), dtype=bool)
+            mask[self.getBoundariesIndex()] = True
+            return mask
+        return self.getCached('boundaryMask', computeMask)
 
     def getConnectivity(self):
         '''
-        Return the connectivity used in the VTU format.
+        Return the connectivity used in the VTU format. The value is cached, see
+        computeConnectivity.
+        '''
+        return self.getCached('connectivity', self.computeConnectivity)
+
+    def computeConnectivity(self):
+        '''
+        Return the connectivity used in the VTU format. The first node of
+        every cell is computed from the cell indices by broadcasting, the
+        other nodes are at fixed offsets from it.
         '''
         d = self.geometry.d
         dic = self.getCellNumPerDim()
@@ -228,38 +474,29 @@ class Mesh:
         Ny = dic['Ny']
         Nz = dic['Nz']
         if d == 3:
-            N = Nx*Ny*Nz
-            c = np.zeros([8, N])
-            for i in range(0, Nx):
-                for j in range(0, Ny):
-                    for k in range(0, Nz):
-                        c[0, k+j*Nz+i*Nz*Ny] = k + j*(Nz+1) + i*(Nz+1)*(Ny+1)
-            c[1] = c[0] + 1
-            c[2] = c[0] + (Nz+1)*(Ny+1)
-            c[3] = c[2] + 1
-            c[4] = c[0]+(Nz+1)
-            c[5] = c[4] + 1
-            c[6] = c[4] + (Nz+1)*(Ny+1)
-            c[7] = c[6] + 1
-            c = (np.transpose(c)).astype(int)
+            S = (Nz+1)*(Ny+1)  # stride of x
+            first = (np.arange(Nx, dtype=np.int64)[:, None, None]*S +
+                     np.arange(Ny, dtype=np.int64)[None, :, None]*(Nz+1) +
+                     np.arange(Nz, dtype=np.int64)[None, None, :])
+            offsets = np.array([0, 1, S, S+1, Nz+1, Nz+2, Nz+1+S, Nz+2+S],
+                               dtype=np.int64)
         elif d == 2:
-            N = Nx*Ny  # number of cells
-            c = np.zeros([4, N])
-            for i in range(0, Ny):
-                for j in range(0, Nx):
-                    c[0, j+i*Nx] = j + i*(Nx+1)
-            c[1] = c[0] + 1
-            c[2] = c[0] + (Nx + 1)
-            c[3] = c[2] + 1
-            c = (np.transpose(c)).astype(int)
+            first = (np.arange(Ny, dtype=np.int64)[:, None]*(Nx+1) +
+                     np.arange(Nx, dtype=np.int64)[None, :])
+            offsets = np.array([0, 1, Nx+1, Nx+2], dtype=np.int64)
         else:  # d == 1
-            c = np.zeros([2, Nx])
-            c[0] = np.arange(Nx)
-            c[1] = c[0] + 1
-            c = (np.transpose(c)).astype(int)
-        return c
+            first = np.arange(Nx, dtype=np.int64)
+            offsets = np.array([0, 1], dtype=np.int64)
+        return first.reshape(-1, 1) + offsets
 
     def getOffsets(self):
+        '''
+        Return the offsets used in the VTU format. The value is cached, see
+        computeOffsets.
+        '''
+        return self.getCached('offsets', self.computeOffsets)
+
+    def computeOffsets(self):
         '''
         Return the offsets used in the VTU format.
         '''
@@ -277,6 +514,13 @@ class Mesh:
         return offsets.astype(int)
 
     def getTypes(self):
+        '''
+        Return the cell type used in the VTU format. The value is cached, see
+        computeTypes.
+        '''
+        return self.getCached('types', self.computeTypes)
+
+    def computeTypes(self):
         '''
         Return the cell type used in the VTU format.
         '''
@@ -297,11 +541,19 @@ class Mesh:
         return types.astype(int)
 
     def getSettings(self):
-        '''Return the mesh settings.
+        '''Return the mesh settings, the size or a dictionary with the
+        size, the cells, the grading and the ratio if the cells or the
+        grading are given.
         '''
-        return self.size
+        if self.cells is None and self.grading == 'uniform':
+            return self.size
+        return {'size': self.size, 'cells': self.cells,
+                'grading': self.grading, 'ratio': self.ratio}
 
     def printSettings(self):
         """Return the settings as a string for file I/O
         """
-        return ('Mesh={0}\n'.format(self.size))
\ No newline at end of file
+        if self.cells is None and self.grading == 'uniform':
+            return ('Mesh={0}\n'.format(self.size))
+        return ('Mesh={0}, cells={1}, grading={2}, ratio={3}\n'
+                .format(self.size, self.cells, self.grading, self.ratio))
\ No newline at end of file
@@ -1,6 +1,8 @@
 import configparser
 import ast
 import numbers
+import multiprocessing
+import os
 import numpy as np
 from unipath import Path
 
@@ -12,6 +14,16 @@ from .initial import Initial
 from .source import Source
 from .boundary import Boundary
 from .solution import Solution
+from .series import ModeTables, SeriesStats
+
+
+def computeComponent(term, args):
+    '''Worker of the parallel compute: return term.computeComponent(*args),
+    term being an Initial or a Boundary object, and the diagnostics of the
+    component.
+    '''
+    sol = term.computeComponent(*args)
+    return sol, term.diagnostics.get(['x', 'y', 'z'][args[0]])
 
 
 class Model:
@@ -27,6 +39,7 @@ class Model:
         self.source = Source()
         self.boundary = Boundary()
         self.solution = Solution()
+        self.precision = 'float64'
         # The model class is always initialized reading the configuration file
         self.readConfig()
 
@@ -65,7 +78,7 @@ class Model:
         '''Write the current settings to the configuration file.
         '''
         settings = self.getSettings()
-        Model.writeConfig(settings, self.output)
+        Model.writeConfig(settings, self.output, self.precision)
     
     @staticmethod
     def writeDefaultConfig():
@@ -75,8 +88,10 @@ class Model:
         Model.writeConfig(settings)
 
     @staticmethod
-    def writeConfig(settings, output=DATA_DIR.child("lastSolution.vtu")):
-        '''Write or overwrite config.ini using the provided settings.
+    def writeConfig(settings, output=DATA_DIR.child("lastSolution.vtu"),
+                    precision='float64'):
+        '''Write or overwrite config.ini using the provided settings and the
+        precision of the stored solution, see getDtype.
         '''
         g = settings['geometry']
         m = settings['mesh']
@@ -89,6 +104,10 @@ class Model:
             Config.add_section('File')
             Config.set('File', '# Path to the solution file.')
             Config.set('File', 'path', output)
+            Config.set('File', '# Precision of the stored solution: "float64" or "float32".')
+            Config.set('File', '# The series are always summed in double precision, with "float32"')
+            Config.set('File', '# the solution has a relative error of about 1e-7 (at most 1e-6).')
+            Config.set('File', 'precision', precision)
             Config.add_section('Geometry')
             Config.set('Geometry', '# Set the geometry centered at the origin. The dimension d = 1, 2 or 3')
             Config.set('Geometry', '# l is a vector giving the length of the geometry in meters for each')
@@ -99,7 +118,18 @@ class Model:
             Config.set('Geometry', 'l', '[{0}, {1}, {2}]'.format(g[1],g[2],g[3]))
             Config.add_section('Mesh')
             Config.set('Mesh', '# Set the mesh size: "coarse", "fine" or "normal".')
-            Config.set('Mesh', 'size', str(m))
+            Config.set('Mesh', '# Optional: cells = [Nx, Ny, Nz] sets the number of cells per side')
+            Config.set('Mesh', '# and replaces the size, grading = "uniform", "geometric" or')
+            Config.set('Mesh', '# "chebyshev" clusters the nodes toward the walls, with the cell')
+            Config.set('Mesh', '# sizes growing by "ratio" from the walls for "geometric".')
+            if isinstance(m, dict):
+                Config.set('Mesh', 'size', str(m['size']))
+                if m.get('cells') is not None:
+                    Config.set('Mesh', 'cells', str(list(m['cells'])))
+                Config.set('Mesh', 'grading', str(m.get('grading', 'uniform')))
+                Config.set('Mesh', 'ratio', str(m.get('ratio', 1.2)))
+            else:
+                Config.set('Mesh', 'size', str(m))
             Config.add_section('Material')
             Config.set('Material', '# Set the material properties.')
             Config.set('Material', '# name, e.g. Copper')
@@ -162,22 +192,277 @@ class Model:
             Config.set('Boundary', 'k2', "[{0}, {1}, {2}]".format(bnd[24], bnd[25], bnd[26]))
             Config.write(cfgfile)
 
-    def compute(self):
-        '''Compute: compute the solution.
+    def compute(self, engine=None, rtol=None, workers=None, budget=None,
+                store=None):
+        '''Compute: compute the solution. The series are evaluated by the
+        C++ extension (engine="cxx") or by NumPy (engine="numpy"). If engine
+        equals None, "cxx" is used when the extension is built. If rtol is
+        given, the series are truncated a priori for the relative error rtol.
+        The engine "gemm" evaluates every term with a matrix product of
+        eigenmode tables built once per axis and shared by the terms. The
+        engine "recurrence" generates the sines and the decay factors of the
+        C++ extension by recurrences, it needs rtol or budget. If
+        workers is larger than 1, the (term, axis) components are computed
+        by a pool of workers processes, see computeParallel. If budget is
+        given, it is the absolute accuracy of the solution, half of it is
+        given to the initial term and half to the boundary term, and the
+        number of terms of every component is computed at every time for
+        its share of the budget, see heat.series.getBudgetTolerance. The
+        number of terms and the error estimate of every evaluation are
+        available from getDiagnostics. The terms are stored as separable
+        fields, see heat.solution.Solution. If store is given, the solution
+        is written to the memory-mapped .npy file store and read from it,
+        see heat.solution.Solution.writeStore.
         '''
+        self.checkBudget(budget)
         tArray = self.getTimeList()
         alpha = self.material.getAlpha()
         Coords = self.mesh.getCoords()
         bc = self.boundary.bcType
+        termBudget = None if budget is None else budget/2.0
+        self.initial.diagnostics = {}
+        self.boundary.diagnostics = {}
         # Temporary for testing:
         print('Computing:')
-        initTerm = self.initial.compute(bc, Coords, tArray, alpha)
-        bndTerm = self.boundary.compute(tArray, alpha)
+        if workers is not None and workers > 1:
+            initTerm, bndTerm = self.computeParallel(bc, Coords, tArray, alpha,
+                                                     engine, rtol, workers,
+                                                     termBudget)
+        else:
+            tables = ModeTables()
+            initTerm = self.initial.compute(bc, Coords, tArray, alpha,
+                                            engine=engine, rtol=rtol,
+                                            tables=tables, budget=termBudget,
+                                            separable=True)
+            bndTerm = self.boundary.compute(tArray, alpha, engine=engine,
+                                            rtol=rtol, tables=tables,
+                                            budget=termBudget, separable=True)
         '''
         srcTerm = self.source.compute(bc[0], Coords[dim[0]], tArray, alpha)
         '''
-        sol = initTerm + bndTerm  # + srcTerm
-        self.solution.sol = sol  # np.random.rand(self.mesh.getNumNodes())
+        self.solution.mesh = self.mesh
+        self.solution.setFields([initTerm, bndTerm],
+                                self.getDtype())  # + srcTerm
+        if store is not None:
+            self.solution.writeStore(store)
+
+    def computeChunks(self, chunk=1, engine=None, rtol=None, budget=None):
+        '''Generator computing the solution by blocks of chunk times, see
+        compute for the options. Every item is (start, tArray, sol), sol
+        being the solution (chunk x Nnodes) at the times tArray, which start
+        at the index start of getTimeList. The initial and boundary terms are
+        computed for the block and combined, the memory is bounded by the
+        size of the block. The diagnostics are those of the last block.
+        '''
+        self.checkBudget(budget)
+        if not chunk >= 1:
+            raise ValueError('chunk={0} is not valid, chunk must be larger '
+                             'than 0.'.format(chunk))
+        tArray = self.getTimeList()
+        alpha = self.material.getAlpha()
+        Coords = self.mesh.getCoords()
+        bc = self.boundary.bcType
+        termBudget = None if budget is None else budget/2.0
+        tables = ModeTables()
+        for start in range(0, tArray.size, chunk):
+            t = tArray[start:start+chunk]
+            self.initial.diagnostics = {}
+            self.boundary.diagnostics = {}
+            initTerm = self.initial.compute(bc, Coords, t, alpha,
+                                            engine=engine, rtol=rtol,
+                                            tables=tables, budget=termBudget,
+                                            separable=True)
+            bndTerm = self.boundary.compute(t, alpha, engine=engine,
+                                            rtol=rtol, tables=tables,
+                                            budget=termBudget, separable=True)
+            solution = Solution(self.mesh)
+            solution.setFields([initTerm, bndTerm], self.getDtype())
+            yield start, t, solution.toArray()
+
+    def computeSteady(self):
+        '''Compute only the steady-state solution with the closed forms of
+        the initial and boundary terms. The solution has a single row.
+        '''
+        Coords = self.mesh.getCoords()
+        bc = self.boundary.bcType
+        print('Computing the steady state:')
+        initTerm = self.initial.computeSteady(bc, Coords)
+        bndTerm = self.boundary.computeSteady(Coords)
+        sol = initTerm + bndTerm
+        self.solution.mesh = self.mesh
+        self.solution.setSolution(sol.reshape(1, -1).astype(self.getDtype()))
+
+    def getDtype(self):
+        '''Return the type of the stored solution, np.float32 if the
+        precision is "float32", np.float64 otherwise. The series are summed
+        in double precision in both cases, the terms and the solution are
+        then rounded to single precision, i.e. a relative error of about
+        1e-7 (at most 1e-6) of the values.
+        '''
+        return np.float32 if self.precision == 'float32' else np.float64
+
+    def checkBudget(self, budget):
+        '''Check the accuracy budget is None or positive.
+        '''
+        if budget is not None and not budget > 0.0:
+            raise ValueError('budget={0} is not valid, budget must be '
+                             'positive.'.format(budget))
+        return True
+
+    def getDiagnostics(self):
+        '''Return the diagnostics of the last compute as a dictionary with
+        the keys (term, axis), e.g. ('initial', 'x'). Every value is a
+        dictionary with the positions 'x' along the axis, the times 't', the
+        number of terms 'nIt' and the error estimate 'err' of every sum, the
+        arrays having one row per time as the batch evaluation, and the
+        convergence statistics 'stats'. nIt equals nMax+1 where the maximum
+        number of iterations was reached.
+        '''
+        diagnostics = {}
+        for term in ['initial', 'boundary']:
+            for axis, diag in getattr(self, term).diagnostics.items():
+                diagnostics[(term, axis)] = diag
+        return diagnostics
+
+    def getStats(self):
+        '''Return the convergence statistics of the last compute, one
+        heat.series.SeriesStats object per (term, axis) and their sum with
+        the key 'total'.
+        '''
+        stats = {'total': SeriesStats()}
+        for key, diag in self.getDiagnostics().items():
+            stats[key] = diag['stats']
+            stats['total'].merge(diag['stats'])
+        return stats
+
+    def probe(self, points, times=None, engine=None, rtol=None, budget=None):
+        '''Return the solution (Nt x Np) at the points, an array (Np x d) of
+        coordinates (x, y, z) which need not be nodes of the mesh, and at the
+        times, the times of getTimeList by default. The series are evaluated
+        only at the distinct coordinates of the points on every axis and the
+        terms are combined point by point, the cost does not depend on the
+        mesh. The options are those of compute.
+        '''
+        self.checkBudget(budget)
+        points = self.checkPoints(points)
+        if times is None:
+            tArray = self.getTimeList()
+        else:
+            tArray = np.atleast_1d(np.asarray(times, dtype=float))
+        alpha = self.material.getAlpha()
+        bc = self.boundary.bcType
+        termBudget = None if budget is None else budget/2.0
+        tol = 1e-20
+        tables = ModeTables()
+        dim = ['x', 'y', 'z']
+        axisCoords = {}
+        inverse = {}
+        for d in range(0, self.geometry.d):
+            axisCoords[dim[d]], inverse[dim[d]] = np.unique(
+                points[:, d], return_inverse=True)
+        init = {}
+        bnd = {}
+        for d in range(0, self.geometry.d):
+            sol = self.initial.computeComponent(d, bc, axisCoords, tArray,
+                                                alpha, tol, engine, rtol,
+                                                tables, termBudget, True)
+            init[dim[d]] = sol[:, inverse[dim[d]]]
+            sol = self.boundary.computeComponent(d, axisCoords, tArray, alpha,
+                                                 tol, engine, rtol, tables,
+                                                 termBudget, True)
+            bnd[dim[d]] = sol[:, inverse[dim[d]]]
+        return self.initial.getSolution(init) + self.boundary.getSolution(bnd)
+
+    def probeToFile(self, filename, points, times=None, chunk=100,
+                    engine=None, rtol=None, budget=None):
+        '''Compute the solution at the points and the times as probe and
+        write it to filename (.csv or .npy) by chunks of chunk times, the
+        whole solution is never stored. Every row holds the time followed by
+        the values at the points.
+        '''
+        extension = os.path.splitext(filename)[1]
+        if extension not in ['.csv', '.npy']:
+            raise ValueError('The probe file should be a .csv or a .npy file. '
+                             'The file "{0}" is not valid.'.format(filename))
+        points = self.checkPoints(points)
+        if times is None:
+            tArray = self.getTimeList()
+        else:
+            tArray = np.atleast_1d(np.asarray(times, dtype=float))
+        shape = (tArray.size, points.shape[0]+1)
+        if extension == '.npy':
+            out = np.lib.format.open_memmap(filename, mode='w+',
+                                            dtype=np.float64, shape=shape)
+        else:
+            out = open(filename, 'w')
+            out.write(','.join(['t'] + ['p{0}'.format(i) for i in
+                                        range(0, points.shape[0])]) + '\n')
+        try:
+            for start in range(0, tArray.size, chunk):
+                t = tArray[start:start+chunk]
+                rows = np.column_stack((t, self.probe(points, t, engine, rtol,
+                                                      budget)))
+                if extension == '.npy':
+                    out[start:start+t.size] = rows
+                else:
+                    np.savetxt(out, rows, delimiter=',')
+        finally:
+            if extension == '.npy':
+                out.flush()
+                del out
+            else:
+                out.close()
+
+    def checkPoints(self, points):
+        '''Return the points as an array (Np x d) and check they are in the
+        geometry.
+        '''
+        d = self.geometry.d
+        points = np.asarray(points, dtype=float)
+        points = points.reshape(-1, 1) if points.ndim < 2 and d == 1 else points
+        points = np.atleast_2d(points)
+        if points.shape[1] < d:
+            raise ValueError('The points must have {0} coordinates.'.format(d))
+        ls = [self.geometry.lx, self.geometry.ly, self.geometry.lz]
+        for i in range(0, d):
+            if np.any(np.abs(points[:, i]) > ls[i]/2.0):
+                raise ValueError('The points must be in the geometry, the '
+                                 'coordinates are between -l/2 and l/2.')
+        return points[:, :d]
+
+    def computeParallel(self, bc, Coords, tArray, alpha, engine, rtol,
+                        workers, budget=None):
+        '''Compute the initial and boundary terms with a pool of workers
+        processes, one job per (term, axis). The series objects are built in
+        the workers from the node and params dictionaries and the results are
+        assembled in the parent, the terms are then identical to the serial
+        computation. The eigenmode tables of the engine "gemm" are built
+        once per job. The terms are returned as separable fields.
+        '''
+        dim = ['x', 'y', 'z']
+        tol = 1e-20
+        axisCoords = self.mesh.getAxisCoords()
+        pool = multiprocessing.Pool(workers)
+        try:
+            jobs = []
+            for d in range(0, self.mesh.geometry.d):
+                args = (d, bc, axisCoords, tArray, alpha, tol, engine, rtol,
+                        None, budget, True)
+                jobs.append(('initial', d, pool.apply_async(
+                    computeComponent, (self.initial, args))))
+                args = (d, axisCoords, tArray, alpha, tol, engine, rtol,
+                        None, budget, True)
+                jobs.append(('boundary', d, pool.apply_async(
+                    computeComponent, (self.boundary, args))))
+            sol = {'initial': {}, 'boundary': {}}
+            for term, d, job in jobs:
+                sol[term][dim[d]], diag = job.get()
+                getattr(self, term).diagnostics[dim[d]] = diag
+        finally:
+            pool.close()
+            pool.join()
+        return (self.initial.getSeparableSolution(sol['initial']),
+                self.boundary.getSeparableSolution(sol['boundary']))
 
     def getTimeList(self, coeff=16040.0, length=101):
         '''Return the simulation time list
@@ -221,7 +506,8 @@ class Model:
                 self.validateBoundary(Config, section, options)
                 opt[5] = True
             elif section=='File':
-                pass
+                options = Config.options(section)
+                self.validateFile(Config, section, options)
             else:
                 raise ValueError('Configuration file: [{0}] is not valid section.'.format(section))
         if False in opt:
@@ -263,24 +549,42 @@ class Model:
                              .format(section))
 
 
+    def validateFile(self, Config, section, options):
+        """Initilize the precision attribute
+        """
+        for option in options:
+            if not (option=='path' or option=='precision'):
+                raise ValueError('Configuration file [{0}]: "{1}"" is not a valid option.'
+                                 .format(section, option))
+        if 'precision' in options:
+            precision = Config.get(section, 'precision')
+            if precision not in ['float64', 'float32']:
+                raise ValueError('Configuration file [{0}]: The precision should be '
+                                 '"float64" or "float32".'.format(section))
+            self.precision = precision
+
     def validateMesh(self, Config, section, options):
         """Initilize the mesh attribute
         """
         dic = {}
         for option in options:
-            if not (option=='size'):
+            if not (option=='size' or option=='cells' or option=='grading' or
+                    option=='ratio'):
                 raise ValueError('Configuration file [{0}]: "{1}"" is not a valid option.'
                                  .format(section, option))
             try:
-                dic[option] = Config.get(section, option)
+                if option=='cells' or option=='ratio':
+                    dic[option] = ast.literal_eval(Config.get(section, option))
+                else:
+                    dic[option] = Config.get(section, option)
             except:
                 raise ValueError("Congiguration file [{0}]: exception on {1}."
                                  .format(section, option))
-        try:
-            self.mesh = Mesh(dic['size'], self.geometry)
-        except:
+        if not 'size' in dic:
             raise ValueError('Configuration file [{0}]: One or more options is missing.'
                              .format(section))
+        self.mesh = Mesh(dic['size'], self.geometry, dic.get('cells'),
+                         dic.get('grading', 'uniform'), dic.get('ratio', 1.2))
 
     def validateMaterial(self, Config, section, options):
         """Initilize the material attribute
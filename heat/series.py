@@ -0,0 +1,689 @@
+"""Vectorized evaluation of the series defined in the C++ class Uniform.
+
+The transient expressions for the Dirichlet boundary conditions are sums of
+c_n*sin(k_n*x)*exp(-alpha*k_n^2*t). The class VectorizedUniform evaluates
+them with NumPy as a broadcast over (n, t, x) blocks and exposes the same
+interface as heat.wrapper.Uniform for the batch evaluation. It doesn't need
+the Cython extension. The class TabulatedUniform factors the sum into the
+eigenmode tables S (modes x nodes) and E (modes x times) shared by the terms
+through a ModeTables cache and evaluates it with a single matrix product.
+"""
+import numpy as np
+try:
+    from .wrapper import Uniform, RecurrenceUniform
+except ImportError:  # The Cython extension is not built.
+    Uniform = None
+    RecurrenceUniform = None
+
+ENGINES = ['cxx', 'numpy', 'gemm', 'recurrence']
+DEFAULT_ENGINE = 'cxx' if Uniform is not None else 'numpy'
+# Relative tolerance of the wall coordinates, as WALLTOL in Utils.h.
+WALLTOL = 1e-12
+
+
+def createUniform(engine, d1, bc, term, d2, axis, baxis, tables=None):
+    """Return a series object for the engine "cxx" (heat.wrapper.Uniform),
+    "numpy" (VectorizedUniform), "gemm" (TabulatedUniform) or "recurrence"
+    (heat.wrapper.RecurrenceUniform). If engine equals None, use the default
+    engine, i.e. "cxx" if the Cython extension is built and "numpy"
+    otherwise. The eigenmode tables of the engine "gemm" are taken from the
+    ModeTables object tables, a new cache is created if tables equals None.
+    The engine "recurrence" only evaluates truncated sums, i.e. it needs
+    rtol or budget.
+    """
+    if engine is None:
+        engine = DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError('engine={0} is not a valid option, choose one of '
+                         'the following options: {1}.'
+                         .format(engine, ', '.join(ENGINES)))
+    if engine in ['cxx', 'recurrence']:
+        if Uniform is None:
+            raise ImportError('The engine "{0}" requires the Cython '
+                              'extension heat.wrapper, use the engine '
+                              '"numpy" or build the extension.'
+                              .format(engine))
+        if engine == 'recurrence':
+            return RecurrenceUniform(d1, bc, term, d2, axis, baxis)
+        return Uniform(d1, bc, term, d2, axis, baxis)
+    if engine == 'gemm':
+        return TabulatedUniform(d1, bc, term, d2, axis, baxis, tables)
+    return VectorizedUniform(d1, bc, term, d2, axis, baxis)
+
+
+class SeriesStats:
+    """Convergence statistics of the series evaluations, see
+    ComputeSeries::getStats: the number of sums nSums, the total number of
+    terms nTerms, the number of sums nMaxIt which reached the maximum number
+    of iterations and the largest error estimate maxErr.
+    """
+    def __init__(self, nSums=0, nTerms=0, nMaxIt=0, maxErr=0.0):
+        self.nSums = int(nSums)
+        self.nTerms = int(nTerms)
+        self.nMaxIt = int(nMaxIt)
+        self.maxErr = float(maxErr)
+
+    def add(self, nSums, nTerms, nMaxIt, maxErr):
+        """Add the statistics of other evaluations.
+        """
+        self.nSums += int(nSums)
+        self.nTerms += int(nTerms)
+        self.nMaxIt += int(nMaxIt)
+        self.maxErr = max(self.maxErr, float(maxErr))
+
+    def merge(self, other):
+        """Add the statistics of the SeriesStats object other.
+        """
+        self.add(**other.asDict())
+
+    def asDict(self):
+        """Return the statistics as a dictionary, see getStats.
+        """
+        return {'nSums': self.nSums, 'nTerms': self.nTerms,
+                'nMaxIt': self.nMaxIt, 'maxErr': self.maxErr}
+
+    def __repr__(self):
+        return ('{0} sums, {1} terms, {2} reached nMax, max error {3:.3g}'
+                .format(self.nSums, self.nTerms, self.nMaxIt, self.maxErr))
+
+
+class SeriesTerm:
+    """Evaluation of the components of a term of the solution with the
+    batch methods of the series objects, see createUniform. The terms
+    heat.initial.Initial and heat.boundary.Boundary derive from this class,
+    they define the attributes mesh and diagnostics.
+    """
+    def getSolutionComponent3D(self, u, xArray, tArray, tol, component, term,
+                               rtol=None):
+        """Evaluate the series on the line of nodes along the component axis
+        and copy the values to every node, see heat.mesh.Mesh.expandAxis.
+        """
+        d = ['x', 'y', 'z'].index(component)
+        subXArray = np.take(xArray, self.mesh.getAxisIndex(d))
+        sol = self.getSolutionComponent(u, subXArray, tArray, tol, component, term, rtol)
+        return self.mesh.expandAxis(d, sol)
+
+    def getSolutionComponent2D(self, u, xArray, tArray, tol, component, term,
+                               rtol=None):
+        """See getSolutionComponent3D.
+        """
+        return self.getSolutionComponent3D(u, xArray, tArray, tol, component,
+                                           term, rtol)
+
+    def getSolutionComponent(self, u, xArray, tArray, tol, component, term,
+                             rtol=None):
+        """Evaluate the series for every time and position in a single call
+        to the batch evaluation, one row per time. The series give the
+        transient part of the term for t > 0, the steady state of
+        getSteadyComponent is added to these rows. The number of terms and
+        the error estimate of every sum are stored in the dictionary
+        diagnostics[component] with the positions, the times and the
+        convergence statistics 'stats' of the evaluation, which are reported
+        once per component.
+        """
+        u.resetStats()
+        if rtol is None:
+            sol, nIt, err = u.getSumForwardArray(xArray, tArray, tol,
+                                                 diagnostics=True)
+        else:
+            sol, nIt, err = u.getSumTruncatedArray(xArray, tArray, rtol,
+                                                   diagnostics=True)
+        stats = SeriesStats(**u.getStats())
+        print('{0} term, {1}-contribution: {2}'.format(term, component, stats))
+        self.diagnostics[component] = {'x': np.asarray(xArray), 't': tArray,
+                                       'nIt': nIt, 'err': err,
+                                       'stats': stats}
+        sol[np.asarray(tArray).ravel() > 0.0] += self.getSteadyComponent(u, xArray)
+        sol[sol<1e-3] = 0.0
+        return sol
+
+    def getSteadyComponent(self, u, xArray):
+        """Return the steady state of the component at the positions xArray,
+        it is zero unless the term overrides this method.
+        """
+        return 0.0
+
+
+class VectorizedUniform:
+    """NumPy version of the C++ class Uniform for the batch evaluation.
+
+    The sum over the modes is evaluated in blocks of at most blockSize
+    elements of the (n, t, x) space to bound the memory. The modes are
+    added by chunks until the envelope |c_n|*exp(-alpha*k_n^2*t) of every
+    term in the chunk is below tol. The results match the forward summation
+    of the C++ class to a relative tolerance of 1e-5 (absolute 1e-6 for
+    values close to zero). The differences come from the forward summation
+    which stops on the first term below tol, i.e. too early when
+    sin(k_n*x) is close to zero. Unlike the C++ class, the truncated sum
+    always uses the eigenfunction series, the method of images isn't
+    available since NumPy has no vectorized erfc.
+    """
+    def __init__(self, d1, bc, term, d2, axis, baxis, nChunk=32,
+                 blockSize=2**22):
+        if bc not in ['d', 'n', 'r', 'm1', 'm2']:
+            raise ValueError("Invalid BC type, you must choose one of the "
+                             "following options: 'd', 'n', 'r', 'm1' or "
+                             "'m2'. BC={0} is not a valid option."
+                             .format(bc))
+        if term not in ['initial', 'source', 'boundary']:
+            raise ValueError("Invalid Term type, you must choose one of the "
+                             "following options: 'initial', 'source' or "
+                             "'boundary'. TERM={0} is not a valid option."
+                             .format(term))
+        for a in [axis, baxis]:
+            if a not in ['x', 'y', 'z']:
+                raise ValueError("Invalid axis, you must choose one of the "
+                                 "following options: 'x', 'y' or 'z'. "
+                                 "AXIS={0} is not a valid option."
+                                 .format(a))
+        self.nd = dict(d1)
+        self.bc = bc
+        self.term = term
+        self.params = dict(d2)
+        self.axis = axis
+        self.baxis = baxis
+        self.nChunk = nChunk
+        self.blockSize = blockSize
+        self.stats = SeriesStats()
+
+    def getStats(self):
+        """Get the convergence statistics of the batch evaluations since the
+        creation of the instance or the last call to resetStats, see
+        SeriesStats.
+        """
+        return self.stats.asDict()
+
+    def resetStats(self):
+        """Reset the convergence statistics to zero.
+        """
+        self.stats = SeriesStats()
+
+    def setTime(self, t):
+        """Set the time for the series evaluation.
+        """
+        self.nd['t'] = t
+
+    def setXPosition(self, x):
+        """Set the position for the series evaluation.
+        """
+        self.nd['x'] = x
+
+    def setAlpha(self, alpha):
+        """Set the thermal diffusivity for the series evaluation.
+        """
+        self.nd['alpha'] = alpha
+
+    def setLength(self, l):
+        """Set the side length for the series evaluation.
+        """
+        self.nd['l'] = l
+
+    def getNode(self):
+        """Get the node dictionary.
+        """
+        return dict(self.nd)
+
+    def getBcType(self):
+        """Get the boundary condition type.
+        """
+        return self.bc
+
+    def getTermType(self):
+        """Get the term type.
+        """
+        return self.term
+
+    def getParams(self):
+        """Get the params dictionary.
+        """
+        return dict(self.params)
+
+    def getCoefficients(self, n):
+        """Return the coefficients c_n and the wave numbers k_n of the
+        transient expression for the mode indices n (n starts from 0).
+        """
+        dim = float(self.nd['dim'])
+        l = self.nd['l']
+        p = self.params
+        odd = 2.0*n+1.0
+        with np.errstate(invalid='ignore'):
+            if self.term == 'initial':
+                c = np.power(np.float64(p['a0']), 1.0/dim)*(2.0/np.pi)*2.0/odd
+                k = odd*np.pi/l
+            elif self.term == 'boundary':
+                scale = 2.0/(np.pi*np.power(dim, 1.0/dim))
+                if self.axis == self.baxis:
+                    sign = np.where(n % 2 == 0, -1.0, 1.0)  # (-1)^(n+1)
+                    c = scale/(n+1.0)*(sign*p['a2']-p['a1'])
+                    k = (n+1.0)*np.pi/l
+                else:
+                    c = scale*2.0/odd
+                    k = odd*np.pi/l
+            else:  # source
+                c = 2.0*np.power(np.float64(self.getSourceAmplitude()),
+                                 1.0/dim)
+                if self.axis == 'x':
+                    c = c*2.0/odd**3
+                else:
+                    c = c*2.0/odd
+                k = odd*np.pi/l
+        return c*np.ones_like(k), k
+
+    def getSourceAmplitude(self):
+        """Return the constant aini of the source term.
+        """
+        dim = float(self.nd['dim'])
+        return (self.params['a0']*self.nd['l']**2 /
+                (dim*self.nd['alpha']*np.pi**(2.0+dim)))
+
+    def isOnWall(self, xs):
+        """Return True where the positions xs are on the walls of the axis.
+        """
+        l = self.nd['l']
+        return (xs <= WALLTOL*l) | (xs >= (1.0-WALLTOL)*l)
+
+    def getInitialValue(self, xs):
+        """Return the value of the series at t = 0 for the positions xs.
+        """
+        dim = float(self.nd['dim'])
+        l = self.nd['l']
+        p = self.params
+        out = np.zeros(xs.size)
+        with np.errstate(invalid='ignore'):
+            if self.term == 'initial':
+                out[:] = np.power(np.float64(p['a0']), 1.0/dim)
+            elif self.term == 'boundary':
+                a2 = np.power(np.float64(p['a2']), 1.0/dim)
+                out[xs>=(1.0-WALLTOL)*l] = a2
+                out[xs<=WALLTOL*l] = np.power(np.float64(p['a1']), 1.0/dim)
+            else:  # source
+                out[:] = 2.0*np.power(np.float64(self.getSourceAmplitude()),
+                                      1.0/dim)
+        return out
+
+    def getSteadyTimes(self, tArray, tol):
+        """Return True for the times of tArray at which the transient
+        expression is below tol, see Uniform::isSteadyTime. The sum is
+        bounded by cmax*exp(-tau*q^2)/(1-exp(-2*p*tau*q)) where cmax is the
+        largest coefficient and tau = alpha*pi^2*t/l^2.
+        """
+        ts = np.asarray(tArray, dtype=np.float64)
+        if self.bc != 'd':
+            return np.zeros(ts.shape, dtype=bool)
+        return (ts > 0.0) & (self.getTailBound(ts, 0) <= tol)
+
+    def getMaxCoefficient(self):
+        """Return the largest absolute value of the coefficients c_n.
+        """
+        c, k = self.getCoefficients(np.arange(0.0, 2.0))
+        return float(np.max(np.abs(c)))
+
+    def getTailBound(self, tArray, nTerms):
+        """Return the bound of the sum of the terms from the index nTerms
+        for every time of tArray, see Uniform::getTailBound. nTerms is an
+        integer or an array with the shape of tArray. The bound is 0.0 at
+        t = 0 and for the boundary conditions other than Dirichlet.
+        """
+        ts = np.asarray(tArray, dtype=np.float64)
+        bound = np.zeros(ts.shape)
+        if self.bc != 'd':
+            return bound
+        p, q = self.getWaveNumberIndex()
+        m = p*np.asarray(nTerms, dtype=np.float64)+q
+        tau = self.nd['alpha']*np.pi**2*ts/self.nd['l']**2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b = (self.getMaxCoefficient()*np.exp(-tau*m*m) /
+                 (1.0-np.exp(-2.0*p*tau*m)))
+        return np.where(ts > 0.0, b, bound)
+
+    def isSteadyTime(self, tol):
+        """Return True if the transient expression is below tol at the time
+        of the node, i.e. if the solution equals its steady state.
+        """
+        return bool(self.getSteadyTimes(self.nd['t'], tol))
+
+    def getSteadyStateDirichletArray(self, xArray):
+        """Return the closed-form steady state of the term at the positions
+        xArray along the axis, see Uniform::getSteadyStateDirichlet. The
+        coordinates along the other axes are the ones of the node.
+        """
+        xs = np.asarray(xArray, dtype=np.float64)
+        dim = self.nd['dim']
+        l = self.nd['l']
+        p = self.params
+        pos = {}
+        for a in ['x', 'y', 'z']:
+            pos[a] = np.full(xs.shape, float(self.nd[a]))
+        pos[self.axis] = xs
+        if self.term == 'initial':
+            # The steady-state solution is always zero for the initial term.
+            return np.zeros(xs.shape)
+        elif self.term == 'boundary':
+            return 1.0/dim*(p['a1']+(p['a2']-p['a1'])*pos[self.baxis]/l)
+        inside = np.ones(xs.shape, dtype=bool)
+        for a in ['x', 'y', 'z'][:dim]:
+            inside &= ~self.isOnWall(pos[a])
+        alpha = self.nd['alpha']
+        if dim == 1:
+            x = pos['x']/l*np.pi
+            # sum sin(n*x)/n^3 and sum (-1)^n*sin(n*x)/n^3 for 0 <= x <= pi
+            sinn3 = (2.0*np.pi**2*x-3.0*np.pi*x**2+x**3)/12.0
+            altsinn3 = (x**3-np.pi**2*x)/12.0
+            sol = 2.0*p['a0']*l**2/(np.pi**3*alpha)*(sinn3-altsinn3)
+        elif dim == 2:
+            sol = np.full(xs.shape, p['a0']*l**2/(12.0*alpha))
+        else:
+            sol = np.full(xs.shape, 2.0*p['a0']*l**2/(27.0*alpha))
+        return np.where(inside, sol, 0.0)
+
+    def getWaveNumberIndex(self):
+        """Return (p, q) such that the wave numbers are k_n = (p*n+q)*pi/l.
+        """
+        if self.term == 'boundary' and self.axis == self.baxis:
+            return 1.0, 1.0
+        return 2.0, 1.0
+
+    def getNumberOfTerms(self, rtol, nMax=None):
+        """Get the number of terms needed to reach the relative error rtol
+        at the time of the node, see getNumberOfTerms.
+        """
+        if nMax is None:
+            nMax = 50000
+        p, q = self.getWaveNumberIndex()
+        return int(getNumberOfTerms(self.nd['t'], self.nd['alpha'],
+                                    self.nd['l'], rtol, nMax, p, q))
+
+    def getSumForwardArray(self, xArray, tArray, tol, nMax=None, alpha=None,
+                           l=None, diagnostics=False):
+        """Get the sum for every pair of time and position as a float64
+        array of shape (tArray.size, xArray.size), i.e. one row per time.
+        If alpha or l are given they replace the values of the node for this
+        evaluation only. If nMax equals None, use nMax = 50000. If
+        diagnostics is True, return the tuple (sum, nIt, err), see
+        getSumArray.
+        """
+        return self.getSumArrayAt(alpha, l, xArray, tArray, tol, None, nMax,
+                                  diagnostics)
+
+    def getSumTruncatedArray(self, xArray, tArray, rtol, nMax=None,
+                             alpha=None, l=None, diagnostics=False):
+        """Get the truncated sum for every pair of time and position, see
+        getSumForwardArray. The number of terms is computed once per time
+        for the relative error rtol.
+        """
+        return self.getSumArrayAt(alpha, l, xArray, tArray, None, rtol, nMax,
+                                  diagnostics)
+
+    def getSumArrayAt(self, alpha, l, xArray, tArray, tol, rtol, nMax,
+                      diagnostics=False):
+        """Evaluate getSumArray with the diffusivity alpha and the length l
+        if they are given. The values of the node are restored afterwards.
+        """
+        alpha0 = self.nd['alpha']
+        l0 = self.nd['l']
+        if alpha is not None:
+            self.setAlpha(alpha)
+        if l is not None:
+            self.setLength(l)
+        try:
+            return self.getSumArray(xArray, tArray, tol, rtol, nMax,
+                                    diagnostics)
+        finally:
+            self.setAlpha(alpha0)
+            self.setLength(l0)
+
+    def getSumArray(self, xArray, tArray, tol, rtol, nMax, diagnostics=False):
+        """Evaluate the sum by blocks. If rtol equals None, the modes are
+        added until the envelope of the terms is below tol, otherwise the
+        number of terms is computed a priori for every time. If diagnostics
+        is True, also return the number of terms nIt and the error estimate
+        err of every sum, i.e. the bound of the tail of the series, with the
+        same shape as the sum. The terms are counted per time, nIt is
+        nMax+1 where the maximum was reached.
+        """
+        if nMax is None:
+            nMax = 50000
+        xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        ts = np.ascontiguousarray(tArray, dtype=np.float64).ravel()
+        out = np.zeros((ts.size, xs.size))
+        nIt = np.zeros(ts.size, dtype=np.intc)
+        if self.bc != 'd' or xs.size == 0 or ts.size == 0:
+            # Only the Dirichlet expressions are defined.
+            return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+        p = self.params
+        if (self.term == 'boundary' and p['a1'] == 0.0 and
+                p['a2'] == 0.0):
+            return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+        l = self.nd['l']
+        alpha = self.nd['alpha']
+        zero = ts == 0.0
+        out[zero] = self.getInitialValue(xs)
+        nIt[zero] = 1
+        nTerms = None
+        if rtol is not None:
+            rows = np.where(~zero)[0]
+            nTerms = getNumberOfTerms(ts, alpha, l, rtol, nMax,
+                                      *self.getWaveNumberIndex())
+            nIt[rows] = nTerms[rows]
+        else:
+            # Every mode has decayed at the steady times, the sum is 0.0
+            rows = np.where(~zero & ~self.getSteadyTimes(ts, tol))[0]
+        bt = max(1, self.blockSize//(self.nChunk*xs.size))
+        for start in range(0, rows.size, bt):
+            block = rows[start:start+bt]
+            tb = ts[block]
+            tmin = np.min(tb)
+            nEnd = nMax+1
+            if nTerms is not None:
+                nEnd = np.max(nTerms[block])
+            n0 = 0
+            while n0 < nEnd:
+                n = np.arange(n0, min(n0+self.nChunk, nEnd),
+                              dtype=np.float64)
+                c, k = self.getCoefficients(n)
+                E = np.exp(-alpha*np.outer(k**2, tb))  # (n, t)
+                if nTerms is not None:
+                    # Skip the modes beyond the count of each time
+                    E[n[:, None] >= nTerms[block][None, :]] = 0.0
+                S = np.sin(np.outer(k, xs))  # (n, x)
+                out[block] += np.sum((c[:, None]*E)[:, :, None] *
+                                     S[:, None, :], axis=0)
+                n0 = n0 + n.size
+                if (nTerms is None and
+                        np.max(np.abs(c)*np.exp(-alpha*k**2*tmin)) <= tol):
+                    break
+            if nTerms is None:
+                nIt[block] = n0
+        if self.term != 'boundary':
+            # At the boundaries, the exact solution is 0.0
+            out[:, self.isOnWall(xs)] = 0.0
+        return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+
+    def getDiagnostics(self, out, ts, nIt, nMax, diagnostics):
+        """Add the sums to the statistics and return out, or the tuple
+        (out, nIt, err) if diagnostics is True. nIt is the number of terms
+        at every time of ts, it is broadcast to the shape of out with the
+        bound of the tail err. The rows without terms aren't sums.
+        """
+        err = self.getTailBound(ts, nIt)
+        nx = out.shape[1]
+        summed = nIt > 0
+        self.stats.add(np.count_nonzero(summed)*nx, np.sum(nIt)*nx,
+                       np.count_nonzero(nIt > nMax)*nx,
+                       np.max(err[summed]) if np.any(summed) else 0.0)
+        if not diagnostics:
+            return out
+        return (out, np.repeat(nIt[:, None], nx, axis=1),
+                np.repeat(err[:, None], nx, axis=1))
+
+
+class ModeTables:
+    """Cache of the eigenmode tables of the Dirichlet series.
+
+    For the positions xs, the times ts, the diffusivity alpha and the length
+    l, the tables are S[m-1, i] = sin(k_m*xs[i]) and
+    E[m-1, j] = exp(-alpha*k_m^2*ts[j]) with k_m = m*pi/l, m = 1, 2, ...
+    The wave numbers of every term are a subset of the k_m, the tables of an
+    axis are then built once and shared by the initial and boundary terms.
+    A table is rebuilt only if more modes are requested.
+    """
+    def __init__(self):
+        self.tables = {}
+
+    def getKey(self, xs, ts, alpha, l):
+        """Return the key of the tables in the cache.
+        """
+        return (xs.tobytes(), ts.tobytes(), float(alpha), float(l))
+
+    def getTables(self, xs, ts, alpha, l, nModes):
+        """Return the tables S and E of the nModes first modes, see
+        ModeTables.
+        """
+        key = self.getKey(xs, ts, alpha, l)
+        S, E = self.tables.get(key, (None, None))
+        if S is None or S.shape[0] < nModes:
+            k = np.arange(1.0, nModes+1.0)*np.pi/l
+            S = np.sin(np.outer(k, xs))
+            E = np.exp(-alpha*np.outer(k**2, ts))
+            self.tables[key] = (S, E)
+        return S[:nModes], E[:nModes]
+
+    def getNumberOfTables(self):
+        """Return the number of (S, E) pairs in the cache.
+        """
+        return len(self.tables)
+
+    def clear(self):
+        """Remove every table from the cache.
+        """
+        self.tables = {}
+
+
+class TabulatedUniform(VectorizedUniform):
+    """Matrix product version of the C++ class Uniform for the batch
+    evaluation.
+
+    The sum over the modes of c_n*sin(k_n*x_i)*exp(-alpha*k_n^2*t_j) is the
+    matrix product E^T*diag(c)*S of the eigenmode tables, see ModeTables.
+    The number of modes is fixed for the smallest positive time, either from
+    the envelope |c_n|*exp(-alpha*k_n^2*t) <= tol or a priori for the
+    relative error rtol, and used for every time. The later times then get
+    more terms than needed, which only adds negligible terms.
+    """
+    def __init__(self, d1, bc, term, d2, axis, baxis, tables=None):
+        VectorizedUniform.__init__(self, d1, bc, term, d2, axis, baxis)
+        if tables is None:
+            tables = ModeTables()
+        self.tables = tables
+
+    def getNumberOfModes(self, tmin, tol, rtol, nMax):
+        """Return the number of terms of the series for the smallest positive
+        time tmin.
+        """
+        l = self.nd['l']
+        alpha = self.nd['alpha']
+        p, q = self.getWaveNumberIndex()
+        if rtol is not None:
+            return int(getNumberOfTerms(tmin, alpha, l, rtol, nMax, p, q))
+        cmax = self.getMaxCoefficient()
+        if cmax <= tol:
+            return 1
+        # Smallest wave number with cmax*exp(-alpha*k^2*tmin) <= tol
+        kmax = np.sqrt(np.log(cmax/tol)/(alpha*tmin))
+        n = np.ceil((kmax*l/np.pi-q)/p)+1.0
+        return int(min(max(n, 1.0), nMax+1.0))
+
+    def getSumArray(self, xArray, tArray, tol, rtol, nMax, diagnostics=False):
+        """Evaluate the sum with a single matrix product. If rtol equals
+        None, the number of terms is given by the envelope of the terms and
+        tol, otherwise it is computed a priori for the relative error rtol.
+        The diagnostics are the ones of VectorizedUniform.getSumArray.
+        """
+        if nMax is None:
+            nMax = 50000
+        xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        ts = np.ascontiguousarray(tArray, dtype=np.float64).ravel()
+        out = np.zeros((ts.size, xs.size))
+        nIt = np.zeros(ts.size, dtype=np.intc)
+        if self.bc != 'd' or xs.size == 0 or ts.size == 0:
+            # Only the Dirichlet expressions are defined.
+            return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+        p = self.params
+        if (self.term == 'boundary' and p['a1'] == 0.0 and
+                p['a2'] == 0.0):
+            return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+        l = self.nd['l']
+        alpha = self.nd['alpha']
+        zero = ts == 0.0
+        if rtol is None:
+            # Every mode has decayed at the steady times, the sum is 0.0
+            steady = self.getSteadyTimes(ts, tol)
+        else:
+            steady = np.zeros(ts.shape, dtype=bool)
+        # With rtol, no term is needed at the steady times, nTerms is 0
+        nTerms = 0
+        if not np.all(zero | steady):
+            nTerms = self.getNumberOfModes(np.min(ts[~zero & ~steady]), tol,
+                                           rtol, nMax)
+        if nTerms > 0:
+            pn, qn = self.getWaveNumberIndex()
+            n = np.arange(0.0, nTerms)
+            c, k = self.getCoefficients(n)
+            m = (pn*n+qn).astype(np.int64)  # k = m*pi/l
+            S, E = self.tables.getTables(xs, ts, alpha, l, m[-1])
+            cm = np.zeros(m[-1])
+            cm[m-1] = c
+            out = np.dot(E.T, cm[:, None]*S)
+            out[steady] = 0.0
+            nIt[~zero & ~steady] = nTerms
+        out[zero] = self.getInitialValue(xs)
+        nIt[zero] = 1
+        if self.term != 'boundary':
+            # At the boundaries, the exact solution is 0.0
+            out[:, self.isOnWall(xs)] = 0.0
+        return self.getDiagnostics(out, ts, nIt, nMax, diagnostics)
+
+
+def getNumberOfTerms(tArray, alpha, l, rtol, nMax=50000, p=2.0, q=1.0):
+    """Return the number of terms needed to reach the relative error rtol for
+    every time of tArray, see Uniform::getNumberOfTerms. The terms decay as
+    exp(-alpha*k_n^2*t) with k_n = (p*n+q)*pi/l and the count is the smallest
+    N for which the bound of the tail exp(-tau*(p*N+q)^2)/(1-exp(-2*p*tau*(p*N+q)))
+    is below rtol, where tau = alpha*pi^2*t/l^2. The count is one for t = 0
+    and at most nMax+1.
+    """
+    if not 0.0 < rtol < 1.0:
+        raise ValueError('rtol={0} is not valid, rtol must be between 0 and '
+                         '1.'.format(rtol))
+    ts = np.asarray(tArray, dtype=np.float64)
+    N = np.ones(ts.shape, dtype=np.int64)
+    pos = ts > 0.0
+    tau = alpha*np.pi**2*ts[pos]/l**2
+    n = np.ceil((np.sqrt(-np.log(rtol)/tau)-q)/p)
+    n = np.clip(n, 0.0, nMax+1.0)
+    while True:
+        m = p*n+q
+        bound = np.exp(-tau*m**2)/(1.0-np.exp(-2.0*p*tau*m))
+        inc = (bound > rtol) & (n <= nMax)
+        if not np.any(inc):
+            break
+        n = n + inc
+    N[pos] = n.astype(np.int64)
+    return N
+
+
+def getBudgetTolerance(u, atol):
+    """Return the relative error rtol of the truncated sums of the series
+    object u for the absolute error atol. The bound of the tail of the
+    truncated sum is cmax times the relative bound of getNumberOfTerms, the
+    number of terms of every time is then the smallest one for which the
+    absolute error is below atol. The late times get fewer terms than the
+    early ones. rtol is at most 0.5.
+    """
+    if not atol > 0.0:
+        raise ValueError('atol={0} is not valid, atol must be positive.'
+                         .format(atol))
+    cmax = u.getMaxCoefficient()
+    if cmax <= 2.0*atol:
+        return 0.5
+    return atol/cmax
@@ -1,43 +1,321 @@
 # -*- coding: utf-8 -*-
+import copy
+import numbers
 import numpy as np
 from heat.mesh import Mesh
 import os
 
 
-class Solution:
+def getIndex(n, sel):
+    """Return the indices selected by sel (an integer, a slice or an array
+    of indices) among n values and False if sel is an integer, i.e. the
+    dimension is dropped, True otherwise.
+    """
+    if isinstance(sel, numbers.Integral):
+        return np.arange(n)[[sel]], False
+    return np.arange(n)[sel], True
+
+
+class SeparableField:
+    """A term of the solution stored as its 1D factors, one array
+    (Nt x (N_axis+1)) per axis, and the rule combining them: "product",
+    "sum" or "geometric" (the d-th root of the product). The values at the
+    nodes are only computed on request.
     """
+    def __init__(self, mesh, factors, rule='product'):
+        if rule not in ['product', 'sum', 'geometric']:
+            raise ValueError('The rule should be "product", "sum" or '
+                             '"geometric". The option rule = "{0}" is not '
+                             'valid.'.format(rule))
+        self.shape, self.axes = mesh.getGridShape()
+        self.factors = {}
+        for p, axis in enumerate(self.axes):
+            factor = np.atleast_2d(factors[axis])
+            if factor.shape[1] != self.shape[p]:
+                raise ValueError('The factor of the axis {0} has {1} values, '
+                                 '{2} are expected.'.format(
+                                     axis, factor.shape[1], self.shape[p]))
+            self.factors[axis] = factor
+        self.rule = rule
+
+    def astype(self, dtype):
+        """Return the field with the factors of type dtype, the values are
+        then computed in this type.
+        """
+        field = copy.copy(self)
+        field.factors = {}
+        for axis, factor in self.factors.items():
+            field.factors[axis] = factor.astype(dtype)
+        return field
+
+    def getDtype(self):
+        """Return the type of the factors and of the values.
+        """
+        return self.factors[self.axes[0]].dtype
+
+    def getNumberOfTimes(self):
+        """Return the number of times, i.e. the rows of the field.
+        """
+        return self.factors[self.axes[0]].shape[0]
+
+    def getNumberOfNodes(self):
+        """Return the number of nodes, i.e. the columns of the field.
+        """
+        return int(np.prod(self.shape))
+
+    def getMemorySize(self):
+        """Return the number of bytes of the factors.
+        """
+        return sum(f.nbytes for f in self.factors.values())
+
+    def getTimeStep(self, index, out=None):
+        """Return the values at the nodes at the time index, in out if
+        given (Nnodes values).
+        """
+        sol = self.evaluate(slice(index, index+1), out)[0]
+        return sol if out is None else out
+
+    def toArray(self, out=None):
+        """Return the values at the nodes at every time (Nt x Nnodes), in
+        out if given.
+        """
+        sol = self.evaluate(slice(None), out)
+        return sol if out is None else out
+
+    def getTimeRange(self, start, stop=None, out=None):
+        """Return the values at the nodes at the times start to stop
+        (excluded), in out if given.
+        """
+        sol = self.evaluate(slice(start, stop), out)
+        return sol if out is None else out
+
+    def evaluate(self, rows, out=None):
+        """Return the rows (Nt x Nnodes) of the field combining the rows of
+        the factors by broadcasting, see combine.
+        """
+        dim = len(self.axes)
+        views = {}
+        for p, axis in enumerate(self.axes):
+            factor = self.factors[axis][rows]
+            shape = [factor.shape[0]] + [1]*dim
+            shape[p+1] = factor.shape[1]
+            views[axis] = factor.reshape(shape)
+        nt = views[self.axes[0]].shape[0]
+        shape = (nt,) + tuple(self.shape)
+        if out is None:
+            out = np.empty((nt, self.getNumberOfNodes()), self.getDtype())
+        elif (np.size(out) != nt*self.getNumberOfNodes() or
+              not out.flags.c_contiguous):
+            raise ValueError('out must be a contiguous array of {0} values.'
+                             .format(nt*self.getNumberOfNodes()))
+        grid = self.combine(views, out.reshape(shape))
+        return grid.reshape(nt, -1)
+
+    def getBlock(self, times=slice(None), select={}):
+        """Return the values at the times and at the nodes selected on every
+        axis by select, e.g. {'x': 5, 'y': slice(0, 4)}, see getIndex. The
+        axes which are not in select are taken entirely. Only the selected
+        values of the factors are combined. The result has one dimension for
+        the times and one for every axis, in the order x, y, z, without the
+        dimensions selected by an integer.
+        """
+        rows, keep = getIndex(self.getNumberOfTimes(), times)
+        axes = sorted(self.axes)
+        views = {}
+        shape = [rows.size]
+        keeps = [keep]
+        for p, axis in enumerate(axes):
+            index, keep = getIndex(self.factors[axis].shape[1],
+                                   select.get(axis, slice(None)))
+            view = [rows.size] + [1]*len(axes)
+            view[p+1] = index.size
+            views[axis] = self.factors[axis][np.ix_(rows, index)].reshape(view)
+            shape.append(index.size)
+            keeps.append(keep)
+        block = self.combine(views, np.empty(shape, self.getDtype()))
+        return block.reshape([n for n, keep in zip(shape, keeps) if keep])
+
+    def combine(self, views, out):
+        """Combine the factors views, broadcast to the shape of out, with
+        the operations in the order of Initial.getSolution and
+        Boundary.getSolution, the values are then identical.
+        """
+        dim = len(self.axes)
+        if dim == 1:
+            out[...] = views['x']
+        elif self.rule == 'sum':
+            np.add(views['x'], views['y'], out=out)
+            if dim == 3:
+                np.add(out, views['z'], out=out)
+        else:
+            if dim == 2:
+                np.multiply(views['x'], views['y'], out=out)
+            else:
+                np.multiply(views['z'], views['y'], out=out)
+                np.multiply(out, views['x'], out=out)
+            if self.rule == 'geometric':
+                np.power(out, 1/dim, out=out)
+        return out
+
+
+class Solution:
+    """The solution is either an array (Nt x Nnodes) or the sum of
+    separable fields, see SeparableField.
     """
     def __init__(self, mesh=Mesh(), sol={}):
         self.mesh = mesh
         self.sol = sol
+        self.fields = None
+
+    def setSolution(self, sol):
+        """Store the solution as an array (Nt x Nnodes).
+        """
+        self.sol = sol
+        self.fields = None
+
+    def setFields(self, fields, dtype=None):
+        """Store the solution as the sum of the separable fields, with the
+        factors converted to dtype if given, see SeparableField.astype.
+        """
+        if dtype is not None:
+            fields = [field.astype(dtype) for field in fields]
+        self.fields = list(fields)
+        self.sol = None
 
-    def getSolution(self, index):
-        """
-        """
-        return self.sol[index]
-
-"""
-    def line(self, axis, valIndex, tIndex):
-        '''Line(): '''
-        s = self.s
-        sol = self.sol
-        mesh = domain.Mesh(s)
-        if tIndex > s.tSize:
-                raise ValueError('Index is out of bound, choose a value between 0 and %d.'\
-                    , s.tSize )
-        if axis == 'x':
-            if valIndex > mesh.ySize:
-                raise ValueError('Index is out of bound, choose a value between 0 and %d.'\
-                    , mesh.ySize )
-            xcoord = sol[tIndex,valIndex:mesh.sSize:mesh.xSize,2]
-            ycoord = sol[tIndex,valIndex:mesh.sSize:mesh.xSize,3]
-        elif axis == 'y':
-            if valIndex > mesh.xSize:
-                raise ValueError('Index is out of bound, choose a value between 0 and %d.'\
-                    , mesh.xSize )
-            xcoord = sol[tIndex,mesh.xSize*valIndex:mesh.xSize*(valIndex+1),1]
-            ycoord = sol[tIndex,mesh.xSize*valIndex:mesh.xSize*(valIndex+1),3]
+    def writeStore(self, filename, chunk=None):
+        """Write the solution to the .npy file filename, memory-mapped, by
+        blocks of chunk times, about 64 MB per block by default, the fields
+        are evaluated directly in the file. The solution is then read from
+        the file, see openStore.
+        """
+        if self.fields is None:
+            shape = np.shape(self.sol)
+            dtype = np.asarray(self.sol).dtype
         else:
-            raise ValueError('axis must be "x" or "y"')
-        return{'xcoord':xcoord,'ycoord':ycoord}
-"""
\ No newline at end of file
+            shape = (self.fields[0].getNumberOfTimes(),
+                     self.fields[0].getNumberOfNodes())
+            dtype = self.fields[0].getDtype()
+        if chunk is None:
+            chunk = max(1, 2**26//(shape[1]*np.dtype(dtype).itemsize))
+        store = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype,
+                                          shape=shape)
+        for start in range(0, shape[0], chunk):
+            stop = min(start+chunk, shape[0])
+            self.getTimeRange(start, stop, store[start:stop])
+        store.flush()
+        del store
+        self.openStore(filename)
+
+    def openStore(self, filename):
+        """Read the solution from the .npy file filename, memory-mapped
+        read-only, the values are only loaded when they are used.
+        """
+        self.setSolution(np.load(filename, mmap_mode='r'))
+
+    def getSolution(self, index, out=None):
+        """Return the values at the nodes at the time index.
+        """
+        if self.fields is None:
+            if out is None:
+                return self.sol[index]
+            out[...] = self.sol[index]
+            return out
+        return self.combine(lambda f, o: f.getTimeStep(index, o), out)
+
+    def toArray(self, out=None):
+        """Return the values at the nodes at every time (Nt x Nnodes), in
+        out if given.
+        """
+        if self.fields is None:
+            if out is None:
+                return np.asarray(self.sol)
+            out[...] = self.sol
+            return out
+        return self.combine(lambda f, o: f.toArray(o), out)
+
+    def combine(self, evaluate, out=None):
+        """Sum the fields evaluated by evaluate(field, out).
+        """
+        out = evaluate(self.fields[0], out)
+        if len(self.fields) > 1:
+            tmp = np.empty(out.shape, out.dtype)
+            for field in self.fields[1:]:
+                np.add(out, evaluate(field, tmp), out=out)
+        return out
+
+    def getTimeRange(self, start, stop=None, out=None):
+        """Return the values at the nodes at the times start to stop
+        (excluded), in out if given.
+        """
+        if self.fields is None:
+            if out is None:
+                return np.asarray(self.sol)[start:stop]
+            out[...] = np.asarray(self.sol)[start:stop]
+            return out
+        return self.combine(lambda f, o: f.getTimeRange(start, stop, o), out)
+
+    def getBox(self, times=slice(None), select={}):
+        """Return the values at the times and at the nodes selected on every
+        axis by select, e.g. {'x': 5, 'y': slice(0, 4)}, see
+        SeparableField.getBlock. The fields are only evaluated at the
+        selected nodes. The result has one dimension for the times and one
+        for every axis, in the order x, y, z, without the dimensions selected
+        by an integer.
+        """
+        if self.fields is not None:
+            box = self.fields[0].getBlock(times, select)
+            for field in self.fields[1:]:
+                box += field.getBlock(times, select)
+            return box
+        shape, axes = self.mesh.getGridShape()
+        grid = np.asarray(self.sol).reshape((-1,) + tuple(shape))
+        order = sorted(axes)
+        grid = grid.transpose([0] + [axes.index(a)+1 for a in order])
+        rows, keep = getIndex(grid.shape[0], times)
+        indices = [rows]
+        keeps = [keep]
+        for p, axis in enumerate(order):
+            index, keep = getIndex(grid.shape[p+1],
+                                   select.get(axis, slice(None)))
+            indices.append(index)
+            keeps.append(keep)
+        box = grid[np.ix_(*indices)]
+        return box.reshape([n for n, keep in zip(box.shape, keeps) if keep])
+
+    def getLine(self, axis, select={}, times=slice(None)):
+        """Return the values on the line of nodes along the axis ('x', 'y'
+        or 'z') at the times, one row per time. The line goes through the
+        nodes given by select for the other axes, e.g. {'y': 0, 'z': 3}, the
+        middle node is taken for the axes which are not in select, i.e. the
+        line is the centerline by default.
+        """
+        return self.getBox(times, self.getSelection([axis], select))
+
+    def getPlane(self, normal, index=None, times=slice(None)):
+        """Return the values on the plane of nodes normal to the axis
+        ('x', 'y' or 'z') at the node index along this axis, the middle
+        plane by default. The result has one dimension for the times and
+        one for every other axis, in the order x, y, z.
+        """
+        shape, axes = self.mesh.getGridShape()
+        if normal not in axes:
+            raise ValueError('The normal should be one of the axes {0}.'
+                             .format(', '.join(sorted(axes))))
+        if index is None:
+            index = shape[axes.index(normal)]//2
+        return self.getBox(times, {normal: index})
+
+    def getSelection(self, free, select={}):
+        """Return select completed by the middle node on the axes which are
+        neither in select nor in free.
+        """
+        shape, axes = self.mesh.getGridShape()
+        for axis in free:
+            if axis not in axes:
+                raise ValueError('The axis should be one of the axes {0}.'
+                                 .format(', '.join(sorted(axes))))
+        selection = dict(select)
+        for p, axis in enumerate(axes):
+            if axis not in free and axis not in selection:
+                selection[axis] = shape[p]//2
+        return selection
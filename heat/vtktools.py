@@ -25,12 +25,17 @@ class VTK:
         reparsed = xml.dom.minidom.parseString(rough_string)
         return reparsed.toprettyxml(indent="  ")
 
-    def writeVTU(self, model):
-        '''Write the solution file
+    def writeVTU(self, model, T=None, fileName=None):
+        '''Write the solution file, the values T at the nodes are the
+        solution at the first time by default and the file is model.output
+        by default. The temperature is written as Float32 if T is single
+        precision.
         '''
-        fileName = model.output
-        indt = 0
-        T = model.solution.getSolution(indt)
+        if fileName is None:
+            fileName = model.output
+        if T is None:
+            indt = 0
+            T = model.solution.getSolution(indt)
         coords = model.mesh.getCoords()
         x = coords['x']
         y = coords['y']
@@ -58,7 +63,8 @@ class VTK:
         piece = ET.SubElement(ug, 'Piece', {'NumberOfPoints': str(T.size),
                                             'NumberOfCells': str(numCells)}) # define from geomdic
         pdata = ET.SubElement(piece, 'PointData', {'Scalars': 'scalars'})
-        darray = ET.SubElement(pdata, 'DataArray', {'type': 'Float64',
+        Ttype = 'Float32' if T.dtype == np.float32 else 'Float64'
+        darray = ET.SubElement(pdata, 'DataArray', {'type': Ttype,
                                                     'Name': 'Temperature',
                                                     'Format': 'ascii'})
         Tstr = ['\n          ']
@@ -115,13 +121,29 @@ class VTK:
         with open(fileName, 'w') as f:
             f.write(xmlstr)
 
-    def writePVD(self, fileName):
+    def writeTimeSeries(self, model, chunks, fileName=None):
+        '''Write one .vtu file per time and the .pvd collection of the files
+        consuming the blocks (start, tArray, sol) of chunks one at a time,
+        see heat.model.Model.computeChunks. The files are named after
+        fileName, model.output by default, with the index of the time.
         '''
-        '''
-        pass
-        '''
-        outFile = open(fileName, 'w')
+        if fileName is None:
+            fileName = model.output
+        base = os.path.splitext(fileName)[0]
+        self.fileNames = []
+        times = []
+        for start, tArray, sol in chunks:
+            for i in range(0, tArray.size):
+                name = '{0}_{1}.vtu'.format(base, start+i)
+                self.writeVTU(model, sol[i], name)
+                self.fileNames.append(name)
+                times.append(tArray[i])
+        self.writePVD(base+'.pvd', times)
 
+    def writePVD(self, fileName, times=None):
+        '''Write the collection of the files fileNames, times are the times of
+        the files, the indices by default.
+        '''
         pvd = xml.dom.minidom.Document()
         pvd_root = pvd.createElementNS("VTK", "VTKFile")
         pvd_root.setAttribute("type", "Collection")
@@ -134,16 +156,15 @@ class VTK:
 
         for i in range(len(self.fileNames)):
             dataSet = pvd.createElementNS("VTK", "DataSet")
-            dataSet.setAttribute("timestep", str(i))
+            timestep = i if times is None else times[i]
+            dataSet.setAttribute("timestep", str(timestep))
             dataSet.setAttribute("group", "")
             dataSet.setAttribute("part", "0")
-            dataSet.setAttribute("file", str(self.fileNames[i]))
+            dataSet.setAttribute("file", os.path.basename(self.fileNames[i]))
             collection.appendChild(dataSet)
 
-        outFile = open(fileName, 'w')
-        pvd.writexml(outFile, newl='\n')
-        outFile.close()
-        '''
+        with open(fileName, 'w') as outFile:
+            pvd.writexml(outFile, newl='\n')
 
     def readVTU(self, fileName):
         '''Read the VTU file and update the model attributes
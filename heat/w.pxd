@@ -35,14 +35,28 @@ cdef extern from "Utils.h":
         double k1
         double k2
 
+    struct seriesStats:
+        long nSums
+        long nTerms
+        long nMaxIt
+        double maxErr
+
 cdef extern from "ComputeSeries.h":
     cdef cppclass ComputeSeries:
         ComputeSeries() except +
         double getSumForward(double tol, int nMax) except +
         double getSumForward(double tol) except +
+        double getSumKahan(double tol, int nMax) except +
         double getSumKahan(double tol) except +
+        double getSumAitken(double tol, int nMax) except +
+        double getSumWynn(double tol, int nMax) except +
+        double getSumLevin(double tol, int nMax) except +
+        double getSumEuler(double tol, int nMax) except +
+        double getSumFixed(int nTerms) except +
         double getLastAbsoluteError() except +
         double getLastNumberOfIterations() except +
+        seriesStats getStats() except +
+        void resetStats() except +
         double fct(int n) except +
 
 cdef extern from "Uniform.h":
@@ -55,11 +69,38 @@ cdef extern from "Uniform.h":
         void setZPosition(double z) except +
         void setAxis(e_axis axis) except +
         void setBoundaryAxis(e_axis baxis) except +
+        void setAlpha(double alpha) except +
+        void setLength(double l) except +
         node getNode() except +
         bcType getBcType() except +
         termType getTermType() except +
         pUniform getParams() except +
         double getSteadyStateDirichlet() except +
+        void getSteadyStateDirichletArray(const double* xs, int nx,
+                                          double* out) nogil except +
+        void getSumForwardArray(const double* xs, int nx, const double* ts,
+                                int nt, double tol, int nMax, double* out,
+                                int* nIts, double* errs) nogil except +
+        int getNumberOfTerms(double rtol, int nMax) except +
+        double getSumTruncated(double rtol, int nMax) except +
+        double getSumImages(double rtol, int nMax) except +
+        bint isShortTime() except +
+        bint isSteadyTime(double tol) except +
+        double getMaxCoefficient() except +
+        double getTailBound(int N) except +
+        void setShortTimeLimit(double tau) except +
+        double getShortTimeLimit() except +
+        void getSumTruncatedArray(const double* xs, int nx, const double* ts,
+                                  int nt, double rtol, int nMax, double* out,
+                                  int* nIts, double* errs) nogil except +
+        void getSumRecurrenceArray(const double* xs, int nx, const double* ts,
+                                   int nt, double rtol, int nMax, int anchor,
+                                   double* out, int* nIts,
+                                   double* errs) nogil except +
+        void setNumberOfThreads(int n) except +
+        int getNumberOfThreads() except +
+        double getTerm(int n) except +
+        double getReferenceTerm(int n) except +
 
 cdef extern from "Misc.h":
     cdef cppclass Misc(ComputeSeries):
@@ -5,6 +5,7 @@
 
 
 import sys
+import numpy as np
 cimport w
 
 
@@ -123,11 +124,52 @@ cdef class ComputeSeries:
         else:
             return self.baseptr.getSumForward(tol)
 
-    def getSumKahan(self, double tol):
-        """ Get lthe Kahan sum.
+    def getSumKahan(self, double tol, nMax=None):
+        """ Get lthe Kahan sum. If nMax equals None, use the default argument
+        nMax = 50000.
+        """
+        if nMax is not None:
+            return self.baseptr.getSumKahan(tol, nMax)
+        else:
+            return self.baseptr.getSumKahan(tol)
+
+    def getSumAitken(self, double tol, nMax=None):
+        """Get the sum accelerated with the Aitken delta-squared process. If
+        nMax equals None, use nMax = 50000.
+        """
+        if nMax is None:
+            nMax = 50000
+        return self.baseptr.getSumAitken(tol, nMax)
+
+    def getSumWynn(self, double tol, nMax=None):
+        """Get the sum accelerated with the epsilon algorithm of Wynn (Shanks
+        transformation). If nMax equals None, use nMax = 50000.
+        """
+        if nMax is None:
+            nMax = 50000
+        return self.baseptr.getSumWynn(tol, nMax)
+
+    def getSumLevin(self, double tol, nMax=None):
+        """Get the sum accelerated with the Levin u-transformation. If nMax
+        equals None, use nMax = 50000.
+        """
+        if nMax is None:
+            nMax = 50000
+        return self.baseptr.getSumLevin(tol, nMax)
 
+    def getSumEuler(self, double tol, nMax=None):
+        """Get the sum of an alternating series accelerated with the Euler
+        transformation. If nMax equals None, use nMax = 50000.
         """
-        return self.baseptr.getSumKahan(tol)
+        if nMax is None:
+            nMax = 50000
+        return self.baseptr.getSumEuler(tol, nMax)
+
+    def getSumFixed(self, int nTerms):
+        """Get the sum of the terms n = 0 to n = nTerms-1.
+
+        """
+        return self.baseptr.getSumFixed(nTerms)
 
     def getLastAbsoluteError(self):
         """Get the absolute error.
@@ -141,6 +183,21 @@ cdef class ComputeSeries:
         """
         return self.baseptr.getLastNumberOfIterations()
 
+    def getStats(self):
+        """Get the convergence statistics accumulated since the creation of
+        the instance or the last call to resetStats, as a dictionary with
+        the number of sums 'nSums', the total number of terms 'nTerms', the
+        number of sums which reached nMax 'nMaxIt' and the largest error
+        estimate 'maxErr'.
+        """
+        return self.baseptr.getStats()
+
+    def resetStats(self):
+        """Reset the convergence statistics to zero.
+
+        """
+        self.baseptr.resetStats()
+
 
 cdef class Uniform(ComputeSeries):
     """Wrapper fro the C++ class Uniform. See detail in the c++ documentation `here <https://frroy.github.io/Series/class_uniform.html>`_ 
@@ -186,6 +243,23 @@ cdef class Uniform(ComputeSeries):
     def __dealloc__(self):
         del self.derivedptr
 
+    def __reduce__(self):
+        """Pickle the instance by rebuilding it from its node, parameters and
+        axes, e.g. to send it to the workers of a process pool. The number
+        of threads isn't pickled.
+        """
+        args = (self.getNode(), self.getBcType(), self.getTermType(),
+                self.getParams(), self.getAxis(self.axis),
+                self.getAxis(self.baxis))
+        state = {'shortTimeLimit': self.derivedptr.getShortTimeLimit()}
+        return (Uniform, args, state)
+
+    def __setstate__(self, state):
+        """Restore the settings which aren't constructor arguments.
+
+        """
+        self.derivedptr.setShortTimeLimit(state['shortTimeLimit'])
+
     def setTime(self, double t):
         """Set the time for the series evaluation.
 
@@ -214,13 +288,226 @@ cdef class Uniform(ComputeSeries):
         """Set the position for the series evaluation.
 
         """
-        self.derivedptr.setAxis(axis)
+        self.axis = axis
+        self.derivedptr.setAxis(self.axis)
 
     def setBoundaryAxis(self, baxis):
         """Set the position for the series evaluation.
 
         """
-        self.derivedptr.setBoundaryAxis(baxis)
+        self.baxis = baxis
+        self.derivedptr.setBoundaryAxis(self.baxis)
+
+    def setAlpha(self, double alpha):
+        """Set the thermal diffusivity for the series evaluation.
+
+        """
+        self.derivedptr.setAlpha(alpha)
+
+    def setLength(self, double l):
+        """Set the side length for the series evaluation.
+
+        """
+        self.derivedptr.setLength(l)
+
+    cdef w.node setNodeFor(self, alpha, l):
+        """Set the diffusivity alpha and the length l of a batch evaluation
+        if they are given and return the node to restore afterwards.
+        """
+        cdef w.node saved = self.derivedptr.getNode()
+        if alpha is not None:
+            self.derivedptr.setAlpha(alpha)
+        if l is not None:
+            self.derivedptr.setLength(l)
+        return saved
+
+    cdef void restoreNode(self, w.node saved):
+        """Restore the diffusivity and the length of the node saved by
+        setNodeFor.
+        """
+        self.derivedptr.setAlpha(saved.alpha)
+        self.derivedptr.setLength(saved.l)
+
+    def getSumForwardArray(self, xArray, tArray, double tol, nMax=None,
+                           alpha=None, l=None, diagnostics=False):
+        """Get the forward sum for every pair of time and position.
+
+        The double loop runs in C++ without the GIL and writes directly in
+        a float64 array of shape (tArray.size, xArray.size), i.e. one row per
+        time. The positions are set along the axis of the instance. If alpha
+        or l are given they replace the values of the node for this
+        evaluation only. If nMax equals None, use the default argument
+        nMax = 50000. If diagnostics is True, return the tuple (sum, nIt,
+        err) where nIt and err are the number of terms and the error
+        estimate of every sum, with the same shape as the sum.
+        """
+        cdef double[::1] xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        cdef double[::1] ts = np.ascontiguousarray(tArray, dtype=np.float64).ravel()
+        cdef int nx = xs.shape[0]
+        cdef int nt = ts.shape[0]
+        cdef int n = 50000 if nMax is None else nMax
+        out = np.empty((nt, nx), dtype=np.float64)
+        nIt = np.zeros((nt, nx), dtype=np.intc)
+        err = np.zeros((nt, nx), dtype=np.float64)
+        if nx == 0 or nt == 0:
+            return (out, nIt, err) if diagnostics else out
+        cdef double[:, ::1] o = out
+        cdef int[:, ::1] it = nIt
+        cdef double[:, ::1] e = err
+        cdef int* pIt = &it[0, 0] if diagnostics else NULL
+        cdef double* pErr = &e[0, 0] if diagnostics else NULL
+        cdef w.node saved = self.setNodeFor(alpha, l)
+        try:
+            with nogil:
+                self.derivedptr.getSumForwardArray(&xs[0], nx, &ts[0], nt,
+                                                   tol, n, &o[0, 0], pIt,
+                                                   pErr)
+        finally:
+            self.restoreNode(saved)
+        return (out, nIt, err) if diagnostics else out
+
+    def getNumberOfTerms(self, double rtol, nMax=None):
+        """Get the number of terms needed to reach the relative error rtol
+        at the time of the node. If nMax equals None, use the default argument
+        nMax = 50000.
+        """
+        cdef int n = 50000 if nMax is None else nMax
+        return self.derivedptr.getNumberOfTerms(rtol, n)
+
+    def getSumTruncated(self, double rtol, nMax=None):
+        """Get the sum truncated a priori for the relative error rtol, or
+        evaluated by the method of images at short times. If nMax equals
+        None, use the default argument nMax = 50000.
+        """
+        cdef int n = 50000 if nMax is None else nMax
+        return self.derivedptr.getSumTruncated(rtol, n)
+
+    def getSumImages(self, double rtol, nMax=None):
+        """Get the short-time representation of the sum by the method of
+        images for the relative error rtol. If nMax equals None, use the
+        default argument nMax = 50000 images.
+        """
+        cdef int n = 50000 if nMax is None else nMax
+        return self.derivedptr.getSumImages(rtol, n)
+
+    def isShortTime(self):
+        """Return True if the truncated sum uses the method of images at
+        the time of the node.
+        """
+        return self.derivedptr.isShortTime()
+
+    def isSteadyTime(self, double tol):
+        """Return True if the transient expression is below tol at the time
+        of the node, i.e. if the solution equals its steady state.
+        """
+        return self.derivedptr.isSteadyTime(tol)
+
+    def getMaxCoefficient(self):
+        """Get the largest absolute value of the coefficients of the terms.
+        """
+        return self.derivedptr.getMaxCoefficient()
+
+    def getTailBound(self, int N):
+        """Get the bound of the sum of the terms from the index N at the
+        time of the node, i.e. the absolute error of getSumFixed(N).
+        """
+        return self.derivedptr.getTailBound(N)
+
+    def setShortTimeLimit(self, double tau):
+        """Set the limit of alpha*t/l**2 below which the truncated sum uses
+        the method of images. Use 0.0 to disable the images.
+        """
+        self.derivedptr.setShortTimeLimit(tau)
+
+    def getShortTimeLimit(self):
+        """Get the limit of alpha*t/l**2 below which the truncated sum uses
+        the method of images.
+        """
+        return self.derivedptr.getShortTimeLimit()
+
+    def getSumTruncatedArray(self, xArray, tArray, double rtol, nMax=None,
+                             alpha=None, l=None, diagnostics=False):
+        """Get the truncated sum for every pair of time and position, see
+        getSumForwardArray. The number of terms is computed once per time
+        for the relative error rtol, the method of images is used at short
+        times. If diagnostics is True, the error estimate err is the bound
+        of the tail of the series, see getTailBound.
+        """
+        cdef double[::1] xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        cdef double[::1] ts = np.ascontiguousarray(tArray, dtype=np.float64).ravel()
+        cdef int nx = xs.shape[0]
+        cdef int nt = ts.shape[0]
+        cdef int n = 50000 if nMax is None else nMax
+        out = np.empty((nt, nx), dtype=np.float64)
+        nIt = np.zeros((nt, nx), dtype=np.intc)
+        err = np.zeros((nt, nx), dtype=np.float64)
+        if nx == 0 or nt == 0:
+            return (out, nIt, err) if diagnostics else out
+        cdef double[:, ::1] o = out
+        cdef int[:, ::1] it = nIt
+        cdef double[:, ::1] e = err
+        cdef int* pIt = &it[0, 0] if diagnostics else NULL
+        cdef double* pErr = &e[0, 0] if diagnostics else NULL
+        cdef w.node saved = self.setNodeFor(alpha, l)
+        try:
+            with nogil:
+                self.derivedptr.getSumTruncatedArray(&xs[0], nx, &ts[0], nt,
+                                                     rtol, n, &o[0, 0], pIt,
+                                                     pErr)
+        finally:
+            self.restoreNode(saved)
+        return (out, nIt, err) if diagnostics else out
+
+    def setNumberOfThreads(self, int n):
+        """Set the number of OpenMP threads of getSumForwardArray and
+        getSumTruncatedArray. Use 0 for the OpenMP default, i.e.
+        OMP_NUM_THREADS if it is set.
+        """
+        self.derivedptr.setNumberOfThreads(n)
+
+    def getNumberOfThreads(self):
+        """Get the number of OpenMP threads of the batch evaluations.
+
+        """
+        return self.derivedptr.getNumberOfThreads()
+
+    def getSumRecurrenceArray(self, xArray, tArray, double rtol, nMax=None,
+                              anchor=None, alpha=None, l=None,
+                              diagnostics=False):
+        """Get the truncated eigenfunction series for every pair of time and
+        position, see getSumTruncatedArray. The sines and, on a uniform time
+        grid, the decay factors are generated by recurrences re-anchored
+        every anchor steps. If anchor equals None, use anchor = 64. If
+        diagnostics is True, return (out, nIt, err) as getSumTruncatedArray.
+        """
+        cdef double[::1] xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        cdef double[::1] ts = np.ascontiguousarray(tArray, dtype=np.float64).ravel()
+        cdef int nx = xs.shape[0]
+        cdef int nt = ts.shape[0]
+        cdef int n = 50000 if nMax is None else nMax
+        cdef int a = 64 if anchor is None else anchor
+        if a <= 0:
+            raise ValueError('anchor={0} is not valid, anchor must be '
+                             'positive.'.format(a))
+        out = np.empty((nt, nx), dtype=np.float64)
+        nIt = np.zeros((nt, nx), dtype=np.intc)
+        err = np.zeros((nt, nx), dtype=np.float64)
+        if nx == 0 or nt == 0:
+            return (out, nIt, err) if diagnostics else out
+        cdef double[:, ::1] o = out
+        cdef int[:, ::1] it = nIt
+        cdef double[:, ::1] e = err
+        cdef int* pIt = &it[0, 0] if diagnostics else NULL
+        cdef double* pErr = &e[0, 0] if diagnostics else NULL
+        cdef w.node saved = self.setNodeFor(alpha, l)
+        try:
+            with nogil:
+                self.derivedptr.getSumRecurrenceArray(&xs[0], nx, &ts[0], nt,
+                                                      rtol, n, a, &o[0, 0],
+                                                      pIt, pErr)
+        finally:
+            self.restoreNode(saved)
+        return (out, nIt, err) if diagnostics else out
 
     def getNode(self):
         """Get the node struct from the Uniform class.
@@ -288,3 +575,41 @@ cdef class Uniform(ComputeSeries):
 
         """
         return self.derivedptr.getSteadyStateDirichlet()
+
+    def getSteadyStateDirichletArray(self, xArray):
+        """Get the steady-state solution for every position of xArray along
+        the axis of the instance. The node is left at the last position.
+
+        """
+        cdef double[::1] xs = np.ascontiguousarray(xArray, dtype=np.float64).ravel()
+        cdef int nx = xs.shape[0]
+        out = np.empty(nx, dtype=np.float64)
+        if nx == 0:
+            return out
+        cdef double[::1] o = out
+        with nogil:
+            self.derivedptr.getSteadyStateDirichletArray(&xs[0], nx, &o[0])
+        return out
+
+
+class RecurrenceUniform(Uniform):
+    """Uniform evaluating the truncated sums with getSumRecurrenceArray, see
+    the engine "recurrence" of heat.series.createUniform. The number of
+    terms is always computed a priori, the forward sums aren't available.
+    """
+    def getSumTruncatedArray(self, xArray, tArray, double rtol, nMax=None,
+                             alpha=None, l=None, diagnostics=False):
+        """Get the truncated sum for every pair of time and position with
+        the recurrences of getSumRecurrenceArray. The method of images isn't
+        used at short times.
+        """
+        return self.getSumRecurrenceArray(xArray, tArray, rtol, nMax, None,
+                                          alpha, l, diagnostics)
+
+    def getSumForwardArray(self, xArray, tArray, tol, nMax=None, alpha=None,
+                           l=None, diagnostics=False):
+        """Not available, the recurrences need the number of terms of every
+        time, use getSumTruncatedArray.
+        """
+        raise ValueError('The engine "recurrence" truncates the series a '
+                         'priori, give rtol or budget.')
@@ -52,10 +52,77 @@ public:
      *  the last two terms of the sum computed by the method sumForward. The
      *  variable tol is the criterion used to stop adding terms in the same
      *  method.
-     *  @return The result of the sum returned by sumForward when the absolute
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
+     *  @return The result of the sum returned by sumKahan when the absolute
      *  error is below tol.
      */
-    double getSumKahan(double tol);
+    double getSumKahan(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief  Get the value returned by sumAitken.
+     *
+     *  @param tol is the maximum absolute difference between the last four
+     *  accelerated estimates.
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
+     *  @return The result of the sum returned by sumAitken.
+     */
+    double getSumAitken(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief  Get the value returned by sumWynn.
+     *
+     *  @param tol is the maximum absolute difference between the last four
+     *  accelerated estimates.
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
+     *  @return The result of the sum returned by sumWynn.
+     */
+    double getSumWynn(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief  Get the value returned by sumLevin.
+     *
+     *  @param tol is the maximum absolute difference between the last four
+     *  accelerated estimates.
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
+     *  @return The result of the sum returned by sumLevin.
+     */
+    double getSumLevin(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief  Get the value returned by sumEuler.
+     *
+     *  @param tol is the maximum absolute difference between the last four
+     *  accelerated estimates.
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
+     *  @return The result of the sum returned by sumEuler.
+     */
+    double getSumEuler(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief  Get the value returned by sumFixed.
+     *
+     *  @param nTerms is the number of terms of the sum, i.e. the terms
+     *  @c n=0 to @c n=nTerms-1 are added. The number of terms is usually
+     *  computed a priori by the derived class.
+     *
+     *  @return The result of the sum returned by sumFixed.
+     */
+    double getSumFixed(int nTerms);
     
     /**
      *  @brief  Get the last absolute error computed by the series evaluation
@@ -74,10 +141,59 @@ public:
      *  evaluation method.
      */
     int getLastNumberOfIterations();
-  
+    
+    /**
+     *  @brief  Get the convergence statistics accumulated by the series
+     *  evaluation methods since the construction or the last call to
+     *  resetStats. When the maximum number of iterations is reached, the
+     *  methods return their last estimate and the hit is counted instead of
+     *  being reported.
+     *
+     *  @return The number of sums, the total number of terms, the number of
+     *  sums which reached the maximum number of iterations and the largest
+     *  absolute error estimate.
+     */
+    seriesStats getStats();
+    
+    /**
+     *  @brief  Reset the convergence statistics to zero.
+     */
+    void resetStats();
     
 protected:
     
+    // The last computed absolute error
+    double absErr;
+    
+    // The last computed number of iterations
+    int nIt;
+    
+    // True if the last summation reached the maximum number of iterations
+    bool maxItReached;
+    
+    // The accumulated convergence statistics
+    seriesStats stats;
+    
+    /**
+     *  @brief Add the last summation, i.e. @c nIt, @c absErr and
+     *  @c maxItReached, to the statistics.
+     */
+    void recordSum();
+    
+    /**
+     *  @brief Count a summation which reached the maximum number of
+     *  iterations without going through @c maxItReached.
+     */
+    void recordMaxIt();
+    
+    /**
+     *  @brief Add the statistics of another series, e.g. the instance of an
+     *  OpenMP thread, to the statistics.
+     *
+     *  @param other is the statistics to add.
+     */
+    void mergeStats(const seriesStats& other);
+    
 private:
     // Prohibit the copy constructor by declaring but not defining the method.
     ComputeSeries(const ComputeSeries& other);
@@ -113,9 +229,89 @@ private:
      *  growing series. Note that we expect all series to be convergent, i.e.
      *  the values of the terms is converging towards zero as @c n increases.
      *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  iteration for which the while loop should stop.
+     *
      *  @return The result of the truncated summation.
      */
-    double sumKahan(double tol);
+    double sumKahan(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief Sums terms through the callback function @c p_fct(n) and
+     *  applies the Aitken \f$\delta^2\f$ process to the last three partial
+     *  sums \f$s_{n-2}, s_{n-1}, s_n\f$:
+     *  \f[
+     *  A_n = s_n-\frac{(s_n-s_{n-1})^2}{(s_n-s_{n-1})-(s_{n-1}-s_{n-2})}.
+     *  \f]
+     *  The summation stops when the range of the last four
+     *  estimates is below @c tol. Efficient for series with a geometric
+     *  convergence.
+     *
+     *  @param tol is the maximum difference between the last four estimates.
+     *
+     *  @param nMax is the maximum number of iterations.
+     *
+     *  @return The last accelerated estimate.
+     */
+    double sumAitken(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief Sums terms through the callback function @c p_fct(n) and
+     *  applies the Shanks transformation to the partial sums with the
+     *  epsilon algorithm of Wynn, i.e. the last counter-diagonal of the
+     *  epsilon table is updated for every new partial sum and the estimate
+     *  is the element of the last even column. Efficient for alternating
+     *  and for geometric-like series.
+     *
+     *  @param tol is the maximum difference between the last four estimates.
+     *
+     *  @param nMax is the maximum number of iterations.
+     *
+     *  @return The last accelerated estimate.
+     */
+    double sumWynn(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief Sums terms through the callback function @c p_fct(n) and
+     *  applies the Levin u-transformation with the remainder estimates
+     *  \f$\omega_n=(n+1)a_n\f$, where \f$a_n\f$ is the term @c n. The
+     *  numerators and denominators are computed with the recurrence of
+     *  Fessler, Ford and Smith. Efficient for alternating and for
+     *  logarithmically convergent series. The estimate falls back to the
+     *  partial sum when the recurrence overflows.
+     *
+     *  @param tol is the maximum difference between the last four estimates.
+     *
+     *  @param nMax is the maximum number of iterations.
+     *
+     *  @return The last accelerated estimate.
+     */
+    double sumLevin(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief Sums terms through the callback function @c p_fct(n) with the
+     *  Euler transformation implemented as in the van Wijngaarden
+     *  algorithm. Only for alternating series.
+     *
+     *  @param tol is the maximum difference between the last four estimates.
+     *
+     *  @param nMax is the maximum number of iterations.
+     *
+     *  @return The last accelerated estimate.
+     */
+    double sumEuler(double tol, int nMax = 50000);
+    
+    /**
+     *  @brief Sums exactly @c nTerms terms through the callback function
+     *  @c p_fct(n), from @c n=0 to @c n=nTerms-1. No stopping criterion is
+     *  evaluated, the last absolute error is the absolute value of the last
+     *  term.
+     *
+     *  @param nTerms is the number of terms of the sum.
+     *
+     *  @return The result of the truncated summation.
+     */
+    double sumFixed(int nTerms);
     
     /**
      *  @brief Definition of the callback function. The function is virtual
@@ -131,12 +327,6 @@ private:
     // The function pointer p_fct
     double (ComputeSeries::*p_fct)(int);
     
-    // The last computed absolute error
-    double absErr;
-    
-    // The last computed number of iterations
-    int nIt;
-    
 };
 
 #endif /* ComputeSeries_h */
@@ -25,13 +25,50 @@ public:
     void setFct(miscFct fctName);
     miscFct getFct();
     double getX();
+    void setMode(miscMode mode);
+    miscMode getMode();
+    /**
+     *  @brief Evaluate the expression at @c x in the current mode. The
+     *  default mode is SERIES.
+     *
+     *  @param tol is the tolerance passed to getSumForward in SERIES mode.
+     *
+     *  @param nMax is the maximum number of iterations in SERIES mode.
+     *
+     *  @return The value of the expression.
+     */
     double getResult(double tol, int nMax = 50000);
+    /**
+     *  @brief Evaluate the exact value of the series. With
+     *  \f$y=x \bmod 2\pi\f$, SINN3 equals
+     *  \f$(2\pi^2y-3\pi y^2+y^3)/12\f$ and ALTSINN3 is SINN3 evaluated
+     *  at \f$x+\pi\f$.
+     *
+     *  @return The closed form of the expression at @c x.
+     */
+    double getClosedForm();
+    /**
+     *  @brief Evaluate getResult for every position of an array. The
+     *  position @c x is left at the last value.
+     *
+     *  @param xs is an array of @c nx positions.
+     *
+     *  @param tol is the tolerance passed to getResult.
+     *
+     *  @param nMax is the maximum number of iterations per position.
+     *
+     *  @param out is a buffer of size @c nx.
+     */
+    void getResultArray(const double* xs, int nx, double tol, int nMax,
+                        double* out);
     int getNbrIt();
     double getErr();
     
 private:
     miscFct fctName;
     double x;
+    miscMode mode;
+    double getClosedForm(double x);
     double fct(int); //!< a member function.
     /**
      *  @brief Get the expressions for the SINN3 function.
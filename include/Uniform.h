@@ -33,11 +33,316 @@ public:
     void setZPosition(double z);
     void setAxis(e_axis axis);
     void setBoundaryAxis(e_axis baxis);
+    void setAlpha(double alpha);
+    void setLength(double l);
     node getNode();
     bcType getBcType();
     termType getTermType();
     pUniform getParams();
     double getSteadyStateDirichlet();
+    /**
+     *  @brief Evaluate getSteadyStateDirichlet for every position of an
+     *  array along the axis. In 1D, the source term evaluates the closed
+     *  forms of the series SINN3 and ALTSINN3 for the whole array. The node
+     *  is left at the last position.
+     *
+     *  @param xs is an array of @c nx positions.
+     *
+     *  @param out is a buffer of size @c nx.
+     */
+    void getSteadyStateDirichletArray(const double* xs, int nx, double* out);
+    
+    /**
+     *  @brief Evaluate getSumForward for every pair of time and position.
+     *
+     *  The positions are set along the axis @c axis of the instance. The
+     *  loop runs entirely in C++, the caller provides the output buffer.
+     *  The nodes are shared among OpenMP threads, see setNumberOfThreads,
+     *  each thread evaluating its nodes with its own instance built from
+     *  the node, the parameters and the axes.
+     *  Every value is computed by a single thread in the same order of
+     *  operations, the result doesn't depend on the number of threads. At
+     *  the times for which isSteadyTime is true, the sum is 0.0. At the
+     *  short times, see isShortTime, the sum is evaluated by getSumImages
+     *  with @c tol as the error target if @c 0<tol<1.
+     *
+     *  @param xs is an array of @c nx positions.
+     *
+     *  @param ts is an array of @c nt times.
+     *
+     *  @param tol is the tolerance passed to getSumForward.
+     *
+     *  @param nMax is the maximum number of iterations per node.
+     *
+     *  @param out is a row-major buffer of size @c nt*nx where
+     *  @c out[j*nx+i] is the sum at time @c ts[j] and position @c xs[i].
+     *
+     *  @param nIts is an optional buffer of size @c nt*nx for the number of
+     *  terms of every sum, @c nMax+1 if the maximum was reached and 0 at
+     *  the steady times.
+     *
+     *  @param errs is an optional buffer of size @c nt*nx for the absolute
+     *  value of the last term of every sum, or getTailBound(0) at the
+     *  steady times.
+     */
+    void getSumForwardArray(const double* xs, int nx, const double* ts,
+                            int nt, double tol, int nMax, double* out,
+                            int* nIts = NULL, double* errs = NULL);
+    
+    /**
+     *  @brief Get the number of terms needed to reach the relative error
+     *  @c rtol at the time of the node.
+     *
+     *  The terms decay as \f$\exp(-\alpha k_n^2t)\f$ with
+     *  \f$k_n=(pn+q)\pi/l\f$. The count is the smallest @c N for which the
+     *  bound of the tail
+     *  \f$\exp(-\tau(pN+q)^2)/(1-\exp(-2p\tau(pN+q)))\f$, where
+     *  \f$\tau=\alpha\pi^2t/l^2\f$, is below @c rtol. The count doesn't
+     *  depend on the position, it is shared by every node at a given time.
+     *  The modes beyond the count, including the ones for which the
+     *  exponential factor underflows, are never evaluated.
+     *
+     *  @param rtol is the relative error target, @c 0<rtol<1, otherwise
+     *  std::invalid_argument is thrown.
+     *
+     *  @param nMax is the maximum index of the summation, the count is at
+     *  most @c nMax+1.
+     *
+     *  @return The number of terms of the summation.
+     */
+    int getNumberOfTerms(double rtol, int nMax = 50000);
+    
+    /**
+     *  @brief Get the sum truncated at the number of terms given by
+     *  getNumberOfTerms. At short times, i.e. if isShortTime is true, the
+     *  sum is evaluated with getSumImages instead.
+     *
+     *  @param rtol is the relative error target, @c 0<rtol<1, otherwise
+     *  std::invalid_argument is thrown.
+     *
+     *  @param nMax is the maximum index of the summation.
+     *
+     *  @return The result of the truncated summation.
+     */
+    double getSumTruncated(double rtol, int nMax = 50000);
+    
+    /**
+     *  @brief Get the short-time representation of the transient expression
+     *  at the node by the method of images.
+     *
+     *  The Green's function of the Dirichlet problem is written as a sum of
+     *  images of the free-space kernel. With \f$s=2\sqrt{\alpha t}\f$, the
+     *  decay of a unit initial temperature is
+     *  \f[
+     *  u(x,t) = 1-\sum_{m=0}^\infty (-1)^m\left(
+     *  \mathrm{erfc}\left(\frac{ml+x}{s}\right)+
+     *  \mathrm{erfc}\left(\frac{(m+1)l-x}{s}\right)\right)
+     *  \f]
+     *  and the response to a unit temperature on the first boundary is
+     *  \f[
+     *  F(x,t) = \sum_{m=0}^\infty\left(
+     *  \mathrm{erfc}\left(\frac{2ml+x}{s}\right)-
+     *  \mathrm{erfc}\left(\frac{2(m+1)l-x}{s}\right)\right).
+     *  \f]
+     *  The initial term is \f$a_0^{1/d}u(x,t)\f$ and the boundary term is
+     *  \f$(a_1F(x,t)+a_2F(l-x,t)-a_1-(a_2-a_1)x/l)/d^{1/d}\f$, i.e. the
+     *  same quantities as the eigenfunction series. The number of images is
+     *  bounded by \f$1+\sqrt{-\ln(rtol)}s/l\f$, it decreases with time. The
+     *  source term on the x-axis, which converges as \f$(2n+1)^{-3}\f$, is
+     *  evaluated with the truncated eigenfunction series.
+     *
+     *  @param rtol is the relative error target, @c 0<rtol<1, otherwise
+     *  std::invalid_argument is thrown.
+     *
+     *  @param nMax is an optional argument. It gives the maximum number of
+     *  images of each sum, getStats counts the sums reaching it.
+     *
+     *  @return The value of the transient expression.
+     */
+    double getSumImages(double rtol, int nMax = 50000);
+    
+    /**
+     *  @brief Check if the time of the node is short, i.e. if
+     *  \f$\alpha t/l^2\f$ is below the short-time limit. The images converge
+     *  faster than the eigenfunctions at short times.
+     *
+     *  @return True if getSumTruncated uses getSumImages.
+     */
+    bool isShortTime();
+    
+    /**
+     *  @brief Check if a coordinate lies on one of the walls of the axis,
+     *  i.e. within \f$\epsilon l\f$ of 0 or l with \f$\epsilon\f$ =
+     *  WALLTOL. The tolerance is relative to the side length so that the
+     *  nodes of graded meshes next to the walls are kept.
+     *
+     *  @param x is the coordinate along the axis.
+     *
+     *  @return True if the exact solution of the terms is on the wall.
+     */
+    bool isOnWall(double x);
+    
+    /**
+     *  @brief Check if the transient expression has decayed below @c tol at
+     *  the time of the node, i.e. if the solution equals its steady state.
+     *
+     *  With \f$\tau=\alpha\pi^2t/l^2\f$ and \f$k_n=(pn+q)\pi/l\f$, the
+     *  sum is bounded by
+     *  \f$c_{max}\exp(-\tau q^2)/(1-\exp(-2p\tau q))\f$, where
+     *  \f$c_{max}\f$ is the largest coefficient of the terms. The batch
+     *  evaluation getSumForwardArray returns 0.0 without summing the terms
+     *  when the bound is below @c tol.
+     *
+     *  @param tol is the absolute tolerance of the transient expression.
+     *
+     *  @return True if the transient expression is negligible.
+     */
+    bool isSteadyTime(double tol);
+    
+    /**
+     *  @brief Get the largest absolute value of the coefficients of the
+     *  terms, the coefficients decrease with the index of the summation.
+     *
+     *  @return The largest coefficient \f$c_{max}\f$.
+     */
+    double getMaxCoefficient();
+    
+    /**
+     *  @brief Get the bound of the sum of the terms from the index @c N at
+     *  the time of the node,
+     *  \f$c_{max}\exp(-\tau(pN+q)^2)/(1-\exp(-2p\tau(pN+q)))\f$, i.e.
+     *  the absolute error of getSumFixed(N). The bound is 0.0 at @c t=0,
+     *  where the first term is exact, and for the boundary conditions other
+     *  than Dirichlet.
+     *
+     *  @param N is the number of terms of the summation.
+     *
+     *  @return The bound of the tail of the series.
+     */
+    double getTailBound(int N);
+    
+    /**
+     *  @brief Set the limit of the dimensionless time \f$\alpha t/l^2\f$
+     *  below which getSumTruncated uses getSumImages. The default value is
+     *  0.05, use 0.0 to disable the images.
+     *
+     *  @param tau is the short-time limit.
+     */
+    void setShortTimeLimit(double tau);
+    
+    /**
+     *  @brief Get the limit of the dimensionless time \f$\alpha t/l^2\f$
+     *  below which getSumTruncated uses getSumImages.
+     *
+     *  @return The short-time limit.
+     */
+    double getShortTimeLimit();
+    
+    /**
+     *  @brief Evaluate getSumTruncated for every pair of time and position.
+     *  The number of terms is computed once per time. The nodes are shared
+     *  among OpenMP threads as for getSumForwardArray.
+     *
+     *  @param xs is an array of @c nx positions.
+     *
+     *  @param ts is an array of @c nt times.
+     *
+     *  @param rtol is the relative error target, @c 0<rtol<1, otherwise
+     *  std::invalid_argument is thrown.
+     *
+     *  @param nMax is the maximum index of the summation.
+     *
+     *  @param out is a row-major buffer of size @c nt*nx where
+     *  @c out[j*nx+i] is the sum at time @c ts[j] and position @c xs[i].
+     *
+     *  @param nIts is an optional buffer of size @c nt*nx for the number of
+     *  terms of every sum, or the number of images at short times.
+     *
+     *  @param errs is an optional buffer of size @c nt*nx for the error
+     *  estimate of every sum, i.e. getTailBound of the number of terms, or
+     *  the last image at short times.
+     */
+    void getSumTruncatedArray(const double* xs, int nx, const double* ts,
+                              int nt, double rtol, int nMax, double* out,
+                              int* nIts = NULL, double* errs = NULL);
+    
+    /**
+     *  @brief Set the number of OpenMP threads of the batch evaluations.
+     *
+     *  @param n is the number of threads, use 0 (the default) for the
+     *  OpenMP default, i.e. @c OMP_NUM_THREADS if it is set.
+     */
+    void setNumberOfThreads(int n);
+    
+    /**
+     *  @brief Get the number of OpenMP threads of the batch evaluations.
+     *
+     *  @return The number of threads, 1 if the code is compiled without
+     *  OpenMP.
+     */
+    int getNumberOfThreads();
+    
+    /**
+     *  @brief Evaluate the truncated eigenfunction series for every pair of
+     *  time and position with recurrences instead of transcendental calls.
+     *
+     *  The count of terms is given by getNumberOfTerms at every time, as
+     *  for getSumTruncatedArray, but the method of images isn't used. With
+     *  \f$k_n=(pn+q)\pi/l\f$, the sines follow the Chebyshev recurrence
+     *  \f$\sin(k_{n+1}x)=2\cos(p\pi x/l)\sin(k_nx)-\sin(k_{n-1}x)\f$ and,
+     *  on a uniform time grid, the decay factors follow
+     *  \f$e^{-\alpha k_n^2t_{j+1}}=e^{-\alpha k_n^2t_j}e^{-\alpha k_n^2\Delta t}\f$.
+     *  Both recurrences are re-anchored with direct sin and exp calls every
+     *  @c anchor modes and every @c anchor time steps to bound the drift
+     *  of the rounding errors. The rows at @c t=0 are evaluated exactly.
+     *
+     *  @param xs is an array of @c nx positions.
+     *
+     *  @param ts is an array of @c nt non-negative times.
+     *
+     *  @param rtol is the relative error target, @c 0<rtol<1, otherwise
+     *  std::invalid_argument is thrown.
+     *
+     *  @param nMax is the maximum index of the summation.
+     *
+     *  @param anchor is the number of recurrence steps between two direct
+     *  evaluations, @c anchor>0.
+     *
+     *  @param out is a row-major buffer of size @c nt*nx where
+     *  @c out[j*nx+i] is the sum at time @c ts[j] and position @c xs[i].
+     *
+     *  @param nIts is an optional buffer of size @c nt*nx for the number of
+     *  terms of every sum, ignored if NULL.
+     *
+     *  @param errs is an optional buffer of size @c nt*nx for the bound of
+     *  the tail of every sum, see getTailBound, ignored if NULL.
+     */
+    void getSumRecurrenceArray(const double* xs, int nx, const double* ts,
+                               int nt, double rtol, int nMax, int anchor,
+                               double* out, int* nIts = NULL,
+                               double* errs = NULL);
+    
+    /**
+     *  @brief Get the term @c n of the transient expression with the kernel
+     *  selected for the instance, i.e. the value summed by ComputeSeries.
+     *
+     *  @param n is the summation index, starting from 0.
+     *
+     *  @return The term @c n at the node.
+     */
+    double getTerm(int n);
+    
+    /**
+     *  @brief Get the term @c n of the transient expression through the
+     *  generic dispatch on the boundary condition, the term and the axes,
+     *  e.g. getDirichletTransientExpression. It is kept as a reference for
+     *  the specialised kernels.
+     *
+     *  @param n is the summation index, starting from 0.
+     *
+     *  @return The term @c n at the node.
+     */
+    double getReferenceTerm(int n);
     
 private:
     pUniform params;
@@ -47,6 +352,51 @@ private:
     e_axis axis;
     e_axis baxis;
     double fct(int); //!< a member function.
+    double shortTimeLimit; //!< limit of alpha*t/l^2 for the images.
+    int nThreads; //!< number of threads, 0 for the OpenMP default.
+    /**
+     *  @brief Loop invariants of the transient expressions, i.e. the
+     *  powers of the parameters. They are updated by updateKernel when the
+     *  time, the diffusivity or the length change.
+     */
+    struct kernelCoeffs {
+        double amp;   //!< amplitude of the terms.
+        double init;  //!< value at t=0 inside the domain.
+        double edge1; //!< value of the boundary term at t=0 and x=0.
+        double edge2; //!< value of the boundary term at t=0 and x=l.
+        double xmin;  //!< WALLTOL*l, the first boundary.
+        double xmax;  //!< (1-WALLTOL)*l, the second boundary.
+        bool zero;    //!< true if the boundary term vanishes.
+    };
+    kernelCoeffs kc;
+    //! The kernel evaluating the terms, selected once by selectKernel.
+    double (Uniform::*p_kernel)(int);
+    void updateKernel(); //!< compute the loop invariants @c kc.
+    void selectKernel(); //!< select @c p_kernel from bc, term and axes.
+    template <termType TERM>
+    void selectAxisKernel(); //!< select the kernel for @c axis.
+    template <termType TERM, e_axis AXIS>
+    void selectBoundaryAxisKernel(); //!< select the kernel for @c baxis.
+    /**
+     *  @brief Kernel of the Dirichlet transient expressions specialised for
+     *  the term type and the axes. The branches on the template parameters
+     *  are resolved at compile time and the invariants are read from
+     *  @c kc, see getDirichletTransientExpression for the expressions.
+     *
+     *  @param n is the summation index, starting from 0.
+     *
+     *  @return The term @c n at the node.
+     */
+    template <termType TERM, e_axis AXIS, e_axis BAXIS>
+    double dirichletKernel(int n);
+    double zeroKernel(int n); //!< kernel of the conditions not implemented.
+    double getCoefficient(int n); //!< the term @c n without sin and exp.
+    void setPosition(double x); //!< set the position along @c axis.
+    double getPosition(); //!< get the position along @c axis.
+    double getImagesInitial(double x, double rtol, int nMax); //!< u(x,t)
+    double getImagesBoundary(double x, double rtol, int nMax); //!< F(x,t)
+    //! throw std::invalid_argument if rtol is not in (0, 1).
+    void checkRelativeTolerance(double rtol);
     /**
      *  @brief Get the expressions for the Dirichlet boundary condition.
      *
@@ -18,6 +18,9 @@ using namespace std;
 // Definition of PI
 const double PI = 3.141592653589793;
 
+// Relative tolerance of the wall coordinates, i.e. x<=WALLTOL*l is on the wall
+const double WALLTOL = 1e-12;
+
 /** An enum type to describe the type of boundary condition.
  */
 enum bcType {
@@ -68,6 +71,16 @@ struct pUniform {
     double k2; /**< Robin constant for the second boundary.*/
 };
 
+/** An struct type to hold the convergence statistics of the series
+ *  evaluations.
+ */
+struct seriesStats {
+    long nSums; /**< Number of evaluated sums.*/
+    long nTerms; /**< Total number of evaluated terms.*/
+    long nMaxIt; /**< Number of sums which reached the maximum number of iterations.*/
+    double maxErr; /**< Largest absolute error estimate of the sums.*/
+};
+
 /** An enum type to describe an expression to be evaluated.
  */
 enum miscFct {
@@ -75,4 +88,11 @@ enum miscFct {
     ALTSINN3, /**< \f$\sum_{n=1}^\infty (-1)^n\frac{\sin(nx)}{n^3}\f$.*/
 };
 
+/** An enum type to select how the class Misc evaluates an expression.
+ */
+enum miscMode {
+    SERIES, /**< Sum the series with ComputeSeries::getSumForward.*/
+    CLOSEDFORM, /**< Evaluate the exact cubic polynomial of the series.*/
+};
+
 #endif /* Utils_h */
@@ -30,6 +30,44 @@ if os.path.exists('LICENSE'):
 Please see the file 'readme.rst' for further instructions.""")
     sys.exit(1)
 
+
+def getOpenMPFlags():
+    """Return the compiler flags of OpenMP, or an empty list if the compiler
+    can't build a program with OpenMP. The extension then runs the batch
+    evaluations on a single thread.
+    """
+    import shutil
+    import tempfile
+    from distutils.ccompiler import new_compiler
+    from distutils.errors import CompileError, LinkError
+    from distutils.sysconfig import customize_compiler
+    compiler = new_compiler()
+    customize_compiler(compiler)
+    flag = '/openmp' if compiler.compiler_type == 'msvc' else '-fopenmp'
+    tmp = tempfile.mkdtemp()
+    try:
+        source = os.path.join(tmp, 'openmp.c')
+        with open(source, 'w') as f:
+            f.write('#include <omp.h>\n'
+                    'int main(void) { return omp_get_max_threads() < 1; }\n')
+        objects = compiler.compile([source], output_dir=tmp,
+                                   extra_postargs=[flag])
+        compiler.link_executable(objects, 'openmp', output_dir=tmp,
+                                 extra_postargs=[flag])
+    except (CompileError, LinkError):
+        print("OpenMP is not available, the extension uses a single thread.")
+        return []
+    finally:
+        shutil.rmtree(tmp)
+    return [flag]
+
+
+extensions = cythonize('heat/*.pyx', gdb_debug=True)
+openmp = getOpenMPFlags()
+for extension in extensions:
+    extension.extra_compile_args += openmp
+    extension.extra_link_args += openmp
+
 main_ns = {}
 ver_path = convert_path('heat/__init__.py')
 with open(ver_path) as ver_file:
@@ -64,7 +102,7 @@ setup(
     test_suite='tests.test_class',
     tests_require=['pytest', ],
     zip_safe=False,
-    ext_modules=cythonize('heat/*.pyx', gdb_debug=True),
+    ext_modules=extensions,
     classifiers=[
         'Intended Audience :: Developers',
         'Natural Language :: English',
@@ -7,14 +7,40 @@
  */
 
 #include <iostream> // for debugging
+#include <vector>
 #include "ComputeSeries.h"
 
+// Sentinel values for the acceleration methods
+const double TINY = 1e-60;
+const double HUGE_VALUE = 1e60;
+
+// Number of accelerated estimates compared by the stopping criterion.
+// A single small difference between the last two estimates is not a
+// convergence test, e.g. when a term of an oscillating series is close to 0.
+const int WINDOW = 4;
+
+// Range of the last WINDOW estimates
+static double getRange(const std::vector<double>& estimates)
+{
+    int n = (int)estimates.size();
+    int first = (n > WINDOW) ? n-WINDOW : 0;
+    double lo = estimates[first];
+    double hi = estimates[first];
+    for (int j = first+1; j < n; j++) {
+        if (estimates[j] < lo) lo = estimates[j];
+        if (estimates[j] > hi) hi = estimates[j];
+    }
+    return hi-lo;
+}
+
 // Constructor
 ComputeSeries::ComputeSeries() :
-p_fct(&ComputeSeries::fct),
 absErr(0.0),
-nIt(0)
+nIt(0),
+maxItReached(false),
+p_fct(&ComputeSeries::fct)
 {
+    resetStats();
 }
 
 // Destructor
@@ -24,20 +50,58 @@ ComputeSeries::~ComputeSeries()
 
 double ComputeSeries::getSumForward(double tol, int nMax)
 {
-    double result = 0.0;
-    try {
-        result = sumForward(tol, nMax);
-    } catch (exc_MaxItReached& e) {
-        cout << e.what() << endl;
-        //exit(0);
-        result = e.getOutput();
-    }
+    maxItReached = false;
+    double result = sumForward(tol, nMax);
+    recordSum();
+    return result;
+}
+
+double ComputeSeries::getSumKahan(double tol, int nMax)
+{
+    maxItReached = false;
+    double result = sumKahan(tol, nMax);
+    recordSum();
+    return result;
+}
+
+double ComputeSeries::getSumAitken(double tol, int nMax)
+{
+    maxItReached = false;
+    double result = sumAitken(tol, nMax);
+    recordSum();
     return result;
 }
 
-double ComputeSeries::getSumKahan(double tol)
+double ComputeSeries::getSumWynn(double tol, int nMax)
 {
-    return sumKahan(tol);
+    maxItReached = false;
+    double result = sumWynn(tol, nMax);
+    recordSum();
+    return result;
+}
+
+double ComputeSeries::getSumLevin(double tol, int nMax)
+{
+    maxItReached = false;
+    double result = sumLevin(tol, nMax);
+    recordSum();
+    return result;
+}
+
+double ComputeSeries::getSumEuler(double tol, int nMax)
+{
+    maxItReached = false;
+    double result = sumEuler(tol, nMax);
+    recordSum();
+    return result;
+}
+
+double ComputeSeries::getSumFixed(int nTerms)
+{
+    maxItReached = false;
+    double result = sumFixed(nTerms);
+    recordSum();
+    return result;
 }
 
 double ComputeSeries::getLastAbsoluteError()
@@ -50,6 +114,46 @@ int ComputeSeries::getLastNumberOfIterations()
     return nIt;
 }
 
+seriesStats ComputeSeries::getStats()
+{
+    return stats;
+}
+
+void ComputeSeries::resetStats()
+{
+    stats.nSums = 0;
+    stats.nTerms = 0;
+    stats.nMaxIt = 0;
+    stats.maxErr = 0.0;
+}
+
+void ComputeSeries::recordSum()
+{
+    stats.nSums++;
+    stats.nTerms += nIt;
+    if (maxItReached) {
+        stats.nMaxIt++;
+    }
+    if (absErr > stats.maxErr) {
+        stats.maxErr = absErr;
+    }
+}
+
+void ComputeSeries::recordMaxIt()
+{
+    stats.nMaxIt++;
+}
+
+void ComputeSeries::mergeStats(const seriesStats& other)
+{
+    stats.nSums += other.nSums;
+    stats.nTerms += other.nTerms;
+    stats.nMaxIt += other.nMaxIt;
+    if (other.maxErr > stats.maxErr) {
+        stats.maxErr = other.maxErr;
+    }
+}
+
 // Use the function pointer to calculate the sum
 double ComputeSeries::sumForward(double tol, int nMax)
 {
@@ -70,7 +174,8 @@ double ComputeSeries::sumForward(double tol, int nMax)
             // maximum number of iterarion reached
             absErr = eps;
             nIt = i;
-            throw exc_MaxItReached(out, absErr, nIt);
+            maxItReached = true;
+            return out;
         }
     }
     absErr = eps;
@@ -79,11 +184,14 @@ double ComputeSeries::sumForward(double tol, int nMax)
 }
 
 // Use the function pointer to calculate the sum
-double ComputeSeries::sumKahan(double tol)
+double ComputeSeries::sumKahan(double tol, int nMax)
 {
-    //throw exception if tol >=1 or use assert
+    // count a failure if tol >=1 or use assert
     if (tol>=1.0) {
-        throw exc_MaxItReached(2.0, 1.0, 2);
+        absErr = 1.0;
+        nIt = 2;
+        maxItReached = true;
+        return 2.0;
     }
     //assert(tol<1.0);
     
@@ -106,7 +214,258 @@ double ComputeSeries::sumKahan(double tol)
         eps = abs(temp3-out);
         temp3 = out;
         i++;
+        if (i > nMax) {
+            // maximum number of iterarion reached
+            absErr = eps;
+            nIt = i;
+            maxItReached = true;
+            return out;
+        }
     }
     //cout << i << endl;
+    absErr = eps;
+    nIt = i;
+    return out;
+}
+
+// Use the function pointer to calculate a sum with a fixed number of terms
+double ComputeSeries::sumFixed(int nTerms)
+{
+    double out = 0.0;
+    double temp = 0.0;
+    for (int i = 0; i < nTerms; i++)
+    {
+        temp = (this->*p_fct)(i);
+        out = out + temp;
+    }
+    absErr = abs(temp);
+    nIt = nTerms;
+    return out;
+}
+
+// Aitken delta-squared process on the partial sums
+double ComputeSeries::sumAitken(double tol, int nMax)
+{
+    assert(tol<1.0); // this will terminate the execution if true
+    
+    double s0 = 0.0;
+    double s1 = 0.0;
+    double s2 = 0.0;
+    double d0 = 0.0;
+    double d1 = 0.0;
+    double out = 0.0;
+    std::vector<double> estimates;
+    double eps = 1.0; // eps > tol
+    int i = 0;
+    while( eps > tol )
+    {
+        s0 = s1;
+        s1 = s2;
+        s2 = s2 + (this->*p_fct)(i);
+        i++;
+        out = s2;
+        if (i >= 3) {
+            d0 = s1 - s0;
+            d1 = s2 - s1;
+            if (d1 != d0) {
+                out = s2 - d1*d1/(d1-d0);
+            }
+        }
+        estimates.push_back(out);
+        double range = getRange(estimates);
+        if (i > 3) {
+            // two estimates are needed
+            eps = range;
+        }
+        if (i > nMax) {
+            // maximum number of iterarion reached
+            absErr = eps;
+            nIt = i;
+            maxItReached = true;
+            return out;
+        }
+    }
+    absErr = eps;
+    nIt = i;
+    return out;
+}
+
+// Shanks transformation with the epsilon algorithm of Wynn
+double ComputeSeries::sumWynn(double tol, int nMax)
+{
+    assert(tol<1.0); // this will terminate the execution if true
+    
+    std::vector<double> e; // last counter-diagonal of the epsilon table
+    double sum = 0.0;
+    double aux1 = 0.0;
+    double aux2 = 0.0;
+    double diff = 0.0;
+    double out = 0.0;
+    std::vector<double> estimates;
+    double eps = 1.0; // eps > tol
+    int i = 0;
+    while( eps > tol )
+    {
+        sum = sum + (this->*p_fct)(i);
+        e.push_back(sum);
+        aux2 = 0.0;
+        for (int j = i; j >= 1; j--) {
+            aux1 = aux2;
+            aux2 = e[j-1];
+            diff = e[j] - aux2;
+            if (abs(diff) <= TINY) {
+                e[j-1] = HUGE_VALUE;
+            } else {
+                e[j-1] = aux1 + 1.0/diff;
+            }
+        }
+        out = (i % 2 == 0) ? e[0] : e[1];
+        if (!(abs(out) < HUGE_VALUE)) {
+            // the table broke down, e.g. for a finite sum
+            out = sum;
+        }
+        i++;
+        estimates.push_back(out);
+        double range = getRange(estimates);
+        if (i >= 3) {
+            eps = range;
+        }
+        if (i > nMax) {
+            // maximum number of iterarion reached
+            absErr = eps;
+            nIt = i;
+            maxItReached = true;
+            return out;
+        }
+    }
+    absErr = eps;
+    nIt = i;
+    return out;
+}
+
+// Levin u-transformation with the recurrence of Fessler, Ford and Smith
+double ComputeSeries::sumLevin(double tol, int nMax)
+{
+    assert(tol<1.0); // this will terminate the execution if true
+    
+    const double beta = 1.0;
+    std::vector<double> numer;
+    std::vector<double> denom;
+    double sum = 0.0;
+    double temp = 0.0;
+    double term = 0.0;
+    double ratio = 0.0;
+    double fact = 0.0;
+    double out = 0.0;
+    std::vector<double> estimates;
+    double eps = 1.0; // eps > tol
+    int i = 0;
+    int k = 0; // number of transformed terms
+    while( eps > tol )
+    {
+        temp = (this->*p_fct)(i);
+        sum = sum + temp;
+        if (temp == 0.0) {
+            // the remainder estimate vanishes, the term is skipped
+            if (k == 0) {
+                out = sum;
+            }
+        } else {
+            term = 1.0/(beta+k);
+            denom.push_back(term/((beta+k)*temp));
+            numer.push_back(sum*denom[k]);
+            if (k > 0) {
+                ratio = (beta+k-1)*term;
+                for (int j = 1; j <= k; j++) {
+                    fact = (k-j+beta)*term;
+                    numer[k-j] = numer[k-j+1] - fact*numer[k-j];
+                    denom[k-j] = denom[k-j+1] - fact*denom[k-j];
+                    term = term*ratio;
+                }
+            }
+            k++;
+            if (abs(denom[0]) > TINY*TINY) {
+                out = numer[0]/denom[0];
+            }
+            if (!(abs(denom[0]) < HUGE_VALUE*HUGE_VALUE) || !(abs(out) < HUGE_VALUE)) {
+                // the recurrence overflowed, e.g. at a high order
+                out = sum;
+            }
+        }
+        i++;
+        estimates.push_back(out);
+        double range = getRange(estimates);
+        if (i >= 3) {
+            eps = range;
+        }
+        if (i > nMax) {
+            // maximum number of iterarion reached
+            absErr = eps;
+            nIt = i;
+            maxItReached = true;
+            return out;
+        }
+    }
+    absErr = eps;
+    nIt = i;
+    return out;
+}
+
+// Euler transformation with the van Wijngaarden algorithm
+double ComputeSeries::sumEuler(double tol, int nMax)
+{
+    assert(tol<1.0); // this will terminate the execution if true
+    
+    std::vector<double> w; // differences of the terms
+    double temp = 0.0;
+    double dum = 0.0;
+    double out = 0.0;
+    std::vector<double> estimates;
+    double eps = 1.0; // eps > tol
+    int nTerm = 0;
+    int i = 0;
+    while( eps > tol )
+    {
+        temp = (this->*p_fct)(i);
+        if (i == 0) {
+            w.push_back(temp);
+            nTerm = 1;
+            out = 0.5*temp;
+        } else {
+            dum = w[0];
+            w[0] = temp;
+            temp = dum;
+            for (int j = 1; j < nTerm; j++) {
+                dum = w[j];
+                w[j] = 0.5*(w[j-1]+temp);
+                temp = dum;
+            }
+            if ((int)w.size() == nTerm) {
+                w.push_back(0.0);
+            }
+            w[nTerm] = 0.5*(w[nTerm-1]+temp);
+            if (abs(w[nTerm]) <= abs(w[nTerm-1])) {
+                nTerm++;
+                out = out + 0.5*w[nTerm-1];
+            } else {
+                out = out + w[nTerm];
+            }
+        }
+        i++;
+        estimates.push_back(out);
+        double range = getRange(estimates);
+        if (i >= 3) {
+            eps = range;
+        }
+        if (i > nMax) {
+            // maximum number of iterarion reached
+            absErr = eps;
+            nIt = i;
+            maxItReached = true;
+            return out;
+        }
+    }
+    absErr = eps;
+    nIt = i;
     return out;
 }
@@ -13,6 +13,7 @@
 Misc::Misc(miscFct fctName, double x)
 : fctName(fctName)
 , x(x)
+, mode(SERIES)
 {
 }
 
@@ -36,12 +37,58 @@ miscFct Misc::getFct(){
     return fctName;
 }
 
+void Misc::setMode(miscMode Mode){
+    mode = Mode;
+}
+
+miscMode Misc::getMode(){
+    return mode;
+}
+
 double Misc::getResult(double tol, int nMax){
     double result = 0.0;
-    result = getSumForward(tol, nMax);
+    if (mode==CLOSEDFORM) {
+        result = getClosedForm(x);
+    } else {
+        result = getSumForward(tol, nMax);
+    }
     return result;
 }
 
+double Misc::getClosedForm(){
+    return getClosedForm(x);
+}
+
+double Misc::getClosedForm(double x){
+    if (fctName==ALTSINN3) {
+        // sum_n (-1)^n sin(nx)/n^3 = sum_n sin(n(x+pi))/n^3
+        x = x + PI;
+    }
+    // the series is odd and 2*pi periodic
+    double y = fmod(x, 2.0*PI);
+    if (y < 0.0) {
+        y = y + 2.0*PI;
+    }
+    return (2.0*PI*PI*y-3.0*PI*y*y+y*y*y)/12.0;
+}
+
+void Misc::getResultArray(const double* xs, int nx, double tol, int nMax,
+                          double* out){
+    if (mode==CLOSEDFORM) {
+        for (int i = 0; i < nx; i++) {
+            out[i] = getClosedForm(xs[i]);
+        }
+    } else {
+        for (int i = 0; i < nx; i++) {
+            setX(xs[i]);
+            out[i] = getSumForward(tol, nMax);
+        }
+    }
+    if (nx > 0) {
+        setX(xs[nx-1]);
+    }
+}
+
 int Misc::getNbrIt(){
     int result = getLastNumberOfIterations();
     return result;
@@ -67,7 +114,7 @@ double Misc::fct(int n) {
 }
 
 void Misc::getSINN3Expression(double *p_expression, double n){
-    if (x<=0.0001||x>=0.9999*PI) {
+    if (x<=WALLTOL*PI||x>=(1.0-WALLTOL)*PI) {
         // the exact solution is 0.0
         *p_expression = 0.0;
     } else{
@@ -76,7 +123,7 @@ void Misc::getSINN3Expression(double *p_expression, double n){
 }
 
 void Misc::getALTSINN3Expression(double *p_expression, double n){
-    if (x<=0.0001||x>=0.9999*PI) {
+    if (x<=WALLTOL*PI||x>=(1.0-WALLTOL)*PI) {
         // the exact solution is 0.0
         *p_expression = 0.0;
     } else{
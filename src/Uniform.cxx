@@ -8,6 +8,11 @@
  */
 
 #include <iostream> // for debugging
+#include <vector>
+#include <stdexcept>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include "Uniform.h"
 #include "Misc.h"
 
@@ -19,7 +24,11 @@ Uniform::Uniform(node nd, bcType bc, termType term, pUniform params,
 , term(term)
 , axis(axis)
 , baxis(baxis)
+, shortTimeLimit(0.05)
+, nThreads(0)
 {
+    updateKernel();
+    selectKernel();
 }
 
 Uniform::~Uniform()
@@ -28,6 +37,7 @@ Uniform::~Uniform()
 
 void Uniform::setTime(double t){
     nd.t = t;
+    updateKernel();
 }
 
 void Uniform::setXPosition(double x){
@@ -44,10 +54,55 @@ void Uniform::setZPosition(double z){
 
 void Uniform::setAxis(e_axis Axis){
     axis = Axis;
+    selectKernel();
 }
 
 void Uniform::setBoundaryAxis(e_axis Baxis){
     baxis = Baxis;
+    selectKernel();
+}
+
+void Uniform::setAlpha(double alpha){
+    nd.alpha = alpha;
+    updateKernel();
+}
+
+void Uniform::setLength(double l){
+    nd.l = l;
+    updateKernel();
+}
+
+void Uniform::setPosition(double x){
+    switch (axis) {
+        case XAXIS:
+            nd.x = x;
+            break;
+        case YAXIS:
+            nd.y = x;
+            break;
+        case ZAXIS:
+            nd.z = x;
+            break;
+    }
+}
+
+double Uniform::getPosition(){
+    double x = nd.x;
+    if (axis == YAXIS) {
+        x = nd.y;
+    }
+    if (axis == ZAXIS) {
+        x = nd.z;
+    }
+    return x;
+}
+
+void Uniform::setShortTimeLimit(double tau){
+    shortTimeLimit = tau;
+}
+
+double Uniform::getShortTimeLimit(){
+    return shortTimeLimit;
 }
 
 node Uniform::getNode(){
@@ -85,14 +140,12 @@ double Uniform::getSteadyStateDirichlet(){
             }
             break;
         case SOURCE:
-            if (nd.dim==1&&(nd.x<=0.0001||nd.x>=0.9999*nd.l)){
+            if (nd.dim==1&&isOnWall(nd.x)){
                 sol = 0.0;
-            } else if (nd.dim==2&&(nd.x<=0.0001||nd.x>=0.9999*nd.l||
-                                   nd.y<=0.0001||nd.y>=0.9999*nd.l)){
+            } else if (nd.dim==2&&(isOnWall(nd.x)||isOnWall(nd.y))){
                 sol = 0.0;
-            } else if (nd.dim==3&&(nd.x<=0.0001||nd.x>=0.9999*nd.l||
-                                   nd.y<=0.0001||nd.y>=0.9999*nd.l||
-                                   nd.z<=0.0001||nd.z>=0.9999*nd.l)){
+            } else if (nd.dim==3&&(isOnWall(nd.x)||isOnWall(nd.y)||
+                                   isOnWall(nd.z))){
                 sol = 0.0;
             } else {
                 if (nd.dim==1){
@@ -100,6 +153,8 @@ double Uniform::getSteadyStateDirichlet(){
                     miscFct f2 = ALTSINN3;
                     Misc m1(f1 ,nd.x/nd.l*PI);
                     Misc m2(f2 ,nd.x/nd.l*PI);
+                    m1.setMode(CLOSEDFORM);
+                    m2.setMode(CLOSEDFORM);
                     sol = 2.0*params.a0*pow(nd.l,2.0)/(pow(PI,3.0)*nd.alpha)*(
                           m1.getResult(1e-20)-m2.getResult(1e-20));
                 } else if (nd.dim==2) {
@@ -113,7 +168,586 @@ double Uniform::getSteadyStateDirichlet(){
     return sol;
 }
 
+void Uniform::getSteadyStateDirichletArray(const double* xs, int nx,
+                                           double* out){
+    if (term==SOURCE && bc==DIRICHLET && nd.dim==1 && axis==XAXIS) {
+        // evaluate both series with their closed forms at once
+        std::vector<double> thetas(nx);
+        std::vector<double> alt(nx);
+        for (int i = 0; i < nx; i++) {
+            thetas[i] = xs[i]/nd.l*PI;
+        }
+        Misc m(SINN3, 0.0);
+        m.setMode(CLOSEDFORM);
+        m.getResultArray(thetas.data(), nx, 1e-20, 50000, out);
+        m.setFct(ALTSINN3);
+        m.getResultArray(thetas.data(), nx, 1e-20, 50000, alt.data());
+        double c = 2.0*params.a0*pow(nd.l,2.0)/(pow(PI,3.0)*nd.alpha);
+        for (int i = 0; i < nx; i++) {
+            if (isOnWall(xs[i])) {
+                out[i] = 0.0;
+            } else {
+                out[i] = c*(out[i]-alt[i]);
+            }
+        }
+    } else {
+        for (int i = 0; i < nx; i++) {
+            setPosition(xs[i]);
+            out[i] = getSteadyStateDirichlet();
+        }
+    }
+    if (nx > 0) {
+        setPosition(xs[nx-1]);
+    }
+}
+
+void Uniform::setNumberOfThreads(int n){
+    nThreads = (n > 0) ? n : 0;
+}
+
+int Uniform::getNumberOfThreads(){
+#ifdef _OPENMP
+    return (nThreads > 0) ? nThreads : omp_get_max_threads();
+#else
+    return 1;
+#endif
+}
+
+void Uniform::getSumForwardArray(const double* xs, int nx, const double* ts,
+                                 int nt, double tol, int nMax, double* out,
+                                 int* nIts, double* errs){
+    long size = (long)nt*nx;
+    #pragma omp parallel num_threads(getNumberOfThreads())
+    {
+        // every thread evaluates the nodes with its own instance
+        Uniform u(nd, bc, term, params, axis, baxis);
+        u.setShortTimeLimit(shortTimeLimit);
+        int jLast = -1;
+        bool steady = false;
+        bool shortTime = false;
+        #pragma omp for schedule(dynamic, 64)
+        for (long k = 0; k < size; k++) {
+            int j = (int)(k/nx);
+            if (j != jLast) {
+                u.setTime(ts[j]);
+                steady = u.isSteadyTime(tol);
+                // the images stop on an image below tol, as the terms
+                shortTime = tol > 0.0 && tol < 1.0 && u.isShortTime();
+                jLast = j;
+            }
+            if (steady) {
+                // every mode has decayed, the transient expression vanishes
+                out[k] = 0.0;
+                if (nIts) nIts[k] = 0;
+                if (errs) errs[k] = u.getTailBound(0);
+                continue;
+            }
+            u.setPosition(xs[k%nx]);
+            if (shortTime) {
+                out[k] = u.getSumImages(tol, nMax);
+            } else {
+                out[k] = u.getSumForward(tol, nMax);
+            }
+            if (nIts) nIts[k] = u.getLastNumberOfIterations();
+            if (errs) errs[k] = u.getLastAbsoluteError();
+        }
+        #pragma omp critical
+        mergeStats(u.getStats());
+    }
+    if (size > 0) {
+        setTime(ts[nt-1]);
+        setPosition(xs[nx-1]);
+    }
+}
+
+int Uniform::getNumberOfTerms(double rtol, int nMax){
+    checkRelativeTolerance(rtol);
+    if (nd.t <= 0.0) {
+        // if t=0, the exact solution is given by the first term
+        return 1;
+    }
+    // k_n = (p*n+q)*PI/l
+    double p = 2.0;
+    double q = 1.0;
+    if (term==BOUNDARY && axis==baxis) {
+        p = 1.0;
+    }
+    double tau = nd.alpha*pow(PI,2.0)*nd.t/pow(nd.l,2.0);
+    double N = ceil((sqrt(-log(rtol)/tau)-q)/p);
+    if (N < 0.0) {
+        N = 0.0;
+    }
+    while (N <= nMax && exp(-tau*pow(p*N+q,2.0))/
+           (1.0-exp(-2.0*p*tau*(p*N+q))) > rtol) {
+        N = N + 1.0;
+    }
+    if (N > nMax) {
+        return nMax+1;
+    }
+    return (int)N;
+}
+
+double Uniform::getSumTruncated(double rtol, int nMax){
+    if (isShortTime()) {
+        return getSumImages(rtol, nMax);
+    }
+    int nTerms = getNumberOfTerms(rtol, nMax);
+    double result = getSumFixed(nTerms);
+    if (nTerms > nMax) {
+        recordMaxIt();
+    }
+    return result;
+}
+
+void Uniform::getSumRecurrenceArray(const double* xs, int nx,
+                                    const double* ts, int nt, double rtol,
+                                    int nMax, int anchor, double* out,
+                                    int* nIts, double* errs){
+    assert(anchor>0); // this will terminate the execution if false
+    checkRelativeTolerance(rtol);
+    std::vector<int> nTerms(nt, 0);
+    int nModes = 0;
+    for (int j = 0; j < nt; j++) {
+        setTime(ts[j]);
+        if (ts[j] > 0.0) {
+            nTerms[j] = getNumberOfTerms(rtol, nMax);
+            if (nTerms[j] > nModes) {
+                nModes = nTerms[j];
+            }
+            // every node of the row sums nTerms[j] terms
+            double bound = getTailBound(nTerms[j]);
+            seriesStats row = {nx, (long)nTerms[j]*nx,
+                               (nTerms[j] > nMax) ? nx : 0, bound};
+            mergeStats(row);
+            for (int i = 0; i < nx; i++) {
+                out[j*nx+i] = 0.0;
+                if (nIts) nIts[j*nx+i] = nTerms[j];
+                if (errs) errs[j*nx+i] = bound;
+            }
+        } else {
+            // if t=0, the exact solution is given by the first term
+            for (int i = 0; i < nx; i++) {
+                setPosition(xs[i]);
+                out[j*nx+i] = getSumFixed(1);
+                if (nIts) nIts[j*nx+i] = 1;
+                if (errs) errs[j*nx+i] = 0.0;
+            }
+        }
+    }
+    if (bc != DIRICHLET || nModes == 0) {
+        return;
+    }
+    // k_n = (p*n+q)*PI/l
+    double p = 2.0;
+    double q = 1.0;
+    if (term==BOUNDARY && axis==baxis) {
+        p = 1.0;
+    }
+    bool uniform = nt > 1 && ts[1] > ts[0];
+    double dt = (nt > 1) ? ts[1]-ts[0] : 0.0;
+    for (int j = 1; j < nt-1 && uniform; j++) {
+        uniform = abs(ts[j+1]-ts[j]-dt) <= 1e-9*dt;
+    }
+    std::vector<double> s0(nx), s1(nx), c2(nx), e(nt);
+    for (int i = 0; i < nx; i++) {
+        c2[i] = 2.0*cos(p*PI/nd.l*xs[i]);
+    }
+    for (int n = 0; n < nModes; n++) {
+        double m = p*n+q;
+        double arg = m*PI/nd.l;
+        if (n%anchor == 0) {
+            for (int i = 0; i < nx; i++) {
+                s0[i] = sin((m-p)*PI/nd.l*xs[i]);
+                s1[i] = sin(arg*xs[i]);
+            }
+        } else {
+            for (int i = 0; i < nx; i++) {
+                double temp = c2[i]*s1[i]-s0[i];
+                s0[i] = s1[i];
+                s1[i] = temp;
+            }
+        }
+        if (uniform) {
+            double d = exp(-nd.alpha*(arg*arg)*dt);
+            for (int j = 0; j < nt; j++) {
+                if (j%anchor == 0) {
+                    e[j] = exp(-nd.alpha*(arg*arg)*ts[j]);
+                } else {
+                    e[j] = e[j-1]*d;
+                }
+            }
+        } else {
+            for (int j = 0; j < nt; j++) {
+                e[j] = exp(-nd.alpha*(arg*arg)*ts[j]);
+            }
+        }
+        double c = getCoefficient(n);
+        for (int j = 0; j < nt; j++) {
+            if (nTerms[j] > n) {
+                double ce = c*e[j];
+                for (int i = 0; i < nx; i++) {
+                    out[j*nx+i] += ce*s1[i];
+                }
+            }
+        }
+    }
+    if (term != BOUNDARY) {
+        // if at the boundaries, the exact solution is 0.0
+        for (int i = 0; i < nx; i++) {
+            if (isOnWall(xs[i])) {
+                for (int j = 0; j < nt; j++) {
+                    out[j*nx+i] = 0.0;
+                }
+            }
+        }
+    }
+}
+
+bool Uniform::isSteadyTime(double tol){
+    if (bc != DIRICHLET || nd.t <= 0.0) {
+        return false;
+    }
+    // k_n = (p*n+q)*PI/l, the coefficients decrease as 1/(p*n+q)
+    double p = 2.0;
+    double q = 1.0;
+    if (term==BOUNDARY && axis==baxis) {
+        p = 1.0;
+    }
+    double cmax = getMaxCoefficient();
+    double tau = nd.alpha*pow(PI,2.0)*nd.t/pow(nd.l,2.0);
+    return cmax*exp(-tau*q*q)/(1.0-exp(-2.0*p*tau*q)) <= tol;
+}
+
+double Uniform::getMaxCoefficient(){
+    return fmax(abs(getCoefficient(0)), abs(getCoefficient(1)));
+}
+
+double Uniform::getTailBound(int N){
+    if (bc != DIRICHLET || nd.t <= 0.0) {
+        return 0.0;
+    }
+    // k_n = (p*n+q)*PI/l
+    double p = 2.0;
+    double q = 1.0;
+    if (term==BOUNDARY && axis==baxis) {
+        p = 1.0;
+    }
+    double m = p*N+q;
+    double tau = nd.alpha*pow(PI,2.0)*nd.t/pow(nd.l,2.0);
+    return getMaxCoefficient()*exp(-tau*m*m)/(1.0-exp(-2.0*p*tau*m));
+}
+
+bool Uniform::isOnWall(double x){
+    return x<=WALLTOL*nd.l||x>=(1.0-WALLTOL)*nd.l;
+}
+
+bool Uniform::isShortTime(){
+    if (bc != DIRICHLET || nd.t <= 0.0 || (term==SOURCE && axis==XAXIS)) {
+        return false;
+    }
+    return nd.alpha*nd.t/pow(nd.l,2.0) < shortTimeLimit;
+}
+
+void Uniform::checkRelativeTolerance(double rtol){
+    if (!(rtol>0.0&&rtol<1.0)) {
+        throw std::invalid_argument("rtol is not valid, rtol must be "
+                                    "between 0 and 1.");
+    }
+}
+
+double Uniform::getImagesInitial(double x, double rtol, int nMax){
+    double s = 2.0*sqrt(nd.alpha*nd.t);
+    double out = 1.0;
+    double temp = 1.0;
+    double sign = 1.0;
+    int m = 0;
+    while (temp > rtol) {
+        temp = erfc((m*nd.l+x)/s)+erfc(((m+1.0)*nd.l-x)/s);
+        out = out - sign*temp;
+        sign = -sign;
+        m++;
+        if (m > nMax) {
+            // maximum number of images reached
+            maxItReached = true;
+            break;
+        }
+    }
+    absErr = temp;
+    nIt = nIt + m;
+    return out;
+}
+
+double Uniform::getImagesBoundary(double x, double rtol, int nMax){
+    double s = 2.0*sqrt(nd.alpha*nd.t);
+    double out = 0.0;
+    double temp = 1.0;
+    int m = 0;
+    while (temp > rtol) {
+        temp = erfc((2.0*m*nd.l+x)/s);
+        out = out + temp - erfc((2.0*(m+1.0)*nd.l-x)/s);
+        m++;
+        if (m > nMax) {
+            // maximum number of images reached
+            maxItReached = true;
+            break;
+        }
+    }
+    absErr = temp;
+    nIt = nIt + m;
+    return out;
+}
+
+double Uniform::getSumImages(double rtol, int nMax){
+    checkRelativeTolerance(rtol);
+    if (bc != DIRICHLET || nd.t <= 0.0 || (term==SOURCE && axis==XAXIS)) {
+        // Only the eigenfunction series is defined
+        return getSumTruncated(rtol, nMax);
+    }
+    double x = getPosition();
+    double dim = (double)nd.dim;
+    double sol = 0.0;
+    nIt = 0;
+    absErr = 0.0;
+    maxItReached = false;
+    switch (term) {
+        case INITIAL:
+            if (!isOnWall(x)) {
+                sol = pow(params.a0,1.0/dim)*
+                      getImagesInitial(x, rtol, nMax);
+            }
+            break;
+        case BOUNDARY:
+            if (params.a1==0.0 && params.a2==0.0){
+                sol = 0.0;
+            } else if (axis==baxis) {
+                sol = (params.a1*getImagesBoundary(x, rtol, nMax)+
+                       params.a2*getImagesBoundary(nd.l-x, rtol, nMax)-
+                       params.a1-(params.a2-params.a1)*x/nd.l)/
+                      pow(dim,1.0/dim);
+            } else {
+                sol = getImagesInitial(x, rtol, nMax)/pow(dim,1.0/dim);
+            }
+            break;
+        case SOURCE:
+            if (!isOnWall(x)) {
+                double aini = params.a0*pow(nd.l,2.0)/(dim*nd.alpha*
+                                                       pow(PI,2.0+dim));
+                sol = 2.0*pow(aini,1.0/dim)*PI/2.0*
+                      getImagesInitial(x, rtol, nMax);
+            }
+            break;
+    }
+    recordSum();
+    return sol;
+}
+
+void Uniform::getSumTruncatedArray(const double* xs, int nx, const double* ts,
+                                   int nt, double rtol, int nMax, double* out,
+                                   int* nIts, double* errs){
+    // an exception can't leave the parallel region
+    checkRelativeTolerance(rtol);
+    long size = (long)nt*nx;
+    #pragma omp parallel num_threads(getNumberOfThreads())
+    {
+        // every thread evaluates the nodes with its own instance
+        Uniform u(nd, bc, term, params, axis, baxis);
+        u.setShortTimeLimit(shortTimeLimit);
+        int jLast = -1;
+        bool shortTime = false;
+        int nTerms = 0;
+        double bound = 0.0;
+        #pragma omp for schedule(dynamic, 64)
+        for (long k = 0; k < size; k++) {
+            int j = (int)(k/nx);
+            if (j != jLast) {
+                // the number of terms is shared by every node at a given time
+                u.setTime(ts[j]);
+                shortTime = u.isShortTime();
+                if (!shortTime) {
+                    nTerms = u.getNumberOfTerms(rtol, nMax);
+                    bound = u.getTailBound(nTerms);
+                }
+                jLast = j;
+            }
+            u.setPosition(xs[k%nx]);
+            if (shortTime) {
+                out[k] = u.getSumImages(rtol, nMax);
+                if (nIts) nIts[k] = u.getLastNumberOfIterations();
+                if (errs) errs[k] = u.getLastAbsoluteError();
+            } else {
+                out[k] = u.getSumFixed(nTerms);
+                if (nTerms > nMax) {
+                    u.recordMaxIt();
+                }
+                if (nIts) nIts[k] = nTerms;
+                if (errs) errs[k] = bound;
+            }
+        }
+        #pragma omp critical
+        mergeStats(u.getStats());
+    }
+    if (size > 0) {
+        setTime(ts[nt-1]);
+        setPosition(xs[nx-1]);
+    }
+}
+
+void Uniform::updateKernel(){
+    double dim = (double)nd.dim;
+    kc.xmin = WALLTOL*nd.l;
+    kc.xmax = (1.0-WALLTOL)*nd.l;
+    kc.zero = (params.a1==0.0 && params.a2==0.0);
+    kc.edge1 = 0.0;
+    kc.edge2 = 0.0;
+    switch (term) {
+        case INITIAL:
+            kc.init = pow(params.a0,1.0/dim);
+            kc.amp = kc.init*(2.0/PI)*2.0;
+            break;
+        case BOUNDARY:
+            kc.init = 0.0;
+            kc.amp = 2.0/(PI*pow(dim,1.0/dim));
+            kc.edge1 = pow(params.a1,1.0/dim);
+            kc.edge2 = pow(params.a2,1.0/dim);
+            break;
+        case SOURCE:
+            double aini = params.a0*pow(nd.l,2.0)/(dim*nd.alpha*
+                                                   pow(PI,2.0+dim));
+            kc.init = 2.0*pow(aini,1.0/dim);
+            kc.amp = kc.init*2.0;
+            break;
+    }
+}
+
+template <termType TERM, e_axis AXIS, e_axis BAXIS>
+double Uniform::dirichletKernel(int n){
+    const double x = (AXIS==XAXIS) ? nd.x : ((AXIS==YAXIS) ? nd.y : nd.z);
+    if (TERM==BOUNDARY) {
+        if (kc.zero) {
+            return 0.0;
+        } else if (nd.t == 0.0) {
+            if (n==0 && x<=kc.xmin) {
+                return kc.edge1;
+            } else if (n==0 && x>=kc.xmax) {
+                return kc.edge2;
+            }
+            return 0.0;
+        } else if (AXIS==BAXIS) {
+            // (-1)^(n+1)*a2-a1 without pow
+            double m = n+1.0;
+            double a = (n%2==0) ? -params.a2-params.a1 : params.a2-params.a1;
+            double arg = m*PI/nd.l;
+            return kc.amp/m*a*sin(arg*x)*exp(-nd.alpha*(arg*arg)*nd.t);
+        }
+        double m = 2.0*n+1.0;
+        double arg = m*PI/nd.l;
+        return kc.amp*2.0/m*sin(arg*x)*exp(-nd.alpha*(arg*arg)*nd.t);
+    }
+    if (x<=kc.xmin||x>=kc.xmax) {
+        // if at the boundaries, the exact solution is 0.0
+        return 0.0;
+    } else if (nd.t == 0.0) {
+        return (n==0) ? kc.init : 0.0;
+    }
+    // the arithmetic of the arguments is the one of the generic expressions
+    // since the forward summation stops on the first term below tol
+    double m = 2.0*n+1.0;
+    double arg = m*PI/nd.l;
+    if (TERM==SOURCE && AXIS==XAXIS) {
+        return kc.amp/(m*m*m)*sin(arg*x)*exp(-nd.alpha*(arg*arg)*nd.t);
+    }
+    return kc.amp/m*sin(arg*x)*exp(-nd.alpha*(arg*arg)*nd.t);
+}
+
+double Uniform::zeroKernel(int n){
+    return 0.0;
+}
+
+template <termType TERM, e_axis AXIS>
+void Uniform::selectBoundaryAxisKernel(){
+    switch (baxis) {
+        case XAXIS:
+            p_kernel = &Uniform::dirichletKernel<TERM, AXIS, XAXIS>;
+            break;
+        case YAXIS:
+            p_kernel = &Uniform::dirichletKernel<TERM, AXIS, YAXIS>;
+            break;
+        case ZAXIS:
+            p_kernel = &Uniform::dirichletKernel<TERM, AXIS, ZAXIS>;
+            break;
+    }
+}
+
+template <termType TERM>
+void Uniform::selectAxisKernel(){
+    switch (axis) {
+        case XAXIS:
+            selectBoundaryAxisKernel<TERM, XAXIS>();
+            break;
+        case YAXIS:
+            selectBoundaryAxisKernel<TERM, YAXIS>();
+            break;
+        case ZAXIS:
+            selectBoundaryAxisKernel<TERM, ZAXIS>();
+            break;
+    }
+}
+
+void Uniform::selectKernel(){
+    if (bc != DIRICHLET) {
+        // the other transient expressions aren't implemented yet
+        p_kernel = &Uniform::zeroKernel;
+        return;
+    }
+    switch (term) {
+        case INITIAL:
+            selectAxisKernel<INITIAL>();
+            break;
+        case BOUNDARY:
+            selectAxisKernel<BOUNDARY>();
+            break;
+        case SOURCE:
+            selectAxisKernel<SOURCE>();
+            break;
+    }
+}
+
+double Uniform::getCoefficient(int n){
+    if (bc != DIRICHLET) {
+        return 0.0;
+    }
+    double m = 2.0*n+1.0;
+    switch (term) {
+        case INITIAL:
+            return kc.amp/m;
+        case BOUNDARY:
+            if (kc.zero) {
+                return 0.0;
+            } else if (axis==baxis) {
+                m = n+1.0;
+                double a = (n%2==0) ? -params.a2-params.a1
+                                    : params.a2-params.a1;
+                return kc.amp/m*a;
+            }
+            return kc.amp*2.0/m;
+        case SOURCE:
+            if (axis==XAXIS) {
+                return kc.amp/(m*m*m);
+            }
+            return kc.amp/m;
+    }
+    return 0.0;
+}
+
 double Uniform::fct(int n) {
+    return (this->*p_kernel)(n);
+}
+
+double Uniform::getTerm(int n) {
+    return (this->*p_kernel)(n);
+}
+
+double Uniform::getReferenceTerm(int n) {
     double expression = 0.0;
     double var =  (double) n;
     switch (bc) {
@@ -148,7 +782,7 @@ void Uniform::getDirichletTransientExpression(double *p_expression, double n){
      }
     switch (term) {
         case INITIAL:
-            if (x<=0.0001||x>=0.9999*nd.l) {
+            if (isOnWall(x)) {
                 // if at the boundaries, the exact solution is 0.0
                 *p_expression = 0.0;
             } else if (nd.t == 0.0) {
@@ -171,9 +805,9 @@ void Uniform::getDirichletTransientExpression(double *p_expression, double n){
                 if (n==0) {
                     /* if t=0.0 and at the boundaries, the exact solution is
                      * the initial temperature */
-                    if (x<=0.0001){
+                    if (x<=WALLTOL*nd.l){
                         *p_expression = pow(params.a1,1.0/(double)nd.dim);
-                    } else if (x>=0.9999*nd.l){
+                    } else if (x>=(1.0-WALLTOL)*nd.l){
                         *p_expression = pow(params.a2,1.0/(double)nd.dim);
                     } else {
                         // if t=0.0, the exact solution is 0.0 on the domain
@@ -227,7 +861,7 @@ void Uniform::getDirichletTransientExpression(double *p_expression, double n){
             double aini = params.a0*pow(nd.l,2.0)/((double)nd.dim*
                                                    nd.alpha*
                                                    pow(PI,2.0+(double)nd.dim));
-            if (x<=0.0001||x>=0.9999*nd.l) {
+            if (isOnWall(x)) {
                 // if at the boundaries, the exact solution is 0.0
                 *p_expression = 0.0;
             } else if (nd.t == 0.0) {
@@ -42,3 +42,84 @@ TEST(ComputeSeriesTest, testSumKahan) {
     // Geometric series exact solution is out = 1/(1-r), where r = 1/2
     EXPECT_NEAR(out, 2.0, 1e-20);
 }
+
+TEST(ComputeSeriesTest, testSumFixed) {
+    Dummy d;
+    double out = d.getSumFixed(10);
+    // Partial sum of the geometric series is 2*(1-r^N), where r = 1/2
+    EXPECT_NEAR(out, 2.0*(1.0-pow(0.5, 10.0)), 1e-15);
+    EXPECT_EQ(10, d.getLastNumberOfIterations());
+    EXPECT_NEAR(pow(0.5, 9.0), d.getLastAbsoluteError(), 1e-15);
+}
+
+// Alternating series of ln(2), the forward sum converges slowly
+class AltDummy :public ComputeSeries {
+public:
+    AltDummy();
+    ~AltDummy();
+private:
+    double fct(int n);
+};
+AltDummy::AltDummy(){}
+AltDummy::~AltDummy(){}
+double AltDummy::fct(int n) {
+    double var =  (double) n;
+    double expression = pow(-1.0,var)/(var+1.0);
+    return expression;
+}
+
+TEST(ComputeSeriesTest, testSumAccelerated) {
+    // Geometric series exact solution is out = 1/(1-r), where r = 1/2
+    Dummy d;
+    EXPECT_NEAR(2.0, d.getSumAitken(1e-15), 1e-14);
+    EXPECT_NEAR(2.0, d.getSumWynn(1e-15), 1e-14);
+    EXPECT_NEAR(2.0, d.getSumLevin(1e-15), 1e-14);
+    EXPECT_NEAR(2.0, d.getSumEuler(1e-15), 1e-14);
+    // The alternating series needs 10^8 terms with the forward sum
+    AltDummy a;
+    double expected = log(2.0);
+    EXPECT_NEAR(expected, a.getSumAitken(1e-12), 1e-9);
+    EXPECT_NEAR(expected, a.getSumWynn(1e-14), 1e-13);
+    EXPECT_GT(40, a.getLastNumberOfIterations());
+    EXPECT_NEAR(expected, a.getSumLevin(1e-14), 1e-13);
+    EXPECT_GT(40, a.getLastNumberOfIterations());
+    EXPECT_NEAR(expected, a.getSumEuler(1e-14), 1e-13);
+    EXPECT_GT(100, a.getLastNumberOfIterations());
+}
+
+TEST(ComputeSeriesTest, testSumMaxIt) {
+    // The maximum number of iterations is reached, the last estimate is
+    // returned
+    AltDummy a;
+    double out = a.getSumKahan(1e-20, 100);
+    EXPECT_EQ(101, a.getLastNumberOfIterations());
+    EXPECT_NEAR(log(2.0), out, 1e-2);
+    a.getSumAitken(1e-20, 50);
+    EXPECT_EQ(51, a.getLastNumberOfIterations());
+}
+
+TEST(ComputeSeriesTest, testStats) {
+    // The maximum iteration hits are counted instead of being reported
+    AltDummy a;
+    seriesStats s = a.getStats();
+    EXPECT_EQ(0, s.nSums);
+    a.getSumForward(1e-20, 100);
+    double err = a.getLastAbsoluteError();
+    a.getSumForward(1e-20, 40);
+    a.getSumFixed(10);
+    s = a.getStats();
+    EXPECT_EQ(3, s.nSums);
+    EXPECT_EQ(101+41+10, s.nTerms);
+    EXPECT_EQ(2, s.nMaxIt);
+    EXPECT_EQ(fmax(err, a.getLastAbsoluteError()), s.maxErr);
+    a.resetStats();
+    s = a.getStats();
+    EXPECT_EQ(0, s.nSums);
+    EXPECT_EQ(0, s.nTerms);
+    EXPECT_EQ(0, s.nMaxIt);
+    EXPECT_EQ(0.0, s.maxErr);
+    Dummy d;
+    d.getSumForward(1e-20);
+    EXPECT_EQ(0, d.getStats().nMaxIt);
+    EXPECT_EQ(d.getLastNumberOfIterations(), d.getStats().nTerms);
+}
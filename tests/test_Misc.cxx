@@ -35,3 +35,81 @@ TEST(MiscTest, testALTSINN3) {
     double result = m.getResult(1e-20);
     EXPECT_NEAR(expected, result, 1e-4);
 }
+
+/**
+ *  \test Test the acceleration methods on ALTSINN3
+ */
+TEST(MiscTest, testALTSINN3Accelerated) {
+    miscFct fctName = ALTSINN3;
+    double x = 1.0;
+    Misc m(fctName, x);
+    // Closed form of the series for -pi <= x <= pi
+    double expected = (x*x*x-PI*PI*x)/12.0;
+    double forward = m.getSumForward(1e-12);
+    int nForward = m.getLastNumberOfIterations();
+    EXPECT_NEAR(expected, forward, 1e-8);
+    EXPECT_NEAR(expected, m.getSumWynn(1e-12), 1e-12);
+    EXPECT_GT(nForward, m.getLastNumberOfIterations());
+    EXPECT_NEAR(expected, m.getSumEuler(1e-12), 1e-12);
+    EXPECT_GT(nForward, m.getLastNumberOfIterations());
+    EXPECT_NEAR(expected, m.getSumLevin(1e-12), 1e-12);
+    EXPECT_NEAR(expected, m.getSumAitken(1e-12), 1e-12);
+    // the estimates met the tolerance before the maximum number of iterations
+    seriesStats stats = m.getStats();
+    EXPECT_EQ(0, stats.nMaxIt);
+    EXPECT_GE(1e-12, stats.maxErr);
+}
+
+/**
+ *  \test Test the closed forms against the series
+ */
+TEST(MiscTest, testClosedForm) {
+    miscFct fcts[2] = {SINN3, ALTSINN3};
+    for (int f = 0; f < 2; f++) {
+        Misc m(fcts[f], 0.0);
+        EXPECT_EQ(SERIES, m.getMode());
+        for (int i = 1; i < 10; i++) {
+            m.setX(i*0.1*PI);
+            m.setMode(SERIES);
+            double series = m.getResult(1e-20);
+            m.setMode(CLOSEDFORM);
+            // the forward sum stops at the first term below tol
+            EXPECT_NEAR(series, m.getResult(1e-20), 1e-4);
+            EXPECT_EQ(m.getClosedForm(), m.getResult(1e-20));
+        }
+    }
+    // odd and 2*pi periodic
+    Misc m(SINN3, 1.0);
+    m.setMode(CLOSEDFORM);
+    double expected = m.getResult(1e-20);
+    m.setX(1.0+2.0*PI);
+    EXPECT_NEAR(expected, m.getResult(1e-20), 1e-12);
+    m.setX(-1.0);
+    EXPECT_NEAR(-expected, m.getResult(1e-20), 1e-12);
+    m.setFct(ALTSINN3);
+    m.setX(1.0);
+    EXPECT_NEAR((1.0-PI*PI)/12.0, m.getResult(1e-20), 1e-12);
+}
+
+/**
+ *  \test Test getResultArray
+ */
+TEST(MiscTest, testResultArray) {
+    const int nx = 9;
+    double xs[nx];
+    double out[nx];
+    for (int i = 0; i < nx; i++) {
+        xs[i] = (i+1)*0.1*PI;
+    }
+    miscMode modes[2] = {SERIES, CLOSEDFORM};
+    for (int k = 0; k < 2; k++) {
+        Misc m(ALTSINN3, 0.0);
+        m.setMode(modes[k]);
+        m.getResultArray(xs, nx, 1e-20, 50000, out);
+        EXPECT_EQ(xs[nx-1], m.getX());
+        for (int i = 0; i < nx; i++) {
+            m.setX(xs[i]);
+            EXPECT_EQ(m.getResult(1e-20), out[i]);
+        }
+    }
+}
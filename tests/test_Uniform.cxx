@@ -9,6 +9,7 @@
 #include "gtest/gtest.h"
 #include "Uniform.h"
 #include <iomanip>
+#include <stdexcept>
 //cout << "result: " << setprecision(15) << 0.111111 << endl;
 
 bcType bc;
@@ -190,12 +191,22 @@ TEST(UniformTest, testSteadyStateDirichletSource1D) {
                             311.72069986098154, 299.25187185279117,
                             261.84538783432765, 199.5012478281343,
                             112.21945186849355, 0.0 };
+    double xs[11];
+    double array[11];
     for (int i = 0; i < 11; i++)
     {
-        u.setXPosition(i*nd.l/10.0);
+        xs[i] = i*nd.l/10.0;
+        u.setXPosition(xs[i]);
         result = u.getSteadyStateDirichlet();
         EXPECT_NEAR(expected[i], result, 1e-2);
     }
+    u.getSteadyStateDirichletArray(xs, 11, array);
+    for (int i = 0; i < 11; i++)
+    {
+        // closed form a0*x*(l-x)/(2*alpha)
+        EXPECT_NEAR(ps.a0*xs[i]*(nd.l-xs[i])/(2.0*nd.alpha), array[i], 1e-9);
+        EXPECT_NEAR(expected[i], array[i], 1e-2);
+    }
 }
 
 /**
@@ -913,3 +924,523 @@ TEST(UniformTest, testDirichletBoundary3D) {
     }
 }
 
+
+/**
+ *  \test Test the batch evaluation against the node by node evaluation.
+ */
+TEST(UniformTest, testGetSumForwardArray) {
+    bc = DIRICHLET;
+    term = BOUNDARY;
+    nd.dim = 1;
+    e_axis axis = xstr;
+    e_axis baxis = xstr;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 0.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    Uniform u(nd, bc, term, ps, axis, baxis);
+    
+    double xs [11];
+    double ts [3] = {0.0, 0.01, 0.1};
+    double out [33];
+    for (int i = 0; i < 11; i++)
+    {
+        xs[i] = i*nd.l/10.0;
+    }
+    u.getSumForwardArray(xs, 11, ts, 3, 1e-20, 50000, out);
+    for (int j = 0; j < 3; j++)
+    {
+        u.setTime(ts[j]);
+        for (int i = 0; i < 11; i++)
+        {
+            u.setXPosition(xs[i]);
+            // the method of images at the short times
+            if (u.isShortTime()) {
+                EXPECT_EQ(u.getSumImages(1e-20), out[j*11+i]);
+            } else {
+                EXPECT_EQ(u.getSumForward(1e-20), out[j*11+i]);
+            }
+        }
+    }
+}
+
+/**
+ *  \test Test the a priori number of terms and the truncated sum against the
+ *  initial term for the Dirichlet boundary condition in 1D.
+ */
+TEST(UniformTest, testDirichletInitialTruncated1D) {
+    bc = DIRICHLET;
+    term = INITIAL;
+    nd.dim = 1;
+    e_axis axis = xstr;
+    e_axis baxis = xstr;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 0.0;
+    ps.a2 = 0.0;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    Uniform u(nd, bc, term, ps, axis, baxis);
+    
+    // Only the first term is needed at t=0
+    EXPECT_EQ(1, u.getNumberOfTerms(1e-12));
+    // The number of terms decreases with time
+    int previous = 50001;
+    double ts [4] = {1e-6, 1e-4, 1e-2, 1.0};
+    for (int j = 0; j < 4; j++)
+    {
+        u.setTime(ts[j]);
+        int nTerms = u.getNumberOfTerms(1e-12);
+        EXPECT_LE(nTerms, previous);
+        previous = nTerms;
+    }
+    // The number of terms is at most nMax+1
+    u.setTime(1e-12);
+    EXPECT_EQ(101, u.getNumberOfTerms(1e-12, 100));
+    
+    u.setTime(0.01);
+    double expected [11] = { 0.00000000e+00, 1.56149963e+02, 2.52810233e+02,
+        2.89831321e+02, 2.98590052e+02, 2.99755829e+02,
+        2.98590052e+02, 2.89831321e+02, 2.52810233e+02,
+        1.56149963e+02, 0.00000000e+00 };
+    for (int i = 0; i < 11; i++)
+    {
+        u.setXPosition(i*nd.l/10.0);
+        EXPECT_NEAR(expected[i], u.getSumTruncated(1e-12), 1e-6);
+    }
+}
+
+/**
+ *  \test Cross-check the method of images against the eigenfunction series
+ *  for the Dirichlet boundary condition at short and moderate times.
+ */
+TEST(UniformTest, testDirichletImages) {
+    bc = DIRICHLET;
+    nd.dim = 2;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 0.5;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    termType terms [4] = {INITIAL, BOUNDARY, BOUNDARY, SOURCE};
+    e_axis baxes [4] = {xstr, xstr, ystr, xstr};
+    e_axis axes [4] = {xstr, xstr, xstr, ystr};
+    double taus [5] = {1e-5, 1e-4, 1e-3, 1e-2, 0.1};
+    for (int k = 0; k < 4; k++)
+    {
+        Uniform u(nd, bc, terms[k], ps, axes[k], baxes[k]);
+        for (int j = 0; j < 5; j++)
+        {
+            u.setTime(taus[j]*nd.l*nd.l/nd.alpha);
+            for (int i = 1; i < 20; i++)
+            {
+                u.setXPosition(i*nd.l/20.0);
+                u.setYPosition(i*nd.l/20.0);
+                double expected = u.getSumFixed(u.getNumberOfTerms(1e-14));
+                double result = u.getSumImages(1e-14);
+                EXPECT_NEAR(expected, result, 1e-9);
+                // The number of images is bounded, F is evaluated twice
+                // for the boundary term
+                if (u.isShortTime()) {
+                    EXPECT_LE(u.getLastNumberOfIterations(), 6);
+                }
+            }
+        }
+    }
+}
+
+/**
+ *  \test Test the automatic switch between the method of images and the
+ *  eigenfunction series.
+ */
+TEST(UniformTest, testShortTime) {
+    bc = DIRICHLET;
+    term = INITIAL;
+    nd.dim = 1;
+    e_axis axis = xstr;
+    e_axis baxis = xstr;
+    nd.x = 0.5;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 0.0;
+    ps.a2 = 0.0;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    Uniform u(nd, bc, term, ps, axis, baxis);
+    
+    EXPECT_FALSE(u.isShortTime());
+    u.setTime(1e-6);
+    EXPECT_TRUE(u.isShortTime());
+    EXPECT_NEAR(300.0, u.getSumTruncated(1e-12), 1e-9);
+    EXPECT_LE(u.getLastNumberOfIterations(), 2);
+    u.setShortTimeLimit(0.0);
+    EXPECT_FALSE(u.isShortTime());
+    EXPECT_NEAR(300.0, u.getSumTruncated(1e-12), 1e-9);
+    u.setTime(0.1);
+    u.setShortTimeLimit(0.05);
+    EXPECT_FALSE(u.isShortTime());
+}
+
+/**
+ *  \test Test the maximum number of images and the relative error target
+ *  of the method of images.
+ */
+TEST(UniformTest, testImagesMaxIt) {
+    bc = DIRICHLET;
+    nd.dim = 1;
+    e_axis axis = xstr;
+    e_axis baxis = xstr;
+    nd.x = 0.05;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.04;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    termType terms [2] = {INITIAL, BOUNDARY};
+    for (int k = 0; k < 2; k++)
+    {
+        Uniform u(nd, bc, terms[k], ps, axis, baxis);
+        u.setShortTimeLimit(0.05);
+        EXPECT_THROW(u.getSumImages(-1.0), std::invalid_argument);
+        EXPECT_THROW(u.getSumImages(1.5), std::invalid_argument);
+        EXPECT_THROW(u.getNumberOfTerms(-1.0), std::invalid_argument);
+        EXPECT_THROW(u.getSumTruncated(1.5), std::invalid_argument);
+        u.getSumImages(1e-14);
+        EXPECT_EQ(0, u.getStats().nMaxIt);
+        // a single image doesn't reach the error target, F is evaluated
+        // twice for the boundary term
+        u.getSumImages(1e-14, 0);
+        EXPECT_EQ(k+1, u.getLastNumberOfIterations());
+        EXPECT_EQ(1, u.getStats().nMaxIt);
+    }
+}
+
+/**
+ *  \test Test the specialised kernels against the generic dispatch for
+ *  every combination of term and axes.
+ */
+TEST(UniformTest, testSpecialisedKernels) {
+    bc = DIRICHLET;
+    nd.dim = 2;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    termType terms[3] = {INITIAL, BOUNDARY, SOURCE};
+    e_axis axes[3] = {xstr, ystr, zstr};
+    double xs[4] = {0.0, 0.013, 0.5, 1.0};
+    double ts[3] = {0.0, 1e-3, 0.1};
+    for (int a = 0; a < 3; a++) {
+        Uniform u(nd, DIRICHLET, terms[a], ps, xstr, xstr);
+        for (int b = 0; b < 3; b++) {
+            u.setAxis(axes[b]);
+            for (int c = 0; c < 3; c++) {
+                u.setBoundaryAxis(axes[c]);
+                for (int j = 0; j < 3; j++) {
+                    u.setTime(ts[j]);
+                    for (int i = 0; i < 4; i++) {
+                        u.setXPosition(xs[i]);
+                        u.setYPosition(xs[i]);
+                        u.setZPosition(xs[i]);
+                        for (int n = 0; n < 20; n++) {
+                            EXPECT_DOUBLE_EQ(u.getReferenceTerm(n),
+                                             u.getTerm(n));
+                        }
+                    }
+                }
+            }
+        }
+    }
+    // The conditions not implemented give 0.0
+    Uniform v(nd, NEUMANN, INITIAL, ps, xstr, xstr);
+    v.setTime(0.1);
+    v.setXPosition(0.5);
+    EXPECT_EQ(0.0, v.getTerm(0));
+}
+
+/**
+ *  \test Measure the time per term of the specialised kernel and of the
+ *  generic dispatch.
+ */
+TEST(UniformTest, testSpecialisedKernelsSpeedup) {
+    bc = DIRICHLET;
+    term = BOUNDARY;
+    nd.dim = 3;
+    e_axis axis = ystr;
+    e_axis baxis = ystr;
+    nd.x = 0.0;
+    nd.y = 0.37;
+    nd.z = 0.0;
+    nd.t = 1e-3;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 0.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    Uniform u(nd, bc, term, ps, axis, baxis);
+    const int nTerms = 100;
+    const int nRep = 2000;
+    double sumKernel = 0.0;
+    double sumReference = 0.0;
+    clock_t start = clock();
+    for (int r = 0; r < nRep; r++) {
+        for (int n = 0; n < nTerms; n++) {
+            sumKernel += u.getTerm(n);
+        }
+    }
+    double tKernel = (double)(clock()-start)/CLOCKS_PER_SEC;
+    start = clock();
+    for (int r = 0; r < nRep; r++) {
+        for (int n = 0; n < nTerms; n++) {
+            sumReference += u.getReferenceTerm(n);
+        }
+    }
+    double tReference = (double)(clock()-start)/CLOCKS_PER_SEC;
+    EXPECT_DOUBLE_EQ(sumReference, sumKernel);
+    double perTerm = 1e9/((double)nTerms*nRep);
+    cout << "kernel: " << setprecision(3) << tKernel*perTerm
+         << " ns/term, reference: " << tReference*perTerm
+         << " ns/term, speedup: " << tReference/tKernel << endl;
+    RecordProperty("speedup", (int)(100.0*tReference/tKernel));
+}
+
+/**
+ *  \test Test the recurrences against the truncated series.
+ */
+TEST(UniformTest, testGetSumRecurrenceArray) {
+    bc = DIRICHLET;
+    nd.dim = 1;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    const int nx = 51;
+    const int nt = 201;
+    double xs[nx];
+    double ts[nt];
+    double expected[nx*nt];
+    double out[nx*nt];
+    for (int i = 0; i < nx; i++) {
+        xs[i] = i/(nx-1.0);
+    }
+    for (int j = 0; j < nt; j++) {
+        ts[j] = j*1e-4;
+    }
+    termType terms[3] = {INITIAL, BOUNDARY, SOURCE};
+    for (int a = 0; a < 3; a++) {
+        Uniform u(nd, bc, terms[a], ps, xstr, xstr);
+        u.setShortTimeLimit(0.0);
+        u.getSumTruncatedArray(xs, nx, ts, nt, 1e-12, 50000, expected);
+        // Uniform time grid, then every step re-anchored
+        int anchors[2] = {64, 1};
+        for (int k = 0; k < 2; k++) {
+            u.getSumRecurrenceArray(xs, nx, ts, nt, 1e-12, 50000, anchors[k],
+                                    out);
+            for (int i = 0; i < nx*nt; i++) {
+                EXPECT_NEAR(expected[i], out[i], 1e-10*(abs(expected[i])+1.0));
+            }
+        }
+        // Non-uniform time grid
+        ts[nt-1] = 0.5;
+        u.getSumTruncatedArray(xs, nx, ts, nt, 1e-12, 50000, expected);
+        u.getSumRecurrenceArray(xs, nx, ts, nt, 1e-12, 50000, 64, out);
+        for (int i = 0; i < nx*nt; i++) {
+            EXPECT_NEAR(expected[i], out[i], 1e-10*(abs(expected[i])+1.0));
+        }
+        ts[nt-1] = (nt-1)*1e-4;
+    }
+}
+
+/**
+ *  \test Test that the batch evaluations don't depend on the number of
+ *  threads.
+ */
+TEST(UniformTest, testBatchThreads) {
+    bc = DIRICHLET;
+    nd.dim = 3;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    const int nx = 37;
+    const int nt = 23;
+    double xs[nx];
+    double ts[nt];
+    double serial[nx*nt];
+    double parallel[nx*nt];
+    for (int i = 0; i < nx; i++) {
+        xs[i] = i/(nx-1.0);
+    }
+    for (int j = 0; j < nt; j++) {
+        ts[j] = j*j*1e-4;
+    }
+    termType terms[3] = {INITIAL, BOUNDARY, SOURCE};
+    for (int a = 0; a < 3; a++) {
+        Uniform u(nd, bc, terms[a], ps, ystr, ystr);
+        u.setNumberOfThreads(1);
+        EXPECT_EQ(1, u.getNumberOfThreads());
+        u.getSumForwardArray(xs, nx, ts, nt, 1e-20, 50000, serial);
+        seriesStats s = u.getStats();
+        u.resetStats();
+        u.setNumberOfThreads(4);
+        u.getSumForwardArray(xs, nx, ts, nt, 1e-20, 50000, parallel);
+        for (int i = 0; i < nx*nt; i++) {
+            EXPECT_EQ(serial[i], parallel[i]);
+        }
+        // the statistics of the threads are merged
+        EXPECT_EQ(s.nSums, u.getStats().nSums);
+        EXPECT_EQ(s.nTerms, u.getStats().nTerms);
+        EXPECT_EQ(s.maxErr, u.getStats().maxErr);
+        EXPECT_GT(s.nSums, 0);
+        // the node is left at the last time and position
+        EXPECT_EQ(ts[nt-1], u.getNode().t);
+        EXPECT_EQ(xs[nx-1], u.getNode().y);
+        u.setNumberOfThreads(1);
+        u.getSumTruncatedArray(xs, nx, ts, nt, 1e-12, 50000, serial);
+        u.setNumberOfThreads(3);
+        u.getSumTruncatedArray(xs, nx, ts, nt, 1e-12, 50000, parallel);
+        for (int i = 0; i < nx*nt; i++) {
+            EXPECT_EQ(serial[i], parallel[i]);
+        }
+    }
+}
+
+/**
+ *  \test Test isSteadyTime
+ */
+TEST(UniformTest, testSteadyTime) {
+    bc = DIRICHLET;
+    nd.dim = 1;
+    nd.x = 0.3;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    termType terms[3] = {INITIAL, BOUNDARY, SOURCE};
+    for (int a = 0; a < 3; a++) {
+        Uniform u(nd, bc, terms[a], ps, xstr, xstr);
+        EXPECT_FALSE(u.isSteadyTime(1e-8));
+        u.setTime(0.1);
+        EXPECT_FALSE(u.isSteadyTime(1e-8));
+        u.setTime(5.0);
+        EXPECT_TRUE(u.isSteadyTime(1e-8));
+        // the bound holds for the series
+        EXPECT_LE(fabs(u.getSumForward(1e-20)), 1e-8);
+        EXPECT_FALSE(u.isSteadyTime(1e-300));
+    }
+}
+
+/**
+ *  \test Test the number of terms and the errors of the batch evaluations
+ */
+TEST(UniformTest, testBatchDiagnostics) {
+    bc = DIRICHLET;
+    nd.dim = 1;
+    nd.x = 0.0;
+    nd.y = 0.0;
+    nd.z = 0.0;
+    nd.t = 0.0;
+    nd.l = 1.0;
+    nd.alpha = 1.0;
+    ps.a0 = 300.0;
+    ps.a1 = 434.6;
+    ps.a2 = 325.8;
+    ps.k1 = 0.0;
+    ps.k2 =0.0;
+    const int nx = 11;
+    const int nt = 4;
+    double xs[nx];
+    double ts[nt] = {0.0, 1e-4, 0.01, 10.0};
+    double out[nx*nt];
+    int nIts[nx*nt];
+    double errs[nx*nt];
+    for (int i = 0; i < nx; i++) {
+        xs[i] = (i+0.5)/nx;
+    }
+    Uniform u(nd, bc, BOUNDARY, ps, xstr, xstr);
+    // the eigenfunction series at every time
+    u.setShortTimeLimit(0.0);
+    u.getSumForwardArray(xs, nx, ts, nt, 1e-20, 50, out, nIts, errs);
+    for (int j = 0; j < nt; j++) {
+        u.setTime(ts[j]);
+        for (int i = 0; i < nx; i++) {
+            if (j == nt-1) {
+                // steady time
+                EXPECT_EQ(0, nIts[j*nx+i]);
+                EXPECT_EQ(u.getTailBound(0), errs[j*nx+i]);
+                continue;
+            }
+            u.setXPosition(xs[i]);
+            EXPECT_EQ(u.getSumForward(1e-20, 50), out[j*nx+i]);
+            EXPECT_EQ(u.getLastNumberOfIterations(), nIts[j*nx+i]);
+            EXPECT_EQ(u.getLastAbsoluteError(), errs[j*nx+i]);
+        }
+    }
+    // the maximum number of iterations is reached at t=1e-4
+    EXPECT_EQ(51, nIts[nx]);
+    u.getSumTruncatedArray(xs, nx, ts, nt, 1e-8, 50000, out, nIts, errs);
+    for (int j = 0; j < nt; j++) {
+        u.setTime(ts[j]);
+        int nTerms = u.getNumberOfTerms(1e-8, 50000);
+        EXPECT_EQ(nTerms, nIts[j*nx]);
+        EXPECT_EQ(u.getTailBound(nTerms), errs[j*nx]);
+        EXPECT_LE(errs[j*nx], 1e-8*u.getMaxCoefficient());
+    }
+    EXPECT_EQ(0.0, errs[0]);
+}
@@ -108,3 +108,324 @@ class TestUniform:
             u.setXPosition(i*node['l']/10.0)
             res[i] = u.getSteadyStateDirichlet() + u.getSumForward(1e-20)
         np.testing.assert_allclose(res, expected)
+
+    def test_getSumForwardArray(self):
+        """Test the batch evaluation against the node by node evaluation.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.01,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        xArray = np.linspace(0.0, 1.0, 11)
+        tArray = np.array([0.0, 0.001, 0.01, 0.1])
+        res = u.getSumForwardArray(xArray, tArray, 1e-20)
+        assert res.shape == (tArray.size, xArray.size)
+        assert res.dtype == np.float64
+        expected = np.zeros((tArray.size, xArray.size))
+        for j, t in enumerate(tArray):
+            u.setTime(t)
+            for i, x in enumerate(xArray):
+                u.setXPosition(x)
+                # the method of images at the short times
+                if u.isShortTime():
+                    expected[j][i] = u.getSumImages(1e-20)
+                else:
+                    expected[j][i] = u.getSumForward(1e-20)
+        np.testing.assert_array_equal(res, expected)
+        # alpha and l can be overridden for the evaluation
+        res = u.getSumForwardArray(xArray/2.0, tArray, 1e-20, alpha=0.25,
+                                   l=0.5)
+        np.testing.assert_allclose(res, expected, rtol=1e-10, atol=1e-10)
+        # the node of the instance is unchanged after the call
+        for method in [u.getSumForwardArray, u.getSumTruncatedArray,
+                       u.getSumRecurrenceArray]:
+            method(xArray/2.0, tArray, 1e-10, alpha=0.25, l=0.5)
+            assert u.getNode()['alpha'] == 1.0
+            assert u.getNode()['l'] == 1.0
+        u.setTime(0.1)
+        u.setXPosition(0.3)
+        assert u.getSumForward(1e-20) == expected[3][3]
+
+    def test_getSumTruncatedArray(self):
+        """Test the truncated batch evaluation for the initial term of the
+        Dirichlet boundary condition in 1D.
+
+        """
+        expected = np.array([0.00000000e+00, 1.56149963e+02, 2.52810233e+02, 
+                             2.89831321e+02, 2.98590052e+02, 2.99755829e+02,
+                             2.98590052e+02, 2.89831321e+02, 2.52810233e+02,
+                             1.56149963e+02, 0.00000000e+00]) 
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.01,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        xArray = np.linspace(0.0, 1.0, 11)
+        res = u.getSumTruncatedArray(xArray, np.array([0.01]), 1e-12)
+        np.testing.assert_allclose(res[0], expected, rtol=1e-07, atol=1e-10)
+        assert u.getNumberOfTerms(1e-12) < 10
+
+    def test_getSumImages(self):
+        """Cross-check the method of images against the eigenfunction series
+        for the boundary term of the Dirichlet boundary condition in 1D.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'boundary', params, 'x', 'x')
+        xArray = np.linspace(0.0, 1.0, 11)
+        tArray = np.array([1e-5, 1e-3, 0.01, 0.04])
+        res = u.getSumTruncatedArray(xArray, tArray, 1e-14)
+        u.setShortTimeLimit(0.0)
+        expected = u.getSumTruncatedArray(xArray, tArray, 1e-14)
+        np.testing.assert_allclose(res, expected, rtol=1e-10, atol=1e-9)
+        u.setShortTimeLimit(0.05)
+        for t in tArray:
+            u.setTime(t)
+            assert u.isShortTime()
+            u.setXPosition(0.3)
+            u.getSumImages(1e-14)
+            assert u.getLastNumberOfIterations() <= 4
+
+    def test_invalidTolerance(self):
+        """A relative error outside (0, 1) raises ValueError.
+
+        """
+        node = {'dim': 1,
+                'x': 0.3, 'y': 0.0, 'z': 0.0,
+                't': 0.01,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        xArray = np.linspace(0.0, 1.0, 11)
+        tArray = np.array([0.0, 1e-4, 0.01])
+        for rtol in [1.5, -1.0]:
+            with pytest.raises(ValueError):
+                u.getNumberOfTerms(rtol)
+            with pytest.raises(ValueError):
+                u.getSumTruncated(rtol)
+            with pytest.raises(ValueError):
+                u.getSumTruncatedArray(xArray, tArray, rtol)
+            with pytest.raises(ValueError):
+                u.getSumRecurrenceArray(xArray, tArray, rtol)
+
+    def test_getSumImagesMaxIt(self):
+        """The number of images is bounded by nMax and the relative error
+        target is checked.
+
+        """
+        node = {'dim': 1,
+                'x': 0.05, 'y': 0.0, 'z': 0.0,
+                't': 0.04,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        for rtol in [-1.0, 1.5]:
+            with pytest.raises(ValueError):
+                u.getSumImages(rtol)
+            with pytest.raises(ValueError):
+                u.getSumTruncatedArray(np.array([0.05]), np.array([0.04]),
+                                       rtol)
+        u.getSumImages(1e-14, nMax=0)
+        assert u.getLastNumberOfIterations() == 1
+        assert u.getStats()['nMaxIt'] == 1
+
+    def test_getSumAccelerated(self):
+        """Test the acceleration methods against the forward sum for the
+        boundary term of the Dirichlet boundary condition in 1D.
+
+        """
+        node = {'dim': 1,
+                'x': 0.37, 'y': 0.0, 'z': 0.0,
+                't': 0.001,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'boundary', params, 'x', 'x')
+        expected = u.getSumForward(1e-20)
+        for method in [u.getSumKahan, u.getSumAitken, u.getSumWynn,
+                       u.getSumLevin, u.getSumEuler]:
+            res = method(1e-12)
+            np.testing.assert_allclose(res, expected, rtol=1e-8)
+            assert u.getLastNumberOfIterations() <= 50000
+        u.getSumKahan(1e-20, nMax=5)
+        assert u.getLastNumberOfIterations() == 6
+
+    def test_getSumRecurrenceArray(self):
+        """Test the recurrences against the truncated eigenfunction series.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        xArray = np.linspace(0.0, 1.0, 41)
+        tArray = np.linspace(0.0, 0.05, 101)
+        for term in ['initial', 'boundary', 'source']:
+            u = Uniform(node, 'd', term, params, 'x', 'x')
+            u.setShortTimeLimit(0.0)
+            expected, nIt, err = u.getSumTruncatedArray(xArray, tArray, 1e-12,
+                                                        diagnostics=True)
+            res, resIt, resErr = u.getSumRecurrenceArray(xArray, tArray,
+                                                         1e-12,
+                                                         diagnostics=True)
+            np.testing.assert_allclose(res, expected, rtol=1e-10, atol=1e-10)
+            # the diagnostics of the rows t > 0 are those of the truncation
+            np.testing.assert_array_equal(resIt[1:], nIt[1:])
+            np.testing.assert_array_equal(resErr[1:], err[1:])
+        with pytest.raises(ValueError):
+            u.getSumRecurrenceArray(xArray, tArray, 1e-12, anchor=0)
+
+    def test_numberOfThreads(self):
+        """The batch evaluations don't depend on the number of threads.
+
+        """
+        node = {'dim': 2,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        xArray = np.linspace(0.0, 1.0, 41)
+        tArray = np.linspace(0.0, 0.05, 31)
+        u = Uniform(node, 'd', 'boundary', params, 'x', 'x')
+        u.setNumberOfThreads(1)
+        assert u.getNumberOfThreads() == 1
+        expected = u.getSumForwardArray(xArray, tArray, 1e-20)
+        expectedTruncated = u.getSumTruncatedArray(xArray, tArray, 1e-12)
+        u.setNumberOfThreads(4)
+        np.testing.assert_array_equal(
+            u.getSumForwardArray(xArray, tArray, 1e-20), expected)
+        np.testing.assert_array_equal(
+            u.getSumTruncatedArray(xArray, tArray, 1e-12), expectedTruncated)
+        u.setNumberOfThreads(0)
+        assert u.getNumberOfThreads() >= 1
+
+    def test_pickle(self):
+        """The instance is rebuilt from its node, params and axes.
+
+        """
+        import pickle
+        node = {'dim': 2,
+                'x': 0.3, 'y': 0.0, 'z': 0.0,
+                't': 0.01,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        u = Uniform(node, 'd', 'boundary', params, 'x', 'y')
+        u.setShortTimeLimit(0.1)
+        v = pickle.loads(pickle.dumps(u))
+        assert v.getNode() == node
+        assert v.getParams() == params
+        assert v.getBcType() == 'd'
+        assert v.getTermType() == 'boundary'
+        assert v.getShortTimeLimit() == 0.1
+        assert v.getSumForward(1e-20) == u.getSumForward(1e-20)
+
+    def test_getSteadyStateDirichletArray(self):
+        """Test the batch evaluation against the node by node evaluation.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 0.01,
+                'alpha': 0.0001162453618}
+        params = {'a0': 2898.8868275, 'a1': 434.6, 'a2': 325.8,
+                  'k1': 0.0, 'k2': 0.0}
+        xArray = np.linspace(0.0, 0.01, 21)
+        for term in ['initial', 'boundary', 'source']:
+            u = Uniform(node, 'd', term, params, 'x', 'x')
+            res = u.getSteadyStateDirichletArray(xArray)
+            assert u.getNode()['x'] == xArray[-1]
+            expected = np.zeros(xArray.size)
+            for i in range(0, xArray.size):
+                u.setXPosition(xArray[i])
+                expected[i] = u.getSteadyStateDirichlet()
+            np.testing.assert_array_equal(res, expected)
+        x = xArray[1:-1]
+        np.testing.assert_allclose(
+            res[1:-1], params['a0']*x*(node['l']-x)/(2.0*node['alpha']),
+            rtol=1e-12)
+
+    def test_diagnostics(self):
+        """The batch evaluations return the number of terms and the error
+        estimate of every sum.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        xArray = np.linspace(0.05, 0.95, 7)
+        tArray = np.array([0.0, 1e-4, 0.01, 0.1])
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        # the eigenfunction series at every time
+        u.setShortTimeLimit(0.0)
+        expected = u.getSumForwardArray(xArray, tArray, 1e-20, nMax=20)
+        res, nIt, err = u.getSumForwardArray(xArray, tArray, 1e-20, nMax=20,
+                                             diagnostics=True)
+        np.testing.assert_array_equal(res, expected)
+        assert nIt.shape == res.shape
+        assert err.shape == res.shape
+        np.testing.assert_array_equal(nIt[1], 21)
+        assert np.all(nIt[3] <= 20)
+        res, nIt, err = u.getSumTruncatedArray(xArray, tArray, 1e-8,
+                                               diagnostics=True)
+        for j in range(0, tArray.size):
+            u.setTime(tArray[j])
+            n = u.getNumberOfTerms(1e-8)
+            np.testing.assert_array_equal(nIt[j], n)
+            np.testing.assert_array_equal(err[j], u.getTailBound(n))
+        assert u.getTailBound(0) > err[-1][0]
+
+    def test_getStats(self):
+        """The maximum iteration hits are counted by the batch evaluation.
+
+        """
+        node = {'dim': 1,
+                'x': 0.0, 'y': 0.0, 'z': 0.0,
+                't': 0.0,
+                'l': 1.0,
+                'alpha': 1.0}
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        xArray = np.linspace(0.05, 0.95, 7)
+        tArray = np.array([0.0, 1e-4, 0.01])
+        u = Uniform(node, 'd', 'initial', params, 'x', 'x')
+        res, nIt, err = u.getSumForwardArray(xArray, tArray, 1e-20, nMax=20,
+                                             diagnostics=True)
+        stats = u.getStats()
+        assert stats['nSums'] == res.size
+        assert stats['nTerms'] == np.sum(nIt)
+        assert stats['nMaxIt'] == np.count_nonzero(nIt > 20)
+        assert stats['maxErr'] == np.max(err)
+        u.resetStats()
+        assert u.getStats() == {'nSums': 0, 'nTerms': 0, 'nMaxIt': 0,
+                                'maxErr': 0.0}
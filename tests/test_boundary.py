@@ -52,3 +52,28 @@ class TestBoundaryStationary(unittest.TestCase):
         np.testing.assert_array_equal(k1, self.bnd.k1)
         np.testing.assert_array_equal(k2, self.bnd.k2)
 
+
+    def test_separable(self):
+        """The separable term gives the solution of compute in 2D and 3D.
+        """
+        tArray = np.linspace(0.0, 10.0, 5)
+        expected = self.bnd.compute(tArray, 1e-2)
+        field = self.bnd.compute(tArray, 1e-2, separable=True)
+        np.testing.assert_array_equal(field.toArray(), expected)
+        mesh = Mesh('coarse', Geometry(2, 1.0, 0.5, 1.0))
+        bnd = Boundary(mesh, self.bcType, self.g1, [1.0, 2.0, 0.0], self.b1,
+                       self.k1, self.g2, [3.0, 1.0, 0.0], self.b2, self.k2)
+        expected = bnd.compute(tArray, 1e-2, engine='numpy')
+        field = bnd.compute(tArray, 1e-2, engine='numpy', separable=True)
+        np.testing.assert_array_equal(field.toArray(), expected)
+
+    def test_computeSteady(self):
+        """The steady state is linear between the two boundary values.
+        """
+        mesh = Mesh('coarse', Geometry(1, 1.0, 1.0, 1.0))
+        bnd = Boundary(mesh, self.bcType, self.g1, [1.0, 0.0, 0.0], self.b1,
+                       self.k1, self.g2, [3.0, 0.0, 0.0], self.b2, self.k2)
+        Coords = mesh.getCoords()
+        res = bnd.computeSteady(Coords)
+        np.testing.assert_allclose(res, 1.0+2.0*(Coords['x']+0.5),
+                                   rtol=1e-12)
@@ -0,0 +1,24 @@
+from click.testing import CliRunner
+from heat.command_line import main
+import unittest
+
+
+class TestMain(unittest.TestCase):
+    """Test the options of the command line that can't be combined.
+    """
+    def test_usage(self):
+        runner = CliRunner()
+        for args in [['--store', 'solution.npy', '--chunk', '10'],
+                     ['--store', 'solution.npy', '--steady'],
+                     ['--workers', '2', '--chunk', '10'],
+                     ['--steady', '--engine', 'numpy'],
+                     ['--steady', '--chunk', '10'],
+                     ['--steady', '--workers', '2'],
+                     ['--steady', '--budget', '1e-3']]:
+            result = runner.invoke(main, args)
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn("can't be used with", result.output)
+        result = runner.invoke(main, ['--engine', 'recurrence'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("needs --budget", result.output)
+
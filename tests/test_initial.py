@@ -1,7 +1,10 @@
 import six
+import multiprocessing
 import numpy as np
+from heat.geometry import Geometry
 from heat.mesh import Mesh
 from heat.initial import Initial
+from heat.model import computeComponent
 import unittest
 from heat.utils import DEFAULT_SETTINGS
 
@@ -30,3 +33,65 @@ class TestInitial(unittest.TestCase):
         self.assertEqual(b, self.ini.b)
         self.assertEqual(c, self.ini.c)
 
+    def test_computeComponent(self):
+        """The components computed by a pool of processes give the serial
+        solution.
+        """
+        mesh = Mesh('coarse', Geometry(2, 0.01, 0.01, 0.01))
+        ini = Initial(mesh, self.fct, 300.0)
+        bcType = ['dirichlet', 'dirichlet', 'dirichlet']
+        Coords = mesh.getCoords()
+        tArray = np.linspace(0.0, 10.0, 5)
+        alpha = 1e-4
+        expected = ini.compute(bcType, Coords, tArray, alpha)
+        pool = multiprocessing.Pool(2)
+        try:
+            jobs = [pool.apply_async(computeComponent,
+                                     (ini, (d, bcType, Coords, tArray, alpha)))
+                    for d in range(0, 2)]
+            sol = {'x': jobs[0].get()[0], 'y': jobs[1].get()[0]}
+            diag = jobs[1].get()[1]
+        finally:
+            pool.close()
+            pool.join()
+        np.testing.assert_array_equal(ini.getSolution(sol), expected)
+        np.testing.assert_array_equal(diag['nIt'], ini.diagnostics['y']['nIt'])
+
+    def test_separable(self):
+        """The separable term gives the solution of compute.
+        """
+        mesh = Mesh('coarse', Geometry(3, 0.01, 0.008, 0.005))
+        ini = Initial(mesh, self.fct, 300.0)
+        bcType = ['dirichlet', 'dirichlet', 'dirichlet']
+        Coords = mesh.getCoords()
+        tArray = np.linspace(0.0, 10.0, 5)
+        expected = ini.compute(bcType, Coords, tArray, 1e-4)
+        field = ini.compute(bcType, Coords, tArray, 1e-4, separable=True)
+        np.testing.assert_array_equal(field.toArray(), expected)
+
+    def test_computeSteady(self):
+        """The initial term vanishes at the steady state.
+        """
+        bcType = ['dirichlet', 'dirichlet', 'dirichlet']
+        Coords = self.mesh.getCoords()
+        res = self.ini.computeSteady(bcType, Coords)
+        np.testing.assert_array_equal(res, np.zeros(Coords['x'].size))
+
+    def test_budget(self):
+        """The term computed for a budget is accurate to the budget.
+        """
+        mesh = Mesh('coarse', Geometry(2, 0.01, 0.01, 0.01))
+        ini = Initial(mesh, self.fct, 300.0)
+        bcType = ['dirichlet', 'dirichlet', 'dirichlet']
+        Coords = mesh.getCoords()
+        tArray = np.linspace(0.0, 10.0, 5)
+        alpha = 1e-4
+        expected = ini.compute(bcType, Coords, tArray, alpha, rtol=1e-15)
+        res = ini.compute(bcType, Coords, tArray, alpha, budget=1e-1)
+        self.assertLessEqual(np.max(np.abs(res-expected)), 1e-1)
+        diag = ini.diagnostics['x']
+        self.assertEqual(diag['nIt'].shape, (tArray.size, diag['x'].size))
+        # the late times need fewer terms
+        self.assertTrue(np.all(diag['nIt'][-1] <= diag['nIt'][1]))
+        self.assertEqual(diag['stats'].nTerms, np.sum(diag['nIt']))
+        self.assertEqual(diag['stats'].nMaxIt, 0)
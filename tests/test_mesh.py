@@ -5,6 +5,113 @@ from heat.mesh import Mesh
 import unittest
 
 
+def getLoopConnectivity(mesh):
+    """The connectivity computed with the loops of the former
+    Mesh.getConnectivity.
+    """
+    d = mesh.geometry.d
+    dic = mesh.getCellNumPerDim()
+    Nx = dic['Nx']
+    Ny = dic['Ny']
+    Nz = dic['Nz']
+    if d == 3:
+        N = Nx*Ny*Nz
+        c = np.zeros([8, N])
+        for i in range(0, Nx):
+            for j in range(0, Ny):
+                for k in range(0, Nz):
+                    c[0, k+j*Nz+i*Nz*Ny] = k + j*(Nz+1) + i*(Nz+1)*(Ny+1)
+        c[1] = c[0] + 1
+        c[2] = c[0] + (Nz+1)*(Ny+1)
+        c[3] = c[2] + 1
+        c[4] = c[0]+(Nz+1)
+        c[5] = c[4] + 1
+        c[6] = c[4] + (Nz+1)*(Ny+1)
+        c[7] = c[6] + 1
+        c = (np.transpose(c)).astype(int)
+    elif d == 2:
+        N = Nx*Ny  # number of cells
+        c = np.zeros([4, N])
+        for i in range(0, Ny):
+            for j in range(0, Nx):
+                c[0, j+i*Nx] = j + i*(Nx+1)
+        c[1] = c[0] + 1
+        c[2] = c[0] + (Nx + 1)
+        c[3] = c[2] + 1
+        c = (np.transpose(c)).astype(int)
+    else:  # d == 1
+        c = np.zeros([2, Nx])
+        c[0] = np.arange(Nx)
+        c[1] = c[0] + 1
+        c = (np.transpose(c)).astype(int)
+    return c
+
+
+def getIscloseBoundariesIndex(mesh):
+    """The boundary nodes found from the coordinates as in the former
+    Mesh.getBoundariesIndex.
+    """
+    Coords = mesh.getCoords()
+    ls = [mesh.geometry.lx, mesh.geometry.ly, mesh.geometry.lz]
+    indices = []
+    for d, axis in enumerate(['x', 'y', 'z'][:mesh.geometry.d]):
+        indices.append(np.where(np.isclose(abs(Coords[axis]), ls[d]/2))[0])
+    return np.unique(np.concatenate(indices))
+
+
+class TestBoundaryIndex(unittest.TestCase):
+    """Test the boundary, face, edge and vertex indices of the Mesh class
+    against the coordinates of the nodes.
+    """
+    def setUp(self):
+        self.meshes = [Mesh('coarse', Geometry(1, 4.0)),
+                       Mesh('coarse', Geometry(2, 4.0, 2.98)),
+                       Mesh('coarse', Geometry(3, 4.0, 2.98, 2.1)),
+                       Mesh('coarse', Geometry(3, 1.0, 1.0, 1.0), [4, 3, 2],
+                            'chebyshev')]
+
+    def test_getBoundariesIndex(self):
+        for mesh in self.meshes:
+            indices = mesh.getBoundariesIndex()
+            np.testing.assert_array_equal(getIscloseBoundariesIndex(mesh),
+                                          indices)
+            mask = mesh.getBoundaryMask()
+            self.assertEqual(indices.size, np.sum(mask))
+            np.testing.assert_array_equal(np.flatnonzero(mask), indices)
+
+    def test_getFaceIndex(self):
+        for mesh in self.meshes:
+            Coords = mesh.getCoords()
+            ls = [mesh.geometry.lx, mesh.geometry.ly, mesh.geometry.lz]
+            for (axis, side), indices in mesh.getFacesIndex().items():
+                l = ls[['x', 'y', 'z'].index(axis)]
+                expected = np.where(Coords[axis] == (side-0.5)*l)[0]
+                np.testing.assert_array_equal(expected, indices)
+        with six.assertRaisesRegex(self, ValueError, 'The face should be'):
+            self.meshes[1].getFaceIndex('z', 0)
+
+    def test_getVerticesIndex(self):
+        for mesh in self.meshes:
+            Coords = mesh.getCoords()
+            ls = [mesh.geometry.lx, mesh.geometry.ly, mesh.geometry.lz]
+            indices = mesh.getVerticesIndex()
+            self.assertEqual(2**mesh.geometry.d, indices.size)
+            for d, axis in enumerate(['x', 'y', 'z'][:mesh.geometry.d]):
+                np.testing.assert_array_equal(np.abs(Coords[axis][indices]),
+                                              ls[d]/2)
+
+    def test_getEdgesIndex(self):
+        mesh = self.meshes[2]
+        Coords = mesh.getCoords()
+        ends = sum((np.abs(Coords[axis]) == l/2).astype(int)
+                   for axis, l in zip(['x', 'y', 'z'], [4.0, 2.98, 2.1]))
+        np.testing.assert_array_equal(np.where(ends >= 2)[0],
+                                      mesh.getEdgesIndex())
+        self.assertEqual(4*(9+6+4)+8, mesh.getEdgesIndex().size)
+        np.testing.assert_array_equal(self.meshes[1].getBoundariesIndex(),
+                                      self.meshes[1].getEdgesIndex())
+
+
 class Test3DMesh(unittest.TestCase):
     """Test the Mesh class in 3D
 
@@ -71,6 +178,32 @@ class Test3DMesh(unittest.TestCase):
         self.assertEqual(10*int(np.rint(2.98/0.4))*int(np.rint(2.1/0.4)),
                          self.mesh.getNumCells())
 
+    def test_getAxisIndex(self):
+        Coords = self.mesh.getCoords()
+        shape, axes = self.mesh.getGridShape()
+        self.assertEqual(('x', 'y', 'z'), axes)
+        for d, axis in enumerate(axes):
+            index = self.mesh.getAxisIndex(d)
+            self.assertEqual(shape[d], index.size)
+            for other in axes:
+                values = Coords[other][index]
+                if other == axis:
+                    self.assertTrue(np.all(np.diff(values) > 0.0))
+                else:
+                    self.assertTrue(np.all(values == values[0]))
+
+    def test_expandAxis(self):
+        Coords = self.mesh.getCoords()
+        for d, axis in enumerate(['x', 'y', 'z']):
+            line = Coords[axis][self.mesh.getAxisIndex(d)]
+            values = np.random.rand(3, line.size)
+            expected = values[:, np.searchsorted(line, Coords[axis])]
+            np.testing.assert_array_equal(expected,
+                                          self.mesh.expandAxis(d, values))
+            out = np.empty((3, self.mesh.getNumNodes()))
+            self.assertIs(out, self.mesh.expandAxis(d, values, out))
+            np.testing.assert_array_equal(expected, out)
+
     def test_getConnectivity(self):
         geometry = Geometry(3, 1.0, 0.2, 0.1)
         mesh = Mesh('coarse', geometry)
@@ -96,6 +229,44 @@ class Test3DMesh(unittest.TestCase):
                      [56, 57, 62, 63, 58, 59, 64, 65]])
         np.testing.assert_array_equal(c, mesh.getConnectivity())
 
+    def test_cache(self):
+        Coords = self.mesh.getCoords()
+        self.assertIs(Coords['x'], self.mesh.getCoords()['x'])
+        self.assertIs(self.mesh.getConnectivity(),
+                      self.mesh.getConnectivity())
+        with self.assertRaises(ValueError):
+            Coords['x'][0] = 1.0
+        self.mesh.size = 'normal'
+        self.assertEqual(20, self.mesh.getCellNumPerDim()['Nx'])
+        self.assertEqual(21*16*11, self.mesh.getCoords()['x'].size)
+        self.mesh.geometry.lx = 8.0
+        self.assertEqual(7, self.mesh.getCellNumPerDim()['Ny'])
+        self.assertEqual(4.0, self.mesh.getCoords()['x'][-1])
+        self.mesh.invalidate()
+        self.assertEqual({}, self.mesh.cache)
+
+    def test_graded(self):
+        """Graded explicit cells in 3D keep the node order and topology.
+        """
+        mesh = Mesh('coarse', self.mesh.geometry, [6, 4, 3], 'chebyshev')
+        Coords = mesh.getCoords()
+        self.assertEqual(7*5*4, Coords['x'].size)
+        for d, axis in enumerate(['x', 'y', 'z']):
+            line = Coords[axis][mesh.getAxisIndex(d)]
+            self.assertTrue(np.all(np.diff(line) > 0.0))
+            self.assertGreater(line[2]-line[1], line[1]-line[0])
+        np.testing.assert_array_equal(getLoopConnectivity(mesh),
+                                      mesh.getConnectivity())
+        self.assertEqual(7*5*4 - 5*3*2, mesh.getBoundariesIndex().size)
+
+    def test_getConnectivityLoop(self):
+        c = self.mesh.getConnectivity()
+        self.assertEqual(np.int64, c.dtype)
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh), c)
+        self.mesh.size = 'normal'
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh),
+                                      self.mesh.getConnectivity())
+
     def test_getOffsets(self):
         offsets = np.arange(8, 10*7*5*8+8, 8)
         offsets = offsets.astype(int)
@@ -149,6 +320,24 @@ class Test2DMesh(unittest.TestCase):
         self.assertEqual(10*int(np.rint(2.98/0.4)),
                          self.mesh.getNumCells())
 
+    def test_getAxisIndex(self):
+        Coords = self.mesh.getCoords()
+        shape, axes = self.mesh.getGridShape()
+        self.assertEqual(('y', 'x'), axes)
+        np.testing.assert_array_equal(Coords['x'][self.mesh.getAxisIndex(0)],
+                                      np.linspace(-2.0, 2.0, shape[1]))
+        np.testing.assert_array_equal(Coords['y'][self.mesh.getAxisIndex(1)],
+                                      np.linspace(-1.49, 1.49, shape[0]))
+
+    def test_expandAxis(self):
+        Coords = self.mesh.getCoords()
+        for d, axis in enumerate(['x', 'y']):
+            line = Coords[axis][self.mesh.getAxisIndex(d)]
+            values = np.random.rand(2, line.size)
+            expected = values[:, np.searchsorted(line, Coords[axis])]
+            np.testing.assert_array_equal(expected,
+                                          self.mesh.expandAxis(d, values))
+
     def test_getConnectivity(self):
         geometry = Geometry(2, 1.0, 0.2)
         mesh = Mesh('coarse', geometry)
@@ -174,6 +363,13 @@ class Test2DMesh(unittest.TestCase):
                       [20, 21, 31, 32]])
         np.testing.assert_array_equal(c, mesh.getConnectivity())
 
+    def test_getConnectivityLoop(self):
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh),
+                                      self.mesh.getConnectivity())
+        self.mesh.size = 'fine'
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh),
+                                      self.mesh.getConnectivity())
+
     def test_getOffsets(self):
         offsets = np.arange(4, 10*7*4+4, 4)
         offsets = offsets.astype(int)
@@ -194,6 +390,43 @@ class Test1DMesh(unittest.TestCase):
         geometry = Geometry(1, 4.0)
         self.mesh = Mesh('coarse', geometry)
 
+    def test_getNodes(self):
+        mesh = Mesh('coarse', Geometry(1, 4.0), grading='chebyshev')
+        x = mesh.getNodes(4.0, 6)
+        np.testing.assert_allclose(x, -2.0*np.cos(np.pi*np.arange(7)/6),
+                                   atol=1e-15)
+        self.assertEqual(-2.0, x[0])
+        self.assertEqual(2.0, x[-1])
+        mesh = Mesh('coarse', Geometry(1, 4.0), grading='geometric', ratio=2.0)
+        for N in [6, 7]:
+            x = mesh.getNodes(4.0, N)
+            h = np.diff(x)
+            np.testing.assert_allclose(h[1:N//2]/h[:N//2-1], 2.0)
+            np.testing.assert_allclose(h, h[::-1])
+            np.testing.assert_allclose(np.sum(h), 4.0)
+            self.assertEqual(-2.0, x[0])
+            self.assertEqual(2.0, x[-1])
+        np.testing.assert_array_equal(self.mesh.getNodes(4.0, 10),
+                                      np.linspace(-2.0, 2.0, 11))
+
+    def test_cells(self):
+        mesh = Mesh('coarse', Geometry(1, 4.0), [25], 'geometric')
+        self.assertEqual({'Nx': 25, 'Ny': None, 'Nz': None},
+                         mesh.getCellNumPerDim())
+        self.assertEqual(26, mesh.getCoords()['x'].size)
+        self.assertEqual((25, 2), mesh.getConnectivity().shape)
+        self.assertEqual({'size': 'coarse', 'cells': [25],
+                          'grading': 'geometric', 'ratio': 1.2},
+                         mesh.getSettings())
+        with six.assertRaisesRegex(self, ValueError, 'cells='):
+            Mesh('coarse', Geometry(2, 4.0, 1.0), [25])
+        with six.assertRaisesRegex(self, ValueError, 'cells='):
+            Mesh('coarse', Geometry(1, 4.0), [0])
+        with six.assertRaisesRegex(self, ValueError, 'The mesh grading'):
+            Mesh('coarse', Geometry(1, 4.0), grading='random')
+        with six.assertRaisesRegex(self, ValueError, 'ratio='):
+            Mesh('coarse', Geometry(1, 4.0), grading='geometric', ratio=0.0)
+
     def test_init(self):
         geometry = Geometry(1, 4.0)
         Nx = 10
@@ -234,6 +467,13 @@ class Test1DMesh(unittest.TestCase):
                       [9, 10]])
         np.testing.assert_array_equal(c, mesh.getConnectivity())
 
+    def test_getConnectivityLoop(self):
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh),
+                                      self.mesh.getConnectivity())
+        self.mesh.size = 'fine'
+        np.testing.assert_array_equal(getLoopConnectivity(self.mesh),
+                                      self.mesh.getConnectivity())
+
     def test_getOffsets(self):
         offsets = np.arange(2, 10*2+2, 2)
         offsets = offsets.astype(int)
@@ -0,0 +1,207 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from heat.model import Model
+from heat.series import Uniform, ENGINES
+from heat.vtktools import VTK
+from heat.utils import BASE_DIR, DEFAULT_SETTINGS_2D, DEFAULT_SETTINGS_3D
+import unittest
+
+
+class TestModel(unittest.TestCase):
+    """Test the probes and the blocks of the Model class against the
+    solution on the mesh. The configuration file is restored after the
+    tests.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.configFileName = BASE_DIR.child('config.ini')
+        cls.config = None
+        if os.path.exists(cls.configFileName):
+            with open(cls.configFileName) as f:
+                cls.config = f.read()
+        cls.tmp = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.config is None:
+            os.remove(cls.configFileName)
+        else:
+            with open(cls.configFileName, 'w') as f:
+                f.write(cls.config)
+        shutil.rmtree(cls.tmp)
+
+    def getModel(self, settings):
+        output = os.path.join(self.tmp, 'solution.vtu')
+        Model.writeConfig(settings, output)
+        return Model(output)
+
+    def test_probe(self):
+        """The probes at nodes give the solution at these nodes.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.compute()
+        Coords = model.mesh.getCoords()
+        nodes = [0, 17, 1000, model.mesh.getNumNodes()-1, 17]
+        points = np.column_stack([Coords[axis][nodes] for axis in 'xyz'])
+        times = model.getTimeList()[::10]
+        expected = model.solution.toArray()[::10][:, nodes]
+        np.testing.assert_array_equal(model.probe(points, times), expected)
+
+    @unittest.skipIf(Uniform is None, 'The Cython extension is not built.')
+    def test_shortTimes(self):
+        """The early times of compute are evaluated by the method of images,
+        i.e. with a few images instead of the eigenfunction series.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.compute()
+        alpha = model.material.getAlpha()
+        for (term, axis), diag in model.getDiagnostics().items():
+            l = getattr(model.geometry, 'l' + axis)
+            short = (diag['t'] > 0.0) & (alpha*diag['t']/l**2 < 0.05)
+            self.assertTrue(np.any(short))
+            self.assertLessEqual(np.max(diag['nIt'][short]), 6)
+        # the eigenfunction series needs many more terms at these times
+        u = Uniform({'dim': 3, 'x': 0.0, 'y': 0.0, 'z': 0.0,
+                     't': model.getTimeList()[1], 'l': model.geometry.lx,
+                     'alpha': alpha}, 'd', 'initial',
+                    {'a0': 1.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0},
+                    'x', 'x')
+        self.assertTrue(u.isShortTime())
+        self.assertGreater(u.getNumberOfTerms(1e-14), 6)
+
+    @unittest.skipIf(Uniform is None, 'The Cython extension is not built.')
+    def test_recurrenceEngine(self):
+        """The engine "recurrence" gives the solution of the engine "cxx"
+        for the same relative error.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.compute(engine='cxx', rtol=1e-10)
+        expected = model.solution.toArray()
+        model.compute(engine='recurrence', rtol=1e-10)
+        np.testing.assert_allclose(model.solution.toArray(), expected,
+                                   rtol=0.0, atol=1e-7)
+        for start, t, sol in model.computeChunks(chunk=40,
+                                                 engine='recurrence',
+                                                 rtol=1e-10):
+            np.testing.assert_allclose(sol, expected[start:start+40],
+                                       rtol=0.0, atol=1e-7)
+        with self.assertRaises(ValueError):
+            model.compute(engine='recurrence')
+
+    def test_steadyTimes(self):
+        """At the steady times compute gives the solution of computeSteady.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.computeSteady()
+        expected = model.solution.toArray()[0]
+        model.getTimeList = lambda: np.array([0.0, 10.0, 100.0])
+        engines = ['numpy', 'gemm'] if Uniform is None else ENGINES
+        for engine in engines:
+            model.compute(engine=engine, rtol=1e-12)
+            np.testing.assert_allclose(model.solution.toArray()[1:],
+                                       [expected, expected], rtol=1e-12)
+        Coords = model.mesh.getCoords()
+        nodes = [0, 17, 1000, model.mesh.getNumNodes()-1]
+        points = np.column_stack([Coords[axis][nodes] for axis in 'xyz'])
+        np.testing.assert_allclose(model.probe(points, [100.0])[0],
+                                   expected[nodes], rtol=1e-12)
+
+    def test_probeToFile(self):
+        model = self.getModel(DEFAULT_SETTINGS_2D)
+        points = [[0.0, 0.0], [1e-3, -2e-3], [5e-3, 4e-3]]
+        times = np.linspace(0.0, 20.0, 7)
+        expected = model.probe(points, times)
+        for extension in ['.npy', '.csv']:
+            filename = os.path.join(self.tmp, 'probes' + extension)
+            model.probeToFile(filename, points, times, chunk=3)
+            if extension == '.npy':
+                res = np.load(filename)
+            else:
+                res = np.loadtxt(filename, delimiter=',', skiprows=1)
+            np.testing.assert_array_equal(res[:, 0], times)
+            np.testing.assert_allclose(res[:, 1:], expected, rtol=1e-15)
+        with self.assertRaises(ValueError):
+            model.probeToFile(os.path.join(self.tmp, 'probes.txt'), points)
+        with self.assertRaises(ValueError):
+            model.probe([[0.0, 2e-2]], times)
+
+    def test_computeChunks(self):
+        """The blocks of times give the solution of compute.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.compute()
+        expected = model.solution.toArray()
+        tArray = model.getTimeList()
+        starts = []
+        for start, t, sol in model.computeChunks(chunk=40):
+            starts.append(start)
+            np.testing.assert_array_equal(t, tArray[start:start+40])
+            np.testing.assert_array_equal(sol, expected[start:start+40])
+        self.assertEqual([0, 40, 80], starts)
+        with self.assertRaises(ValueError):
+            next(model.computeChunks(chunk=0))
+
+    def test_writeTimeSeries(self):
+        model = self.getModel(DEFAULT_SETTINGS_2D)
+        model.getTimeList = lambda: np.linspace(0.0, 10.0, 3)
+        vtk = VTK()
+        fileName = os.path.join(self.tmp, 'series.vtu')
+        vtk.writeTimeSeries(model, model.computeChunks(chunk=2), fileName)
+        for i in range(0, 3):
+            self.assertTrue(os.path.exists(
+                os.path.join(self.tmp, 'series_{0}.vtu'.format(i))))
+        with open(os.path.join(self.tmp, 'series.pvd')) as f:
+            pvd = f.read()
+        self.assertEqual(3, pvd.count('<DataSet'))
+        self.assertIn('file="series_2.vtu"', pvd)
+
+    def test_precision(self):
+        """The single precision solution has a relative error below 1e-6.
+        """
+        model = self.getModel(DEFAULT_SETTINGS_3D)
+        model.compute()
+        expected = model.solution.toArray()
+        output = os.path.join(self.tmp, 'single.vtu')
+        Model.writeConfig(DEFAULT_SETTINGS_3D, output, 'float32')
+        model = Model(output)
+        self.assertEqual('float32', model.precision)
+        model.compute()
+        sol = model.solution.toArray()
+        self.assertEqual(np.float32, sol.dtype)
+        np.testing.assert_allclose(sol, expected, rtol=1e-6, atol=0.0)
+        VTK().writeVTU(model)
+        with open(output) as f:
+            self.assertIn('type="Float32"', f.read())
+
+    def test_store(self):
+        model = self.getModel(DEFAULT_SETTINGS_2D)
+        model.compute()
+        expected = model.solution.toArray()
+        store = os.path.join(self.tmp, 'solution.npy')
+        model.compute(store=store)
+        np.testing.assert_array_equal(np.load(store, mmap_mode='r'), expected)
+        np.testing.assert_array_equal(model.solution.getSolution(3),
+                                      expected[3])
+
+    def test_gradedMesh(self):
+        """The mesh options of the configuration file give a graded mesh,
+        the solution at its nodes is the solution of the probes.
+        """
+        settings = dict(DEFAULT_SETTINGS_2D)
+        settings['mesh'] = {'size': 'coarse', 'cells': [8, 6],
+                            'grading': 'geometric', 'ratio': 1.5}
+        model = self.getModel(settings)
+        self.assertEqual([8, 6], model.mesh.cells)
+        self.assertEqual('geometric', model.mesh.grading)
+        self.assertEqual(1.5, model.mesh.ratio)
+        model.compute()
+        Coords = model.mesh.getCoords()
+        points = np.column_stack((Coords['x'], Coords['y']))
+        times = model.getTimeList()[::25]
+        np.testing.assert_array_equal(model.probe(points, times),
+                                      model.solution.toArray()[::25])
+        VTK().writeVTU(model)
+        with open(model.output) as f:
+            self.assertIn('NumberOfPoints="63"', f.read())
@@ -0,0 +1,393 @@
+import math
+import pytest
+import numpy as np
+from heat.geometry import Geometry
+from heat.mesh import Mesh
+from heat.series import (VectorizedUniform, TabulatedUniform, ModeTables,
+                         createUniform, getNumberOfTerms, getBudgetTolerance)
+
+
+class TestVectorizedUniform:
+    """Test the NumPy engine against the C++ class Uniform.
+
+    """
+    node = {'dim': 1,
+            'x': 0.0, 'y': 0.0, 'z': 0.0,
+            't': 0.0,
+            'l': 1.0,
+            'alpha': 1.0}
+    xArray = np.linspace(0.0, 1.0, 21)
+    tArray = np.array([0.0, 1e-4, 1e-3, 0.01, 0.1, 1.0])
+
+    def compare(self, node, bc, term, params, axis='x', baxis='x'):
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        u = Uniform(node, bc, term, params, axis, baxis)
+        v = VectorizedUniform(node, bc, term, params, axis, baxis)
+        expected = u.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+        res = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+        assert res.shape == expected.shape
+        np.testing.assert_allclose(res, expected, rtol=1e-5, atol=1e-6)
+
+    def test_DirichletInitial(self):
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+        for dim in [1, 2, 3]:
+            node = dict(self.node, dim=dim)
+            self.compare(node, 'd', 'initial', params)
+
+    def test_DirichletBoundary(self):
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+        for dim in [1, 2, 3]:
+            node = dict(self.node, dim=dim)
+            self.compare(node, 'd', 'boundary', params)
+            self.compare(node, 'd', 'boundary', params, 'x', 'y')
+
+    def test_DirichletSource(self):
+        params = {'a0': 2898.8868275, 'a1': 0.0, 'a2': 0.0,
+                  'k1': 0.0, 'k2': 0.0}
+        node = dict(self.node, l=0.01, alpha=0.0001162453618)
+        self.xArray = self.xArray*0.01
+        self.compare(node, 'd', 'source', params)
+
+    def test_blockSize(self):
+        """The result doesn't depend on the size of the blocks.
+        """
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+        v = VectorizedUniform(self.node, 'd', 'boundary', params, 'x', 'x')
+        expected = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+        v = VectorizedUniform(self.node, 'd', 'boundary', params, 'x', 'x',
+                              nChunk=5, blockSize=100)
+        res = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+        np.testing.assert_allclose(res, expected, rtol=1e-12, atol=1e-12)
+
+    def test_nodeOverride(self):
+        """alpha and l only replace the values of the node for the call.
+        """
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+        for engine in ['numpy', 'gemm']:
+            v = createUniform(engine, self.node, 'd', 'initial', params,
+                              'x', 'x')
+            expected = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+            for method in [v.getSumForwardArray, v.getSumTruncatedArray]:
+                res = method(self.xArray/2.0, self.tArray, 1e-10, alpha=0.25,
+                             l=0.5)
+                np.testing.assert_allclose(res, expected, rtol=1e-8,
+                                           atol=1e-8)
+                assert v.getNode()['alpha'] == 1.0
+                assert v.getNode()['l'] == 1.0
+            res = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+            np.testing.assert_array_equal(res, expected)
+
+    def test_truncated(self):
+        """The a priori truncation matches the C++ class.
+        """
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        params = {'a0': 0.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+        for term in ['initial', 'boundary']:
+            u = Uniform(self.node, 'd', term, params, 'x', 'x')
+            v = VectorizedUniform(self.node, 'd', term, params, 'x', 'x')
+            for t in self.tArray:
+                u.setTime(t)
+                v.setTime(t)
+                assert u.getNumberOfTerms(1e-10) == v.getNumberOfTerms(1e-10)
+            expected = u.getSumTruncatedArray(self.xArray, self.tArray, 1e-10)
+            res = v.getSumTruncatedArray(self.xArray, self.tArray, 1e-10)
+            np.testing.assert_allclose(res, expected, rtol=1e-10, atol=1e-10)
+
+    def test_invalidTolerance(self):
+        """A relative error outside (0, 1) raises ValueError, as in the C++
+        class.
+        """
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+        for engine in ['numpy', 'gemm']:
+            v = createUniform(engine, dict(self.node, t=0.01), 'd',
+                              'initial', params, 'x', 'x')
+            for rtol in [1.5, -1.0]:
+                with pytest.raises(ValueError):
+                    v.getNumberOfTerms(rtol)
+                with pytest.raises(ValueError):
+                    v.getSumTruncatedArray(self.xArray, self.tArray, rtol)
+
+    def test_NotImplemented(self):
+        params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+        v = VectorizedUniform(self.node, 'n', 'initial', params, 'x', 'x')
+        res = v.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+        np.testing.assert_array_equal(res, np.zeros((6, 21)))
+
+
+class TestSteadyState:
+    """Test the late-time shortcut and the closed-form steady state.
+
+    """
+    node = {'dim': 1,
+            'x': 0.0, 'y': 0.0, 'z': 0.0,
+            't': 0.0,
+            'l': 1.0,
+            'alpha': 1.0}
+    xArray = np.linspace(0.0, 1.0, 21)
+    params = {'a0': 300.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+
+    def test_isSteadyTime(self):
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        for term in ['initial', 'boundary', 'source']:
+            for t in [0.0, 1e-3, 0.1, 1.0, 2.0, 5.0]:
+                node = dict(self.node, t=t)
+                u = Uniform(node, 'd', term, self.params, 'x', 'x')
+                v = VectorizedUniform(node, 'd', term, self.params, 'x', 'x')
+                assert u.isSteadyTime(1e-8) == v.isSteadyTime(1e-8)
+        v = VectorizedUniform(self.node, 'd', 'initial', self.params, 'x', 'x')
+        mask = v.getSteadyTimes(np.array([0.0, 0.1, 5.0]), 1e-8)
+        np.testing.assert_array_equal(mask, [False, False, True])
+
+    def test_lateTimes(self):
+        """The transient vanishes at the late times.
+        """
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        tArray = np.array([0.01, 10.0, 20.0])
+        for term in ['initial', 'boundary']:
+            u = Uniform(self.node, 'd', term, self.params, 'x', 'x')
+            v = VectorizedUniform(self.node, 'd', term, self.params, 'x', 'x')
+            for res in [u.getSumForwardArray(self.xArray, tArray, 1e-20),
+                        v.getSumForwardArray(self.xArray, tArray, 1e-20)]:
+                assert np.all(res[0, 1:-1] != 0.0)
+                np.testing.assert_array_equal(res[1:], 0.0)
+
+    def test_getSteadyStateDirichletArray(self):
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        node = dict(self.node, l=0.01, alpha=0.0001162453618)
+        xArray = self.xArray*0.01
+        for term in ['initial', 'boundary', 'source']:
+            for baxis in ['x', 'y']:
+                v = VectorizedUniform(node, 'd', term, self.params, 'x', baxis)
+                res = v.getSteadyStateDirichletArray(xArray)
+                for x, r in zip(xArray, res):
+                    u = Uniform(dict(node, x=x), 'd', term, self.params, 'x',
+                                baxis)
+                    assert r == pytest.approx(u.getSteadyStateDirichlet(),
+                                              rel=1e-10, abs=1e-10)
+
+
+class TestNearWall:
+    """Test the nodes of graded meshes next to the walls.
+
+    At short times, the initial term near the walls is
+    a0*(erf(x/s)+erf((l-x)/s)-1) with s = 2*sqrt(alpha*t).
+    """
+    node = {'dim': 1, 'x': 0.0, 'y': 0.0, 'z': 0.0, 't': 0.0, 'l': 1e-2,
+            'alpha': 0.0001162453618}
+    params = {'a0': 1.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+    t = 1e-3
+
+    def getNearWall(self, grading, cells):
+        l = self.node['l']
+        mesh = Mesh('coarse', Geometry(1, l), cells=[cells], grading=grading)
+        xs = mesh.getNodes(l, cells) + l/2
+        near = (xs > 0.0) & (xs < 1e-4)
+        return np.concatenate((xs[near], l - xs[near][::-1]))
+
+    def getReference(self, xs):
+        l = self.node['l']
+        s = 2.0*np.sqrt(self.node['alpha']*self.t)
+        erf = np.vectorize(math.erf)
+        return self.params['a0']*(erf(xs/s) + erf((l-xs)/s) - 1.0)
+
+    def compare(self, u, xs):
+        expected = self.getReference(xs)
+        res = u.getSumTruncatedArray(xs, np.array([self.t]), 1e-10)
+        np.testing.assert_allclose(res[0], expected, rtol=1e-6)
+        res = u.getSumForwardArray(xs, np.array([self.t]), 1e-20)
+        np.testing.assert_allclose(res[0], expected, rtol=1e-6)
+
+    def test_numpy(self):
+        for grading, cells in [('chebyshev', 200), ('geometric', 40)]:
+            xs = self.getNearWall(grading, cells)
+            assert xs.size > 0
+            for engine in ['numpy', 'gemm']:
+                u = createUniform(engine, self.node, 'd', 'initial',
+                                  self.params, 'x', 'x')
+                self.compare(u, xs)
+
+    def test_cxx(self):
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        u = Uniform(self.node, 'd', 'initial', self.params, 'x', 'x')
+        for grading, cells in [('chebyshev', 200), ('geometric', 40)]:
+            self.compare(u, self.getNearWall(grading, cells))
+
+
+class TestTabulatedUniform:
+    """Test the matrix product engine against the NumPy engine.
+
+    """
+    node = {'dim': 2,
+            'x': 0.0, 'y': 0.0, 'z': 0.0,
+            't': 0.0,
+            'l': 1.0,
+            'alpha': 1.0}
+    xArray = np.linspace(0.0, 1.0, 21)
+    tArray = np.array([0.0, 1e-4, 1e-3, 0.01, 0.1, 1.0])
+    params = {'a0': 300.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+
+    def test_forward(self):
+        for term in ['initial', 'boundary']:
+            for baxis in ['x', 'y']:
+                v = VectorizedUniform(self.node, 'd', term, self.params, 'x',
+                                      baxis)
+                u = TabulatedUniform(self.node, 'd', term, self.params, 'x',
+                                     baxis)
+                expected = v.getSumForwardArray(self.xArray, self.tArray,
+                                                1e-20)
+                res = u.getSumForwardArray(self.xArray, self.tArray, 1e-20)
+                np.testing.assert_allclose(res, expected, rtol=1e-10,
+                                           atol=1e-9)
+
+    def test_truncated(self):
+        for term in ['initial', 'boundary']:
+            v = VectorizedUniform(self.node, 'd', term, self.params, 'x', 'x')
+            u = TabulatedUniform(self.node, 'd', term, self.params, 'x', 'x')
+            expected = v.getSumTruncatedArray(self.xArray, self.tArray, 1e-12)
+            res = u.getSumTruncatedArray(self.xArray, self.tArray, 1e-12)
+            np.testing.assert_allclose(res, expected, rtol=1e-9, atol=1e-9)
+
+    def test_tables(self):
+        """The tables are shared by the terms of the same axis.
+        """
+        tables = ModeTables()
+        res = {}
+        for term in ['initial', 'boundary']:
+            u = createUniform('gemm', self.node, 'd', term, self.params, 'x',
+                              'x', tables)
+            res[term] = u.getSumTruncatedArray(self.xArray, self.tArray, 1e-8)
+        assert tables.getNumberOfTables() == 1
+        u.getSumTruncatedArray(self.xArray[1:], self.tArray, 1e-8)
+        assert tables.getNumberOfTables() == 2
+        # A larger table gives the same values
+        u = TabulatedUniform(self.node, 'd', 'initial', self.params, 'x', 'x')
+        u.tables.getTables(self.xArray, self.tArray, 1.0, 1.0, 5000)
+        res2 = u.getSumTruncatedArray(self.xArray, self.tArray, 1e-8)
+        np.testing.assert_allclose(res2, res['initial'], rtol=1e-12,
+                                   atol=1e-12)
+
+
+class TestDiagnostics:
+    """Test the number of terms and the errors of the batch evaluations.
+
+    """
+    node = {'dim': 2,
+            'x': 0.0, 'y': 0.0, 'z': 0.0,
+            't': 0.0,
+            'l': 1.0,
+            'alpha': 1.0}
+    xArray = np.linspace(0.0, 1.0, 21)
+    tArray = np.array([0.0, 1e-4, 1e-3, 0.01, 0.1, 10.0])
+    params = {'a0': 300.0, 'a1': 434.6, 'a2': 325.8, 'k1': 0.0, 'k2': 0.0}
+
+    def test_truncated(self):
+        """Every engine uses the same number of terms and tail bound.
+        """
+        Uniform = pytest.importorskip('heat.wrapper').Uniform
+        for term in ['initial', 'boundary']:
+            u = Uniform(self.node, 'd', term, self.params, 'x', 'x')
+            u.setShortTimeLimit(0.0)
+            expected = u.getSumTruncatedArray(self.xArray, self.tArray, 1e-8,
+                                              diagnostics=True)
+            for engine in [VectorizedUniform, TabulatedUniform]:
+                v = engine(self.node, 'd', term, self.params, 'x', 'x')
+                res, nIt, err = v.getSumTruncatedArray(self.xArray,
+                                                       self.tArray, 1e-8,
+                                                       diagnostics=True)
+                assert nIt.shape == res.shape
+                if engine is VectorizedUniform:
+                    np.testing.assert_array_equal(nIt, expected[1])
+                else:
+                    # The number of modes of the smallest time
+                    np.testing.assert_array_equal(nIt[1:], expected[1][1, 0])
+                np.testing.assert_allclose(err[0], 0.0)
+                assert np.all(err <= 1e-8*v.getMaxCoefficient())
+            np.testing.assert_allclose(
+                VectorizedUniform(self.node, 'd', term, self.params, 'x',
+                                  'x').getTailBound(self.tArray, 3),
+                [u.getTailBound(3) for u in
+                 [Uniform(dict(self.node, t=t), 'd', term, self.params, 'x',
+                          'x') for t in self.tArray]], rtol=1e-12)
+
+    def test_forward(self):
+        v = VectorizedUniform(self.node, 'd', 'initial', self.params, 'x', 'x')
+        res, nIt, err = v.getSumForwardArray(self.xArray, self.tArray, 1e-20,
+                                             nMax=40, diagnostics=True)
+        stats = v.getStats()
+        np.testing.assert_array_equal(res, v.getSumForwardArray(
+            self.xArray, self.tArray, 1e-20, nMax=40))
+        np.testing.assert_array_equal(nIt[0], 1)
+        # The maximum number of terms is reached at t=1e-4
+        assert np.all(nIt[1] >= 41)
+        # Steady time
+        np.testing.assert_array_equal(nIt[-1], 0)
+        np.testing.assert_array_equal(err[-1], v.getTailBound(10.0, 0))
+        assert stats['nSums'] == 5*self.xArray.size
+        assert stats['nTerms'] == np.sum(nIt)
+        assert stats['nMaxIt'] == np.count_nonzero(nIt > 40)
+        assert stats['maxErr'] == np.max(err[:-1])
+        v.resetStats()
+        assert v.getStats()['nSums'] == 0
+
+    def test_budget(self):
+        """The truncated sums are accurate to the absolute error atol.
+        """
+        for term in ['initial', 'boundary']:
+            v = VectorizedUniform(self.node, 'd', term, self.params, 'x', 'x')
+            expected = v.getSumTruncatedArray(self.xArray, self.tArray, 1e-15)
+            for atol in [1e-2, 1e-5]:
+                rtol = getBudgetTolerance(v, atol)
+                res, nIt, err = v.getSumTruncatedArray(
+                    self.xArray, self.tArray, rtol, diagnostics=True)
+                assert np.max(np.abs(res-expected)) <= atol
+                assert np.all(err <= atol)
+        assert getBudgetTolerance(v, 1e6) == 0.5
+        with pytest.raises(ValueError):
+            getBudgetTolerance(v, 0.0)
+
+
+class TestNumberOfTerms:
+    """Test the a priori number of terms.
+
+    """
+    def test_tail(self):
+        """The tail of the series is below rtol.
+        """
+        tArray = np.array([0.0, 1e-5, 1e-3, 0.1])
+        N = getNumberOfTerms(tArray, 1.0, 1.0, 1e-8)
+        assert N[0] == 1
+        assert np.all(np.diff(N[1:]) <= 0)
+        for t, n in zip(tArray[1:], N[1:]):
+            k = (2.0*np.arange(n, n+10000)+1.0)*np.pi
+            assert np.sum(np.exp(-k**2*t)) <= 1e-8
+
+    def test_nMax(self):
+        assert getNumberOfTerms(1e-12, 1.0, 1.0, 1e-8, nMax=100) == 101
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            getNumberOfTerms(1.0, 1.0, 1.0, 1.0)
+
+
+class TestCreateUniform:
+    """Test the engine selection.
+
+    """
+    node = {'dim': 1, 'x': 0.0, 'y': 0.0, 'z': 0.0, 't': 0.0, 'l': 1.0,
+            'alpha': 1.0}
+    params = {'a0': 300.0, 'a1': 0.0, 'a2': 0.0, 'k1': 0.0, 'k2': 0.0}
+
+    def test_numpy(self):
+        u = createUniform('numpy', self.node, 'd', 'initial', self.params,
+                          'x', 'x')
+        assert isinstance(u, VectorizedUniform)
+
+    def test_gemm(self):
+        u = createUniform('gemm', self.node, 'd', 'initial', self.params,
+                          'x', 'x')
+        assert isinstance(u, TabulatedUniform)
+
+    def test_invalidEngine(self):
+        with pytest.raises(ValueError):
+            createUniform('fortran', self.node, 'd', 'initial', self.params,
+                          'x', 'x')
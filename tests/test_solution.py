@@ -1,11 +1,193 @@
+import os
+import shutil
+import tempfile
 import six
 import numpy as np
-from heat.solution import Solution
+from heat.geometry import Geometry
+from heat.mesh import Mesh
+from heat.initial import Initial
+from heat.boundary import Boundary
+from heat.solution import Solution, SeparableField
 import unittest
 
 
 class TestSolution(unittest.TestCase):
-    """Test the Source class with stationary conditions.
+    """Test the queries of the Solution class on separable fields and on
+    arrays.
     """
-    pass
+    def setUp(self):
+        self.mesh = Mesh('coarse', Geometry(3, 4.0, 2.98, 2.1))
+        rng = np.random.RandomState(1)
+        fields = []
+        for rule in ['product', 'sum']:
+            factors = {}
+            for d, axis in enumerate(['x', 'y', 'z']):
+                factors[axis] = rng.rand(5, self.mesh.getAxisIndex(d).size)
+            fields.append(SeparableField(self.mesh, factors, rule))
+        self.solution = Solution(self.mesh)
+        self.solution.setFields(fields)
+        self.full = self.solution.toArray()
+        # (t, x, y, z), the nodes of the 3D mesh are in the order x, y, z
+        self.grid = self.full.reshape((5, 11, 8, 6))
 
+    def test_getLine(self):
+        np.testing.assert_array_equal(self.solution.getLine('x'),
+                                      self.grid[:, :, 4, 3])
+        np.testing.assert_array_equal(
+            self.solution.getLine('z', {'x': 2, 'y': 7}, times=3),
+            self.grid[3, 2, 7, :])
+        with six.assertRaisesRegex(self, ValueError, 'The axis should be'):
+            self.solution.getLine('w')
+
+    def test_getPlane(self):
+        np.testing.assert_array_equal(self.solution.getPlane('y'),
+                                      self.grid[:, :, 4, :])
+        np.testing.assert_array_equal(
+            self.solution.getPlane('z', 0, times=slice(1, 3)),
+            self.grid[1:3, :, :, 0])
+
+    def test_getBox(self):
+        select = {'x': slice(2, 5), 'y': [0, 3], 'z': -1}
+        expected = self.grid[:, 2:5][:, :, [0, 3]][:, :, :, -1]
+        np.testing.assert_array_equal(self.solution.getBox(select=select),
+                                      expected)
+        array = Solution(self.mesh)
+        array.setSolution(self.full)
+        np.testing.assert_array_equal(array.getBox(select=select), expected)
+        np.testing.assert_array_equal(array.getLine('x'),
+                                      self.grid[:, :, 4, 3])
+
+    def test_getTimeRange(self):
+        np.testing.assert_array_equal(self.solution.getTimeRange(1, 4),
+                                      self.full[1:4])
+        out = np.empty((2, self.mesh.getNumNodes()))
+        self.assertIs(out, self.solution.getTimeRange(3, None, out))
+        np.testing.assert_array_equal(out, self.full[3:])
+
+    def test_writeStore(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp, 'solution.npy')
+            self.solution.writeStore(filename, chunk=2)
+            self.assertIsNone(self.solution.fields)
+            self.assertIsInstance(self.solution.sol, np.memmap)
+            self.assertFalse(self.solution.sol.flags.writeable)
+            np.testing.assert_array_equal(self.solution.toArray(), self.full)
+            solution = Solution(self.mesh)
+            solution.openStore(filename)
+            np.testing.assert_array_equal(solution.getLine('y', times=4),
+                                          self.grid[4, 5, :, 3])
+            del solution
+            self.solution.setSolution(None)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_2D(self):
+        """The nodes of the 2D mesh are in the order y, x.
+        """
+        mesh = Mesh('coarse', Geometry(2, 1.0, 0.5, 1.0))
+        factors = {'x': np.random.rand(2, 11), 'y': np.random.rand(2, 6)}
+        solution = Solution(mesh)
+        solution.setFields([SeparableField(mesh, factors, 'geometric')])
+        grid = solution.toArray().reshape((2, 6, 11))
+        np.testing.assert_array_equal(solution.getLine('x', {'y': 1}),
+                                      grid[:, 1, :])
+        np.testing.assert_array_equal(solution.getBox(),
+                                      grid.transpose(0, 2, 1))
+
+
+class TestSeparableField(unittest.TestCase):
+    """Test the SeparableField class against the expansion of the factors
+    to every node by Initial.getSolution and Boundary.getSolution.
+    """
+    def setUp(self):
+        self.mesh = Mesh('coarse', Geometry(3, 4.0, 2.98, 2.1))
+        self.rng = np.random.RandomState(0)
+        self.factors = {}
+        self.expanded = {}
+        for d, axis in enumerate(['x', 'y', 'z']):
+            index = self.mesh.getAxisIndex(d)
+            self.factors[axis] = self.rng.rand(4, index.size)
+            self.expanded[axis] = self.expand(axis)
+
+    def expand(self, axis):
+        Coords = self.mesh.getCoords()
+        line = Coords[axis][self.mesh.getAxisIndex(['x', 'y', 'z'].index(axis))]
+        column = np.searchsorted(line, Coords[axis])
+        return self.factors[axis][:, column]
+
+    def boundary(self, mesh):
+        zeros = [0.0, 0.0, 0.0]
+        return Boundary(mesh, ['dirichlet']*3, ['uniform']*3, zeros, zeros,
+                        zeros, ['uniform']*3, zeros, zeros, zeros)
+
+    def test_product(self):
+        field = SeparableField(self.mesh, self.factors, 'product')
+        expected = Initial(self.mesh).getSolution(self.expanded)
+        np.testing.assert_array_equal(field.toArray(), expected)
+
+    def test_sum(self):
+        field = SeparableField(self.mesh, self.factors, 'sum')
+        expected = self.boundary(self.mesh).getSolution(self.expanded)
+        np.testing.assert_array_equal(field.toArray(), expected)
+
+    def test_geometric(self):
+        mesh = Mesh('coarse', Geometry(2, 1.0, 0.5, 1.0))
+        Coords = mesh.getCoords()
+        factors = {}
+        expanded = {}
+        for d, axis in enumerate(['x', 'y']):
+            line = Coords[axis][mesh.getAxisIndex(d)]
+            factors[axis] = self.rng.rand(3, line.size)
+            expanded[axis] = factors[axis][:, np.searchsorted(line, Coords[axis])]
+        field = SeparableField(mesh, factors, 'geometric')
+        expected = self.boundary(mesh).getSolution(expanded)
+        np.testing.assert_array_equal(field.toArray(), expected)
+
+    def test_getTimeStep(self):
+        field = SeparableField(self.mesh, self.factors, 'product')
+        expected = field.toArray()
+        out = np.empty(self.mesh.getNumNodes())
+        res = field.getTimeStep(2, out)
+        self.assertIs(res, out)
+        np.testing.assert_array_equal(out, expected[2])
+        np.testing.assert_array_equal(field.getTimeStep(3), expected[3])
+        with six.assertRaisesRegex(self, ValueError, 'out must be'):
+            field.getTimeStep(0, np.empty(3))
+
+    def test_getMemorySize(self):
+        field = SeparableField(self.mesh, self.factors, 'sum')
+        self.assertEqual(4, field.getNumberOfTimes())
+        self.assertEqual(self.mesh.getNumNodes(), field.getNumberOfNodes())
+        self.assertEqual(4*8*(11+8+6), field.getMemorySize())
+
+    def test_rule(self):
+        with six.assertRaisesRegex(self, ValueError, 'The rule should be'):
+            SeparableField(self.mesh, self.factors, 'mean')
+
+    def test_fields(self):
+        """The solution is the sum of the fields.
+        """
+        product = SeparableField(self.mesh, self.factors, 'product')
+        total = SeparableField(self.mesh, self.factors, 'sum')
+        solution = Solution(self.mesh)
+        solution.setFields([product, total])
+        expected = product.toArray() + total.toArray()
+        np.testing.assert_array_equal(solution.toArray(), expected)
+        np.testing.assert_array_equal(solution.getSolution(1), expected[1])
+        out = np.empty_like(expected)
+        self.assertIs(solution.toArray(out), out)
+        np.testing.assert_array_equal(out, expected)
+        solution.setSolution(expected)
+        self.assertIsNone(solution.fields)
+        np.testing.assert_array_equal(solution.getSolution(1), expected[1])
+
+    def test_astype(self):
+        field = SeparableField(self.mesh, self.factors, 'product')
+        single = field.astype(np.float32)
+        self.assertEqual(np.float64, field.getDtype())
+        self.assertEqual(np.float32, single.getDtype())
+        self.assertEqual(field.getMemorySize()//2, single.getMemorySize())
+        self.assertEqual(np.float32, single.toArray().dtype)
+        np.testing.assert_allclose(single.toArray(), field.toArray(),
+                                   rtol=1e-6)